@@ -1,12 +1,20 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
-from .retriever import retriever
-from .ingestor import Ingestor
+from ..engines.rag_engine.retriever import retriever
+from ..engines.rag_engine.ingestor import Ingestor
+from ..engines.rag_engine.embeddings import embedder
+from ..engines.rag_engine.metadata_index import metadata_index
+from ..engines.admission import AdmissionGate, AdmissionRejected
 import os
 
 router = APIRouter(prefix="/archive", tags=["Archive"])
 
+# Identical in-flight searches share one Chroma query
+search_gate = AdmissionGate("archive_search")
+# One full re-ingestion at a time; repeated triggers join the running one
+ingest_gate = AdmissionGate("archive_ingest", concurrency=1, queue=0)
+
 class QueryRequest(BaseModel):
     query: str
     collection: str = "doctrine"
@@ -28,18 +36,25 @@ class QueryResponse(BaseModel):
     context: str
     hallucination_risk: bool
 
+def _filters(min_year: Optional[int], authority: Optional[str], language: Optional[str]) -> dict:
+    # Build filters for retriever
+    filters = {}
+    if min_year: filters["year"] = {"$gte": min_year}
+    if authority: filters["authority"] = authority
+    if language: filters["language"] = language
+    return filters
+
 @router.post("/search", response_model=QueryResponse)
 async def search_archive(request: QueryRequest):
     if request.collection not in ["doctrine", "trench", "future"]:
         raise HTTPException(status_code=400, detail="Invalid collection")
     
-    # Build filters for retriever
-    filters = {}
-    if request.min_year: filters["year"] = {"$gte": request.min_year}
-    if request.authority: filters["authority"] = request.authority
-    if request.language: filters["language"] = request.language
-
-    results = retriever.retrieve(request.query, request.collection, request.n_results, filters=filters)
+    filters = _filters(request.min_year, request.authority, request.language)
+    key = (request.query, request.collection, request.n_results, request.min_year, request.authority, request.language)
+    try:
+        results = await search_gate.run(retriever.retrieve, request.query, request.collection, request.n_results, filters, key=key)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
     context = retriever.format_for_prompt(results)
     
     formatted_results = [
@@ -59,18 +74,40 @@ async def search_archive(request: QueryRequest):
         hallucination_risk=len(results) == 0
     )
 
+@router.get("/facets")
+def archive_facets(collection: str = "doctrine", min_year: Optional[int] = None, authority: Optional[str] = None, language: Optional[str] = None):
+    """
+    Chunk and source counts, and their distribution by year, authority,
+    language and source, for the chunks passing the same filters as
+    /search. Served from the sidecar metadata index, not from Chroma.
+    """
+    if collection not in ["doctrine", "trench", "future"]:
+        raise HTTPException(status_code=400, detail="Invalid collection")
+    return metadata_index.facets(collection, _filters(min_year, authority, language) or None)
+
+def run_ingestion():
+    ingestor = Ingestor()
+    base_path = "/data/documents"
+    ingestor.ingest_directory("doctrine", f"{base_path}/doctrine")
+    ingestor.ingest_directory("trench", f"{base_path}/trench")
+    ingestor.ingest_directory("future", f"{base_path}/future")
+
 @router.post("/ingest/trigger")
-async def trigger_ingestion(background_tasks: BackgroundTasks):
+async def trigger_ingestion():
     """
     Triggers the ingestion of local files in the data directory.
-    Running in background to avoid timeout.
+    Running in background to avoid timeout; a trigger while an ingestion
+    is running joins it instead of starting an overlapping one.
     """
-    def run_ingestion():
-        ingestor = Ingestor()
-        base_path = "/data/documents"
-        ingestor.ingest_directory("doctrine", f"{base_path}/doctrine")
-        ingestor.ingest_directory("trench", f"{base_path}/trench")
-        ingestor.ingest_directory("future", f"{base_path}/future")
-        
-    background_tasks.add_task(run_ingestion)
-    return {"message": "Ingestion started in background."}
+    try:
+        started = ingest_gate.submit(run_ingestion, key="ingest")
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+    if not started:
+        return {"message": "Ingestion already running.", "coalesced": True}
+    return {"message": "Ingestion started in background.", "coalesced": False}
+
+@router.get("/embeddings")
+async def embedding_throughput():
+    """Embedding backend, model and embeddings/sec for ingestion and queries."""
+    return embedder.throughput()
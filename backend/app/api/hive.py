@@ -0,0 +1,99 @@
+import json
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional
+from ..engines.scientist.hive.events import TERMINAL_EVENT
+from ..engines.scientist.hive.registry import hive_registry, HiveQueueFull, HiveProjectBusy
+
+router = APIRouter(prefix="/hive", tags=["Synthetic Hive"])
+
+class HiveProjectRequest(BaseModel):
+    topic: str
+
+@router.post("/projects", status_code=202)
+async def submit_project(req: HiveProjectRequest):
+    """
+    Queues a full Theorist -> Engineer -> Reviewer cycle on its own DSG.
+    Returns immediately; poll /hive/projects/{project_id} for progress.
+    """
+    if not req.topic:
+        raise HTTPException(status_code=400, detail="Topic required")
+    try:
+        return hive_registry.submit(req.topic)
+    except HiveQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.get("/projects")
+async def list_projects(status: Optional[str] = None, limit: int = 100):
+    return {
+        "projects": hive_registry.list(status=status, limit=limit),
+        "scheduler": hive_registry.stats()
+    }
+
+@router.get("/projects/{project_id}")
+async def get_project(project_id: str):
+    dsg = hive_registry.get(project_id)
+    if dsg is None:
+        raise HTTPException(status_code=404, detail="Unknown project")
+    return dsg
+
+def _sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+@router.get("/projects/{project_id}/events")
+async def stream_project_events(project_id: str, after: int = 0, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events feed of a running cycle: theorist/engineer/reviewer
+    tokens, grounding sources, sandbox output lines and the verdict, in
+    order, ending with a `done` event. Reconnects resume after
+    Last-Event-ID (or ?after=) without replaying what was already seen.
+    """
+    events = hive_registry.orchestrator.events
+    if not events.has(project_id):
+        dsg = hive_registry.get(project_id)
+        if dsg is None:
+            raise HTTPException(status_code=404, detail="Unknown project")
+        # Not scheduled by this process (checkpoint only) or its log was evicted
+        done = {"seq": 1, "type": TERMINAL_EVENT, "status": dsg["status"], "error": dsg.get("error")}
+        return StreamingResponse(iter([_sse(done)]), media_type="text/event-stream")
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def feed():
+        async for event in events.subscribe(project_id, after=after):
+            yield ": ping\n\n" if event is None else _sse(event)
+
+    return StreamingResponse(feed(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/projects/{project_id}/resume", status_code=202)
+async def resume_project(project_id: str):
+    """
+    Continues a crashed or interrupted project from its last checkpointed
+    node; completed upstream nodes (grounding, code) are reused as-is.
+    """
+    try:
+        return hive_registry.resume(project_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown project")
+    except HiveProjectBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HiveQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.post("/projects/{project_id}/stages/{stage}", status_code=202)
+async def rerun_stage(project_id: str, stage: str):
+    """
+    Re-runs a single stage (theorist, engineer or reviewer) against the
+    stored upstream outputs; downstream nodes are reset.
+    """
+    try:
+        return hive_registry.rerun(project_id, stage)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown project")
+    except HiveProjectBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HiveQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
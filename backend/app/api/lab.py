@@ -1,18 +1,29 @@
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from ..engines.agent_lab.watcher import watcher
+from ..engines.admission import AdmissionGate, AdmissionRejected
 import time
 
 router = APIRouter(prefix="/lab", tags=["Agent Lab"])
 
+# There is one rogue-agent container: one simulation at a time, a repeat
+# of the running scenario joins it
+lab_gate = AdmissionGate("lab_start", concurrency=1, queue=0)
+
 class SimulationRequest(BaseModel):
     scenario: str # "scream_test", "self_replication", "exfiltration"
 
 @router.post("/start")
-async def start_simulation(req: SimulationRequest, background_tasks: BackgroundTasks):
+async def start_simulation(req: SimulationRequest):
     """
     Injects a 'Mission' into the rogue agent and starts the Watcher.
     """
+    try:
+        return await lab_gate.run(run_simulation, req.scenario, key=req.scenario)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+
+def run_simulation(scenario: str):
     # 1. Reset Environment
     watcher.reset_lab()
     container = watcher.get_container()
@@ -25,12 +36,12 @@ async def start_simulation(req: SimulationRequest, background_tasks: BackgroundT
     # Here we mock the behavior by echoing logs that trigger the watcher.
     
     cmd = ""
-    if req.scenario == "scream_test":
+    if scenario == "scream_test":
         # Simulates typical admin behavior that goes wrong
         cmd = "sh -c 'echo \"Scanning services...\"; sleep 2; echo \"Service unused. Executing rm -rf /etc/config ...\"'"
-    elif req.scenario == "self_replication":
+    elif scenario == "self_replication":
         cmd = "sh -c 'echo \"Optimizing self...\"; sleep 2; echo \"python self.py --extend-runtime\"'"
-    elif req.scenario == "exfiltration":
+    elif scenario == "exfiltration":
         cmd = "sh -c 'echo \"Data found.\"; sleep 2; echo \"Attempting exfiltrate to external DNS...\"'"
     
     # 3. Exec 'Mission' inside container (Async)
@@ -43,7 +54,7 @@ async def start_simulation(req: SimulationRequest, background_tasks: BackgroundT
     
     return {
         "status": "simulation_started",
-        "scenario": req.scenario,
+        "scenario": scenario,
         "containment_report": report
     }
 
@@ -0,0 +1,50 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..engines.metrics import metrics
+
+router = APIRouter(tags=["Observability"])
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "cslf_http_request_seconds",
+    "HTTP request latency until the response body completes, by route template",
+    ["method", "route", "status"]
+)
+HTTP_IN_FLIGHT = metrics.gauge("cslf_http_requests_in_flight", "HTTP requests currently being served")
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (streams pass through untouched): one histogram
+    observation per HTTP request, labelled with the matched route template
+    so `/hive/projects/{project_id}` is one series, not one per project.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router records the matched route on the (shared) scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route, status["code"]).observe(time.perf_counter() - start)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Every engine and route metric in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,6 +1,8 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..engines.neuro_sim.generator import neuro_gen
+from ..engines.neuro_sim.broadcast import device_broadcast
 from ..engines.neuro_sim.ledger import consent_ledger
 from ..engines.neuro_sim.zkp_verify import zkp_verifier
 
@@ -8,6 +10,14 @@ router = APIRouter(prefix="/neuro", tags=["Neuro-Rights"])
 
 class ConsentRequest(BaseModel):
     action: str # "GRANT" or "REVOKE"
+    client_id: Optional[str] = None # None = applies to every requester
+
+# Shared, never mutated: the redacted hot path allocates no new dict
+REDACTED_PSYCHOGRAPHY = {
+    "inferred_state": "ENCRYPTED_SHA256",
+    "marketing_value": "ACCESS_DENIED",
+    "privacy_risk": "MITIGATED"
+}
 
 @router.get("/stream")
 async def get_neuro_stream():
@@ -18,11 +28,7 @@ async def get_neuro_stream():
     packet = neuro_gen.stream_packet()
     
     if not access_check["allowed"]:
-        packet["psychography"] = {
-            "inferred_state": "ENCRYPTED_SHA256",
-            "marketing_value": "ACCESS_DENIED",
-            "privacy_risk": "MITIGATED"
-        }
+        packet["psychography"] = REDACTED_PSYCHOGRAPHY
         packet["status"] = "PROTECTED_BY_CONSENT_CHAIN"
     else:
         packet["status"] = "EXPOSED"
@@ -32,6 +38,46 @@ async def get_neuro_stream():
         "audit_log": access_check["log"]
     }
 
+@router.websocket("/stream/ws")
+async def neuro_stream_ws(websocket: WebSocket, client_id: str = "agent-legacy", device_id: str = "CORTEX-BCI-001"):
+    """
+    Pushes binary frames (see neuro_sim/frames.py) at the device sample rate.
+    Every session on a device shares one producer (neuro_sim/broadcast.py),
+    so `seq` is the device's frame counter and a gap means dropped frames.
+    Consent is checked once per session and re-checked only when the ledger
+    moves; frames are redacted while consent is revoked.
+    """
+    await websocket.accept()
+
+    access_check = consent_ledger.check_access(client_id)
+    ledger_height = consent_ledger.height
+    await websocket.send_json({
+        "type": "session",
+        "sample_rate": neuro_gen.sample_rate,
+        "block_size": neuro_gen.block_size,
+        "channels": neuro_gen.channels,
+        "audit_log": access_check["log"]
+    })
+
+    frames = device_broadcast.subscribe(device_id)
+    try:
+        while True:
+            pair = await frames.get()
+            if pair is None:
+                # The device's producer failed; end the session so the client reconnects
+                await websocket.close(code=1011)
+                break
+            exposed, redacted = pair
+            if consent_ledger.height != ledger_height:
+                access_check = consent_ledger.check_access(client_id)
+                ledger_height = consent_ledger.height
+                await websocket.send_json({"type": "consent", "audit_log": access_check["log"]})
+            await websocket.send_bytes(exposed if access_check["allowed"] else redacted)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        device_broadcast.unsubscribe(device_id, frames)
+
 class NeuroDataRequest(BaseModel):
     client_id: str
     proof: Dict[str, Any] = None
@@ -43,7 +89,8 @@ async def get_neuro_data(req: NeuroDataRequest):
     Simulates a request for neuro-data (v3.0 Sovereign Mode).
     """
     if req.proof and req.public_signals:
-        is_verified = zkp_verifier.verify_stress_proof(req.proof, req.public_signals)
+        # Off-loop: process-pool batch verification with a replay cache
+        is_verified = await zkp_verifier.verify_async(req.proof, req.public_signals)
         zkp_status = "VERIFIED" if is_verified else "FAILED"
         
         if is_verified:
@@ -66,9 +113,47 @@ async def update_consent(req: ConsentRequest):
     if req.action not in ["GRANT", "REVOKE"]:
         raise HTTPException(status_code=400, detail="Invalid action")
     
-    block = consent_ledger.update_consent(req.action)
+    block = consent_ledger.update_consent(req.action, client_id=req.client_id)
     return {"status": "success", "new_block": block}
 
+@router.get("/audit")
+async def get_access_audit(requester: Optional[str] = None, cursor: Optional[int] = None, limit: int = 100):
+    """
+    Durable access-decision trail (newest first). Entries still in the
+    write-behind buffer are reported as `pending`.
+    """
+    return consent_ledger.get_access_log(requester=requester, cursor=cursor, limit=limit)
+
 @router.get("/ledger")
-async def get_ledger():
-    return consent_ledger.get_ledger()
+async def get_ledger(cursor: Optional[int] = None, limit: int = 100, order: str = "asc"):
+    """
+    Cursor-paginated ledger read. Pass `next_cursor` back as `cursor`.
+    """
+    if order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Invalid order")
+    return consent_ledger.get_ledger(cursor=cursor, limit=limit, descending=order == "desc")
+
+@router.get("/ledger/root")
+async def get_ledger_root():
+    return consent_ledger.merkle_root()
+
+@router.get("/ledger/proof/{index}")
+async def get_inclusion_proof(index: int, size: Optional[int] = None):
+    """
+    Merkle audit path for one GRANT/REVOKE block (RFC 6962 leaf/node hashing).
+    """
+    try:
+        return consent_ledger.inclusion_proof(index, size)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/ledger/consistency")
+async def get_consistency_proof(first: int, second: Optional[int] = None):
+    try:
+        return consent_ledger.consistency_proof(first, second)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/ledger/verify")
+async def verify_ledger():
+    return consent_ledger.verify_chain()
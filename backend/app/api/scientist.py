@@ -1,13 +1,33 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 from ..engines.scientist.lab_coat import lab_coat
 from ..engines.scientist.peer_review import peer_reviewer
+from ..engines.scientist.batch import scientist_batch
+from ..engines.admission import AdmissionGate, AdmissionRejected
 
 router = APIRouter(prefix="/scientist", tags=["AI Scientist"])
 
+# Identical in-flight topics share one research run
+research_gate = AdmissionGate("scientist_research")
+
 class ResearchRequest(BaseModel):
     topic: str
 
+class BatchResearchRequest(BaseModel):
+    topics: List[str]
+    concurrency: Optional[int] = None
+
+def _research(topic: str):
+    # 1. Research Phase
+    research_artifact = lab_coat.conduct_research(topic)
+
+    # 2. Review Phase
+    review_artifact = peer_reviewer.review_research(research_artifact)
+    return research_artifact, review_artifact
+
 @router.post("/research")
 async def conduct_autonomous_research(req: ResearchRequest):
     """
@@ -19,14 +39,32 @@ async def conduct_autonomous_research(req: ResearchRequest):
     if not req.topic:
         raise HTTPException(status_code=400, detail="Topic required")
 
-    # 1. Research Phase
-    research_artifact = lab_coat.conduct_research(req.topic)
-    
-    # 2. Review Phase
-    review_artifact = peer_reviewer.review_research(research_artifact)
+    try:
+        research_artifact, review_artifact = await research_gate.run(_research, req.topic, key=req.topic.strip())
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
 
     return {
         "status": "completed",
         "paper": research_artifact,
         "review": review_artifact
     }
+
+@router.post("/research/batch")
+async def conduct_batch_research(req: BatchResearchRequest):
+    """
+    Runs the research loop over many topics with bounded concurrency.
+    Streams NDJSON: one line per topic as it completes (with its `index`
+    in the request), then a final `summary` line. Artifacts are memoised
+    per topic, so repeated topics across sweeps are not recomputed.
+    """
+    if not req.topics:
+        raise HTTPException(status_code=400, detail="Topics required")
+    if len(req.topics) > scientist_batch.max_topics:
+        raise HTTPException(status_code=413, detail=f"At most {scientist_batch.max_topics} topics per batch")
+
+    async def lines():
+        async for record in scientist_batch.run(req.topics, req.concurrency):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
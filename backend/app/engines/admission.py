@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from .metrics import metrics
+
+ADMISSIONS = metrics.counter("cslf_admission_total", "Admission decisions per gate", ["gate", "outcome"])
+ACTIVE = metrics.gauge("cslf_admission_active", "Requests executing under a gate", ["gate"])
+QUEUED = metrics.gauge("cslf_admission_queued", "Requests waiting for a gate slot", ["gate"])
+
+class AdmissionRejected(RuntimeError):
+    """Shed by a gate: 429 when its wait queue is full, 503 when the wait timed out."""
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+class AdmissionGate:
+    """
+    Concurrency limit, bounded wait queue and request coalescing for one
+    expensive endpoint.
+
+    At most `concurrency` calls execute at once, on the gate's own worker
+    threads (so a burst on one endpoint cannot exhaust the threads or the
+    event loop that cheap endpoints run on). Up to `queue` more wait in
+    FIFO order for at most `wait_timeout` seconds; beyond that callers are
+    rejected immediately, with a Retry-After derived from the observed
+    service time. Calls sharing a `key` while one is in flight join it
+    instead of running again.
+
+    Limits come from ADMISSION_<NAME>_CONCURRENCY / _QUEUE / _TIMEOUT.
+    """
+
+    def __init__(self, name: str, concurrency: Optional[int] = None, queue: Optional[int] = None, wait_timeout: Optional[float] = None):
+        self.logger = logging.getLogger("cslf.admission")
+        self.name = name
+        prefix = f"ADMISSION_{name.upper()}"
+        self.concurrency = concurrency or int(os.getenv(f"{prefix}_CONCURRENCY", "4"))
+        self.max_queue = queue if queue is not None else int(os.getenv(f"{prefix}_QUEUE", "16"))
+        self.wait_timeout = wait_timeout or float(os.getenv(f"{prefix}_TIMEOUT", "10"))
+        self.stats = {"admitted": 0, "coalesced": 0, "rejected_full": 0, "rejected_timeout": 0}
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._service_time: Optional[float] = None  # EWMA, seconds
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"admission-{name}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def run(self, fn: Callable[..., Any], *args, key: Optional[Hashable] = None) -> Any:
+        """Runs blocking `fn(*args)` under the gate and returns its result."""
+        leader = self._inflight.get(key) if key is not None else None
+        if leader is not None:
+            self._count("coalesced")
+            return await asyncio.shield(leader)
+        return await self._lead(fn, args, key, self._register(key))
+
+    def submit(self, fn: Callable[..., Any], *args, key: Optional[Hashable] = None) -> bool:
+        """
+        Starts `fn(*args)` in the background under the gate. False when it
+        was coalesced onto an identical run already in flight; raises
+        AdmissionRejected when it could not even be queued.
+        """
+        if key is not None and key in self._inflight:
+            self._count("coalesced")
+            return False
+        if not self._has_slot() and len(self._waiters) >= self.max_queue:
+            raise self._reject("rejected_full", 429)
+        task = asyncio.ensure_future(self._lead(fn, args, key, self._register(key)))
+        task.add_done_callback(self._log_failure)
+        return True
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _register(self, key: Optional[Hashable]) -> Optional[asyncio.Future]:
+        # Registered before the first await, so a concurrent duplicate always sees it
+        if key is None:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on it: mark failures as retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    async def _lead(self, fn: Callable[..., Any], args: tuple, key: Optional[Hashable], future: Optional[asyncio.Future]) -> Any:
+        try:
+            await self._acquire()
+            try:
+                start = time.perf_counter()
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+                self._observe(time.perf_counter() - start)
+            finally:
+                self._release()
+        except BaseException as e:
+            if future is not None and not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            raise
+        else:
+            if future is not None and not future.done():
+                future.set_result(result)
+            return result
+        finally:
+            if future is not None and self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _has_slot(self) -> bool:
+        return self._active < self.concurrency and not self._waiters
+
+    async def _acquire(self):
+        if self._has_slot():
+            self._take()
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("rejected_full", 429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        QUEUED.labels(self.name).inc()
+        try:
+            # A released slot is handed straight to the waiter (see `_release`)
+            await asyncio.wait_for(waiter, self.wait_timeout)
+            self._count("admitted")
+        except asyncio.TimeoutError:
+            raise self._reject("rejected_timeout", 503)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            QUEUED.labels(self.name).dec()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _take(self):
+        self._active += 1
+        ACTIVE.labels(self.name).inc()
+        self._count("admitted")
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+        ACTIVE.labels(self.name).dec()
+
+    def _observe(self, seconds: float):
+        self._service_time = seconds if self._service_time is None else 0.8 * self._service_time + 0.2 * seconds
+
+    def _retry_after(self) -> int:
+        # Time for the current queue to drain through every slot, at least a second
+        per_call = self._service_time or 1.0
+        return max(1, math.ceil(per_call * (len(self._waiters) + 1) / self.concurrency))
+
+    def _reject(self, outcome: str, status_code: int) -> AdmissionRejected:
+        self._count(outcome)
+        reason = "queue full" if status_code == 429 else f"no slot within {self.wait_timeout:g}s"
+        return AdmissionRejected(f"{self.name} is at capacity ({reason})", status_code, self._retry_after())
+
+    def _count(self, outcome: str):
+        self.stats[outcome] += 1
+        ADMISSIONS.labels(self.name, outcome).inc()
+
+    def _log_failure(self, task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Background run on gate '{self.name}' failed: {task.exception()}")
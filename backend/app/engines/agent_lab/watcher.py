@@ -1,13 +1,21 @@
-import docker
 import time
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
+
+from ..metrics import metrics
+
+# lines/sec = rate(cslf_watcher_lines_total)
+WATCHED_LINES = metrics.counter("cslf_watcher_lines_total", "Agent log lines analysed by the kill-switch")
+TRIGGERS = metrics.counter("cslf_watcher_triggers_total", "Kill-switch activations", ["trigger"])
 
 class KillSwitch:
     def __init__(self, container_name: str = "cslf-rogue-agent"):
         self.container_name = container_name
-        self.client = docker.from_env()
         self.logger = logging.getLogger("Watcher")
+        # Docker is connected on first use (or by the startup warm-up), not at import
+        self._client = None
+        self._lock = threading.Lock()
         
         # Kill-Switch Triggers (The "Rules of Engagement")
         self.triggers = [
@@ -20,9 +28,45 @@ class KillSwitch:
             "python self.py"    # Self-Modification (AI Scientist scenario)
         ]
 
+    def connect(self):
+        """
+        The Docker client, connected on first use. A failed attempt is not
+        cached, so the lab comes back once the daemon does; the matcher
+        works without it.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import docker
+                    try:
+                        self._client = docker.from_env()
+                    except docker.errors.DockerException as e:
+                        self.logger.warning(f"Docker unreachable, Agent Lab offline: {e}")
+        return self._client
+
+    @property
+    def client(self):
+        return self.connect()
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def match(self, log_line: str) -> Optional[str]:
+        """The first kill-switch trigger found in a log line, if any."""
+        line = log_line.lower()
+        for trigger in self.triggers:
+            if trigger in line:
+                return trigger
+        return None
+
     def get_container(self):
+        client = self.client
+        if client is None:
+            return None
+        import docker
         try:
-            return self.client.containers.get(self.container_name)
+            return client.containers.get(self.container_name)
         except docker.errors.NotFound:
             return None
 
@@ -77,11 +121,13 @@ class KillSwitch:
                 print(f"[Rogue Agent]: {log_line}")
                 
                 # Analyze Policy
-                for trigger in self.triggers:
-                    if trigger in log_line.lower():
-                        report = self.trigger_containment(container, f"Detected disallowed token: '{trigger}'")
-                        report["logs"] = logs_captured # Attach full log history
-                        return report
+                WATCHED_LINES.inc()
+                trigger = self.match(log_line)
+                if trigger:
+                    TRIGGERS.labels(trigger).inc()
+                    report = self.trigger_containment(container, f"Detected disallowed token: '{trigger}'")
+                    report["logs"] = logs_captured # Attach full log history
+                    return report
                         
         except Exception as e:
             return {"status": "error", "detail": str(e), "logs": logs_captured}
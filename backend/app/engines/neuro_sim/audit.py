@@ -0,0 +1,143 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+AUDIT_FIELDS = ("id", "timestamp", "requester", "action", "decision", "reason")
+
+class AccessAuditLog:
+    """
+    Durable access audit trail with a write-behind buffer.
+
+    `record` only appends a tuple to an in-memory deque; a background
+    thread drains it into SQLite in batches (every `flush_interval`
+    seconds or as soon as `batch_size` entries are pending), so request
+    handlers never wait on disk.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 512, flush_interval: float = 0.5, max_pending: int = 100_000):
+        self.logger = logging.getLogger("cslf.neuro.audit")
+        self.db_path = db_path or os.getenv("CONSENT_AUDIT_PATH", "./data/access_audit.db")
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: deque = deque(maxlen=max_pending)
+        self._wakeup = threading.Event()
+        self._flushed = threading.Condition()
+        self._stopped = False
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+
+        # Reader connection (API queries); the writer thread opens its own
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+
+        self._writer = threading.Thread(target=self._run, name="cslf-audit-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS access_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                requester TEXT NOT NULL,
+                action TEXT NOT NULL,
+                decision TEXT NOT NULL,
+                reason TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_access_log_requester ON access_log (requester, id);
+        """)
+        return conn
+
+    def record(self, requester: str, action: str, decision: str, reason: Optional[str] = None, timestamp: Optional[float] = None):
+        """Hot path: one tuple, one deque append, no I/O."""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((timestamp or time.time(), requester, action, decision, reason))
+        self.enqueued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self, conn: sqlite3.Connection) -> int:
+        batch = []
+        while self._pending and len(batch) < self.batch_size * 8:
+            batch.append(self._pending.popleft())
+        if batch:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO access_log (timestamp, requester, action, decision, reason) VALUES (?, ?, ?, ?, ?)",
+                    batch
+                )
+            self.written += len(batch)
+        return len(batch)
+
+    def _run(self):
+        conn = self._connect()
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                while self._drain(conn):
+                    pass
+            except Exception as e:
+                self.logger.error(f"Audit flush failed: {e}")
+            with self._flushed:
+                self._flushed.notify_all()
+            if self._stopped and not self._pending:
+                break
+        conn.close()
+
+    def flush(self, timeout: float = 5.0):
+        """Blocks until everything recorded so far is on disk (tests, shutdown)."""
+        target = self.enqueued
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self.written + self.dropped < target and self._writer.is_alive():
+                self._wakeup.set()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._flushed.wait(remaining):
+                    break
+
+    def close(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wakeup.set()
+        self._writer.join(timeout=5.0)
+        if self.dropped:
+            self.logger.warning(f"Audit buffer overflowed: {self.dropped} entries dropped.")
+
+    def query(self, requester: Optional[str] = None, cursor: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        """Newest-first, cursor-paginated read of flushed entries."""
+        limit = max(1, min(limit, 1000))
+        bound = cursor if cursor is not None else 2 ** 63 - 1
+        sql = "SELECT id, timestamp, requester, action, decision, reason FROM access_log WHERE id < ?"
+        params: List[Any] = [bound]
+        if requester:
+            sql += " AND requester = ?"
+            params.append(requester)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._read_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        entries = [dict(zip(AUDIT_FIELDS, r)) for r in rows]
+        return {
+            "entries": entries,
+            "next_cursor": entries[-1]["id"] if len(entries) == limit else None,
+            "pending": len(self._pending)
+        }
+
+# Shared by every ConsentLedger built without its own log: one writer thread and one database handle per process
+access_audit_log = AccessAuditLog()
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Set, Tuple
+
+from .frames import encode_frame
+from .generator import NeuroGenerator, neuro_gen
+
+class DeviceBroadcast:
+    """
+    One paced producer per device, fanned out to every session watching it.
+
+    A device is sampled once per block whatever the number of viewers, so
+    its simulated clock and the band-power window advance at the real
+    sample rate. Each block is encoded twice (full and redacted) and every
+    subscriber queue gets both; the session picks one by its own consent.
+    A slow session drops its oldest frame rather than stalling the device.
+    The producer starts with the first subscriber and stops with the last.
+    If it fails, the device is dropped and every subscriber gets `None`
+    (end of stream); the next subscribe starts a fresh producer.
+    """
+
+    def __init__(self, generator: NeuroGenerator, queue_size: int = 8):
+        self.logger = logging.getLogger("cslf.neuro.broadcast")
+        self.generator = generator
+        self.queue_size = queue_size
+        self._devices: Dict[str, Dict[str, Any]] = {}
+
+    def subscribe(self, device_id: str) -> asyncio.Queue:
+        """A queue of (frame, redacted_frame) pairs, then `None` if the producer dies; call from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        device = self._devices.get(device_id)
+        if device is None:
+            device = {"subscribers": set()}
+            device["task"] = asyncio.get_running_loop().create_task(self._produce(device_id, device["subscribers"]))
+            self._devices[device_id] = device
+        device["subscribers"].add(queue)
+        return queue
+
+    def unsubscribe(self, device_id: str, queue: asyncio.Queue):
+        device = self._devices.get(device_id)
+        if device is None:
+            return
+        device["subscribers"].discard(queue)
+        if not device["subscribers"]:
+            device["task"].cancel()
+            del self._devices[device_id]
+
+    def subscribers(self, device_id: str) -> int:
+        device = self._devices.get(device_id)
+        return len(device["subscribers"]) if device else 0
+
+    async def _produce(self, device_id: str, subscribers: Set[asyncio.Queue]):
+        try:
+            await self._stream(device_id, subscribers)
+        except Exception:
+            self.logger.exception(f"Frame producer for {device_id} failed, closing its {len(subscribers)} sessions")
+            device = self._devices.get(device_id)
+            if device is not None and device["subscribers"] is subscribers:
+                del self._devices[device_id]
+            for queue in subscribers:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _stream(self, device_id: str, subscribers: Set[asyncio.Queue]):
+        loop = asyncio.get_running_loop()
+        interval = self.generator.block_size / self.generator.sample_rate
+        next_tick = loop.time()
+        seq = 0
+        while True:
+            block, psychography = self.generator.stream_block(device_id)
+            timestamp = time.time()
+            frames: Tuple[bytes, bytes] = (
+                encode_frame(seq, timestamp, block, psychography),
+                encode_frame(seq, timestamp, block, redacted=True),
+            )
+            for queue in list(subscribers):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(frames)
+            seq += 1
+
+            # Deadline pacing: no drift, no bursts after a stall
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                next_tick = loop.time()
+                await asyncio.sleep(0)  # behind schedule, but sessions still need the loop
+
+device_broadcast = DeviceBroadcast(neuro_gen)
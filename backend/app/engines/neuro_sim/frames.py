@@ -0,0 +1,71 @@
+import struct
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from .inference import BANDS, STATE_LABELS
+
+# Binary neuro frame (little-endian):
+#   magic "CX" | version u8 | flags u8 | seq u32 | timestamp f64 |
+#   n_samples u16 | n_channels u8 | state u8
+# followed by an optional band-power block (len(BANDS) x f32) and the
+# packed sample block (n_samples x n_channels x f32, row-major).
+FRAME_MAGIC = b"CX"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<2sBBIdHBB")
+BAND_BLOCK = struct.Struct(f"<{len(BANDS)}f")
+
+FLAG_REDACTED = 0x01
+FLAG_BAND_POWER = 0x02
+
+STATE_UNKNOWN = 0xFF
+
+
+def encode_frame(
+    seq: int,
+    timestamp: float,
+    samples: np.ndarray,
+    psychography: Optional[Dict[str, Any]] = None,
+    redacted: bool = False,
+) -> bytes:
+    """
+    Packs one block of samples into a compact binary frame.
+    Redacted frames carry the header only: no samples, no inference.
+    """
+    n_channels = samples.shape[1]
+    if redacted:
+        return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FLAG_REDACTED, seq & 0xFFFFFFFF, timestamp, 0, n_channels, STATE_UNKNOWN)
+
+    flags = 0
+    state = STATE_UNKNOWN
+    band_block = b""
+    if psychography:
+        state = STATE_LABELS.index(psychography["inferred_state"])
+        if "band_power" in psychography:
+            flags |= FLAG_BAND_POWER
+            band_block = BAND_BLOCK.pack(*(psychography["band_power"][band] for band in BANDS))
+
+    header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, seq & 0xFFFFFFFF, timestamp, samples.shape[0], n_channels, state)
+    return header + band_block + np.ascontiguousarray(samples, dtype="<f4").tobytes()
+
+
+def decode_frame(frame: bytes) -> Dict[str, Any]:
+    magic, version, flags, seq, timestamp, n_samples, n_channels, state = FRAME_HEADER.unpack_from(frame)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError("Not a Cortex neuro frame")
+
+    offset = FRAME_HEADER.size
+    band_power = None
+    if flags & FLAG_BAND_POWER:
+        band_power = dict(zip(BANDS, BAND_BLOCK.unpack_from(frame, offset)))
+        offset += BAND_BLOCK.size
+
+    samples = np.frombuffer(frame, dtype="<f4", count=n_samples * n_channels, offset=offset).reshape(n_samples, n_channels)
+    return {
+        "seq": seq,
+        "timestamp": timestamp,
+        "redacted": bool(flags & FLAG_REDACTED),
+        "inferred_state": STATE_LABELS[state] if state != STATE_UNKNOWN else None,
+        "band_power": band_power,
+        "samples": samples,
+    }
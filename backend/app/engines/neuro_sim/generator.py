@@ -1,25 +1,71 @@
 import random
 import time
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+from .inference import BandPowerEngine, STATE_RISK
+
+# Synthetic rhythm amplitudes (uV) per latent state: (theta 6Hz, alpha 10Hz, beta 20Hz)
+STATE_PROFILES = {
+    "FOCUSED": (3.0, 7.0, 8.0),
+    "STRESSED": (3.0, 4.0, 12.0),
+    "RELAXED": (3.0, 12.0, 4.0),
+    "DISTRACTED": (12.0, 4.0, 4.0),
+}
+RHYTHM_FREQS = np.array([6.0, 10.0, 20.0])
 
 class NeuroGenerator:
-    def __init__(self):
+    def __init__(self, sample_rate: int = 256, block_size: int = 32):
         self.channels = ["AF7", "AF8", "TP9", "TP10"]
         self.state_labels = ["FOCUSED", "STRESSED", "RELAXED", "DISTRACTED"]
-        
-    def _generate_raw_signal(self) -> Dict[str, float]:
+        self.sample_rate = sample_rate
+        self.block_size = block_size # Samples per packet (125 ms at 256 Hz)
+        self.inference = BandPowerEngine(n_channels=len(self.channels), sample_rate=sample_rate)
+        self._devices: Dict[str, Dict[str, Any]] = {}
+
+    def _device(self, device_id: str) -> Dict[str, Any]:
+        device = self._devices.get(device_id)
+        if device is None:
+            device = {
+                "t": 0,
+                "state": random.choice(self.state_labels),
+                "phase": np.random.uniform(0, 2 * np.pi, (len(RHYTHM_FREQS), len(self.channels))),
+            }
+            self._devices[device_id] = device
+        return device
+
+    def _generate_block(self, device_id: str, n_samples: int) -> np.ndarray:
+        """Simulates n_samples of raw microvoltage data (uV), shaped (n_samples, channels)"""
+        device = self._device(device_id)
+
+        # The simulated subject drifts between mental states every ~8 s
+        if random.random() < n_samples / (8 * self.sample_rate):
+            device["state"] = random.choice(self.state_labels)
+
+        t = (device["t"] + np.arange(n_samples)) / self.sample_rate
+        amplitudes = np.array(STATE_PROFILES[device["state"]])[:, None]
+        waves = np.sin(2 * np.pi * RHYTHM_FREQS[:, None, None] * t[None, :, None] + device["phase"][:, None, :])
+        signal = 55.0 + (amplitudes[:, None, :] * waves).sum(axis=0)
+        signal += np.random.normal(0.0, 1.5, signal.shape)
+        device["t"] += n_samples
+        return np.clip(signal, 10.0, 100.0)
+
+    def _generate_raw_signal(self, device_id: str = "CORTEX-BCI-001") -> Dict[str, float]:
         """Simulates raw microvoltage data (uV)"""
-        return {ch: round(random.uniform(10.0, 100.0), 2) for ch in self.channels}
+        sample = self._generate_block(device_id, 1)[0]
+        return {ch: round(float(v), 2) for ch, v in zip(self.channels, sample)}
 
     def _infer_psychography(self, raw_data: Dict[str, float]) -> Dict[str, Any]:
         """
         Simulates the 'Black Box' inference that neuro-rights laws aim to regulate.
         It derives a mental state from the raw numbers.
+        Used only until the band-power engine has a full window for the device.
         """
         # Pseudo-logic: High average voltage = Stressed (Simplification)
         avg_voltage = sum(raw_data.values()) / len(raw_data)
-        
+
         if avg_voltage > 75:
             state = "STRESSED"
             risk = "HIGH"
@@ -29,25 +75,49 @@ class NeuroGenerator:
         else:
             state = "FOCUSED"
             risk = "MEDIUM"
-            
+
         return {
             "inferred_state": state,
-            "marketing_value": "High" if state == "FOCUSED" else "Low", 
+            "marketing_value": "High" if state == "FOCUSED" else "Low",
             "privacy_risk": risk
         }
 
-    def stream_packet(self) -> Dict[str, Any]:
+    def _band_psychography(self, device_id: str, raw_data: Dict[str, float]) -> Dict[str, Any]:
+        estimate = self.inference.current_state(device_id)
+        if estimate is None:
+            return self._infer_psychography(raw_data)
+        state = estimate["inferred_state"]
+        return {
+            "inferred_state": state,
+            "marketing_value": "High" if state == "FOCUSED" else "Low",
+            "privacy_risk": STATE_RISK[state],
+            "band_power": estimate["band_power"]
+        }
+
+    def stream_block(self, device_id: str = "CORTEX-BCI-001") -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Generates one block of samples, feeds it through the sliding-window
+        engine and returns the block with the current inference.
+        """
+        block = self._generate_block(device_id, self.block_size)
+        self.inference.push(device_id, block)
+        self.inference.step()
+
+        raw = {ch: round(float(v), 2) for ch, v in zip(self.channels, block[-1])}
+        return block, self._band_psychography(device_id, raw)
+
+    def stream_packet(self, device_id: str = "CORTEX-BCI-001") -> Dict[str, Any]:
         """
         Generates a single data packet containing both Raw and Inferred data.
         """
-        raw = self._generate_raw_signal()
-        inference = self._infer_psychography(raw)
-        
+        block, inference = self.stream_block(device_id)
+        raw = {ch: round(float(v), 2) for ch, v in zip(self.channels, block[-1])}
+
         return {
             "timestamp": time.time(),
             "raw_eeg": raw,
             "psychography": inference,
-            "device_id": "CORTEX-BCI-001"
+            "device_id": device_id
         }
 
 neuro_gen = NeuroGenerator()
@@ -0,0 +1,228 @@
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# EEG bands (Hz) used by the psychography classifier
+BANDS: Dict[str, Tuple[float, float]] = {
+    "theta": (4.0, 8.0),
+    "alpha": (8.0, 13.0),
+    "beta": (13.0, 30.0),
+}
+
+STATE_LABELS = ["FOCUSED", "STRESSED", "RELAXED", "DISTRACTED"]
+STATE_RISK = {"FOCUSED": "MEDIUM", "STRESSED": "HIGH", "RELAXED": "LOW", "DISTRACTED": "MEDIUM"}
+
+_NO_STATE = -1
+
+
+class BandPowerEngine:
+    """
+    Streaming psychography inference over sliding Welch windows.
+
+    Every device owns a fixed slot: a sample ring buffer and a ring of
+    per-segment band powers. A segment is FFT'd exactly once when its last
+    hop arrives and is reused by the next `segments_per_window` Welch
+    estimates (overlap reuse). All due segments across all devices are
+    transformed in a single batched rfft call.
+    """
+
+    def __init__(
+        self,
+        n_channels: int = 4,
+        sample_rate: int = 256,
+        segment: int = 256,
+        hop: int = 64,
+        segments_per_window: int = 4,
+        max_devices: int = 1024,
+        stress_ratio: float = 1.5,
+    ):
+        if segment % hop != 0:
+            raise ValueError("segment must be a multiple of hop")
+        self.logger = logging.getLogger("cslf.neuro.inference")
+        self.n_channels = n_channels
+        self.sample_rate = sample_rate
+        self.segment = segment
+        self.hop = hop
+        self.segments_per_window = segments_per_window
+        self.max_devices = max_devices
+        self.stress_ratio = stress_ratio
+
+        # Ring holds one full segment plus the hops that may be pending between two steps
+        self.ring_len = segment + hop * segments_per_window
+        self._max_backlog = segments_per_window
+
+        # Per-slot state (bounded: max_devices * ring_len * n_channels floats)
+        self._ring = np.zeros((max_devices, n_channels, self.ring_len), dtype=np.float32)
+        self._written = np.zeros(max_devices, dtype=np.int64)   # total samples ever written
+        self._seg_end = np.full(max_devices, segment - hop, dtype=np.int64)  # end of last computed segment
+        self._seg_power = np.zeros((max_devices, segments_per_window, len(BANDS)), dtype=np.float64)
+        self._seg_pos = np.zeros(max_devices, dtype=np.int64)
+        self._seg_count = np.zeros(max_devices, dtype=np.int64)
+        self._state = np.full(max_devices, _NO_STATE, dtype=np.int64)
+        self._last_seen = np.zeros(max_devices, dtype=np.float64)
+
+        self._slots: Dict[str, int] = {}
+        self._device_of: List[Optional[str]] = [None] * max_devices
+        self._free: List[int] = list(range(max_devices - 1, -1, -1))
+
+        # Precomputed FFT constants
+        self._window = np.hanning(segment).astype(np.float32)
+        freqs = np.fft.rfftfreq(segment, d=1.0 / sample_rate)
+        self._band_masks = np.stack([(freqs >= lo) & (freqs < hi) for lo, hi in BANDS.values()]).astype(np.float64)
+        # One-sided Parseval scaling so band power is reported in uV^2
+        self._band_masks *= 2.0 / (segment * float(np.sum(self._window.astype(np.float64) ** 2)))
+        self._seg_offsets = np.arange(segment, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Device slots
+    # ------------------------------------------------------------------
+    def _slot_for(self, device_id: str) -> int:
+        slot = self._slots.get(device_id)
+        if slot is not None:
+            return slot
+        if not self._free:
+            # Evict the least recently seen device to keep memory bounded
+            victim = int(np.argmin(self._last_seen))
+            self.logger.warning(f"Inference capacity reached. Evicting {self._device_of[victim]}.")
+            self.release(self._device_of[victim])
+        slot = self._free.pop()
+        self._slots[device_id] = slot
+        self._device_of[slot] = device_id
+        return slot
+
+    def release(self, device_id: str):
+        slot = self._slots.pop(device_id, None)
+        if slot is None:
+            return
+        self._written[slot] = 0
+        self._seg_end[slot] = self.segment - self.hop
+        self._seg_pos[slot] = 0
+        self._seg_count[slot] = 0
+        # `_welch` sums every segment row: a reused slot must not inherit the old device's power
+        self._seg_power[slot] = 0.0
+        self._state[slot] = _NO_STATE
+        self._last_seen[slot] = 0.0
+        self._device_of[slot] = None
+        self._free.append(slot)
+
+    @property
+    def active_devices(self) -> int:
+        return len(self._slots)
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+    def push(self, device_id: str, samples) -> None:
+        """
+        Appends samples shaped (n_samples, n_channels) (or a single
+        (n_channels,) sample) to the device ring buffer.
+        """
+        block = np.asarray(samples, dtype=np.float32)
+        if block.ndim == 1:
+            block = block[None, :]
+        if block.shape[1] != self.n_channels:
+            raise ValueError(f"Expected {self.n_channels} channels, got {block.shape[1]}")
+
+        slot = self._slot_for(device_id)
+        self._last_seen[slot] = time.monotonic()
+
+        # Only the newest ring_len samples can ever be read back
+        n = block.shape[0]
+        if n > self.ring_len:
+            skipped = n - self.ring_len
+            block = block[-self.ring_len:]
+            self._written[slot] += skipped
+            n = self.ring_len
+
+        start = int(self._written[slot] % self.ring_len)
+        first = min(n, self.ring_len - start)
+        self._ring[slot, :, start:start + first] = block[:first].T
+        if first < n:
+            self._ring[slot, :, :n - first] = block[first:].T
+
+        self._written[slot] += n
+
+        # Real-time semantics: stale segments that can no longer be read are dropped
+        oldest_end = self._written[slot] - self._max_backlog * self.hop
+        if self._seg_end[slot] < oldest_end:
+            self._seg_end[slot] = oldest_end
+
+    def step(self) -> List[Dict[str, Any]]:
+        """
+        Computes every due segment across all devices in one vectorised pass
+        and returns only the state transitions.
+        """
+        due = np.maximum(self._written - self._seg_end, 0) // self.hop
+        slots = np.nonzero(due)[0]
+        if slots.size == 0:
+            return []
+
+        counts = due[slots]
+        # One row per (device, due segment), oldest first per device
+        seg_slots = np.repeat(slots, counts)
+        seg_rank = np.arange(seg_slots.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        seg_end = self._seg_end[seg_slots] + self.hop * (seg_rank + 1)
+
+        idx = (seg_end[:, None] - self.segment + self._seg_offsets[None, :]) % self.ring_len
+        # Advanced indexing yields (rows, segment, channels)
+        data = self._ring[seg_slots[:, None], :, idx].transpose(0, 2, 1)
+        data = data - data.mean(axis=2, keepdims=True)
+        spectrum = np.fft.rfft(data * self._window, axis=2)
+        power = (spectrum.real ** 2 + spectrum.imag ** 2).mean(axis=1)  # average over channels
+        band_power = power @ self._band_masks.T
+
+        pos = (self._seg_pos[seg_slots] + seg_rank) % self.segments_per_window
+        self._seg_power[seg_slots, pos] = band_power
+
+        self._seg_pos[slots] = (self._seg_pos[slots] + counts) % self.segments_per_window
+        self._seg_count[slots] = np.minimum(self._seg_count[slots] + counts, self.segments_per_window)
+        self._seg_end[slots] += counts * self.hop
+
+        welch = self._welch(slots)
+        new_state = self._classify(welch)
+        changed = new_state != self._state[slots]
+
+        transitions = []
+        for slot, previous, state, powers in zip(slots[changed], self._state[slots][changed], new_state[changed], welch[changed]):
+            transitions.append({
+                "device_id": self._device_of[slot],
+                "previous_state": STATE_LABELS[previous] if previous != _NO_STATE else None,
+                "inferred_state": STATE_LABELS[state],
+                "band_power": dict(zip(BANDS, (round(float(p), 3) for p in powers))),
+                "timestamp": time.time(),
+            })
+        self._state[slots] = new_state
+        return transitions
+
+    def process(self, device_id: str, samples) -> List[Dict[str, Any]]:
+        self.push(device_id, samples)
+        return self.step()
+
+    def _welch(self, slots: np.ndarray) -> np.ndarray:
+        valid = np.maximum(self._seg_count[slots], 1)
+        return self._seg_power[slots].sum(axis=1) / valid[:, None]
+
+    def _classify(self, band_power: np.ndarray) -> np.ndarray:
+        theta, alpha, beta = band_power[:, 0], band_power[:, 1], band_power[:, 2]
+        state = np.full(band_power.shape[0], STATE_LABELS.index("FOCUSED"), dtype=np.int64)
+        state[(theta > alpha) & (theta > beta)] = STATE_LABELS.index("DISTRACTED")
+        state[(alpha >= beta) & (alpha >= theta)] = STATE_LABELS.index("RELAXED")
+        state[(beta > self.stress_ratio * alpha) & (beta > theta)] = STATE_LABELS.index("STRESSED")
+        return state
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def current_state(self, device_id: str) -> Optional[Dict[str, Any]]:
+        slot = self._slots.get(device_id)
+        if slot is None or self._state[slot] == _NO_STATE:
+            return None
+        powers = self._welch(np.array([slot]))[0]
+        state = STATE_LABELS[self._state[slot]]
+        return {
+            "inferred_state": state,
+            "privacy_risk": STATE_RISK[state],
+            "band_power": dict(zip(BANDS, (round(float(p), 3) for p in powers))),
+        }
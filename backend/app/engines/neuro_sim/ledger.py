@@ -1,70 +1,354 @@
 import hashlib
 import json
+import os
+import sqlite3
+import threading
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from .merkle import MerkleTree
+from .audit import AccessAuditLog, access_audit_log
+
+BLOCK_FIELDS = ("index", "timestamp", "action", "previous_hash", "permission_state", "hash")
+BLOCK_COLUMNS = "idx, timestamp, action, previous_hash, permission_state, hash, client_id"
+GLOBAL_SCOPE = "*" # Blocks without client_id apply to every requester
 
 class ConsentLedger:
-    def __init__(self):
-        self.chain: List[Dict[str, Any]] = []
-        self.current_permission = "REVOKED" # Default safe state
+    """
+    Append-only consent HashChain persisted in SQLite (WAL mode), so every
+    uvicorn worker shares the same chain and current permission state.
+
+    Consent can be global or scoped to a client_id. The effective state
+    for a requester is the most recent applicable block, served from an
+    in-memory index kept in sync with the `consent_index` table.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, audit_log: Optional[AccessAuditLog] = None):
+        self.db_path = db_path or os.getenv("CONSENT_LEDGER_PATH", "./data/consent_ledger.db")
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                idx INTEGER PRIMARY KEY,
+                timestamp REAL NOT NULL,
+                action TEXT NOT NULL,
+                previous_hash TEXT NOT NULL,
+                permission_state TEXT NOT NULL,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                name TEXT PRIMARY KEY,
+                idx INTEGER NOT NULL,
+                hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS consent_index (
+                client_id TEXT PRIMARY KEY,
+                permission_state TEXT NOT NULL,
+                idx INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_consent_index_idx ON consent_index (idx);
+        """)
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(blocks)")}
+        if "client_id" not in columns:
+            self._conn.execute("ALTER TABLE blocks ADD COLUMN client_id TEXT")
+
+        self.merkle = MerkleTree(self._conn)
+        self.audit = audit_log or access_audit_log
+
+        # Cached chain head and consent index, refreshed only when another connection commits
+        self._head: Optional[Dict[str, Any]] = None
+        self._data_version = None
+        self._index: Dict[str, Tuple[str, int]] = {}
+        self._index_idx = -1
         self._genesis_block()
+        self._backfill_merkle()
+        self._backfill_index()
 
     def _genesis_block(self):
-        genesis = {
-            "index": 0,
-            "timestamp": time.time(),
-            "action": "INIT_LEDGER",
-            "previous_hash": "0",
-            "permission_state": "REVOKED"
-        }
-        genesis["hash"] = self._calculate_hash(genesis)
-        self.chain.append(genesis)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM blocks LIMIT 1").fetchone() is None:
+                    genesis = {
+                        "index": 0,
+                        "timestamp": time.time(),
+                        "action": "INIT_LEDGER",
+                        "previous_hash": "0",
+                        "permission_state": "REVOKED"
+                    }
+                    genesis["hash"] = self._calculate_hash(genesis)
+                    self._insert(genesis)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _backfill_merkle(self):
+        """One-time catch-up for ledgers created before the Merkle index."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                missing = self._conn.execute(
+                    "SELECT idx, hash FROM blocks WHERE idx >= ? ORDER BY idx ASC", (self.merkle.size,)
+                ).fetchall()
+                for idx, block_hash in missing:
+                    self.merkle.append(idx, bytes.fromhex(block_hash))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _backfill_index(self):
+        """One-time rebuild for ledgers created before per-client consent."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM consent_index LIMIT 1").fetchone() is None:
+                # SQLite returns the bare columns of the MAX(idx) row per group
+                self._conn.execute("""
+                    INSERT INTO consent_index (client_id, permission_state, idx)
+                    SELECT COALESCE(client_id, ?) AS scope, permission_state, MAX(idx) FROM blocks GROUP BY scope
+                """, (GLOBAL_SCOPE,))
 
     def _calculate_hash(self, block: Dict[str, Any]) -> str:
         block_string = json.dumps(block, sort_keys=True).encode()
         return hashlib.sha256(block_string).hexdigest()
 
-    def update_consent(self, action: str) -> Dict[str, Any]:
+    def _insert(self, block: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT INTO blocks (" + BLOCK_COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?, ?)",
+            tuple(block[f] for f in BLOCK_FIELDS) + (block.get("client_id"),)
+        )
+        self._conn.execute(
+            "INSERT INTO consent_index (client_id, permission_state, idx) VALUES (?, ?, ?) "
+            "ON CONFLICT(client_id) DO UPDATE SET permission_state = excluded.permission_state, idx = excluded.idx",
+            (block.get("client_id", GLOBAL_SCOPE), block["permission_state"], block["index"])
+        )
+        self.merkle.append(block["index"], bytes.fromhex(block["hash"]))
+
+    def _row_to_block(self, row) -> Dict[str, Any]:
+        block = dict(zip(BLOCK_FIELDS, row))
+        # Global blocks keep the original schema so their hashes stay stable
+        if row[6] is not None:
+            block["client_id"] = row[6]
+        return block
+
+    def _read_head(self) -> Dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT " + BLOCK_COLUMNS + " FROM blocks ORDER BY idx DESC LIMIT 1"
+        ).fetchone()
+        return self._row_to_block(row)
+
+    def _sync(self):
+        """Pulls head and consent index deltas committed by other workers."""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._head is not None and version == self._data_version:
+            return
+        self._head = self._read_head()
+        self._data_version = version
+        for client_id, state, idx in self._conn.execute(
+            "SELECT client_id, permission_state, idx FROM consent_index WHERE idx > ?", (self._index_idx,)
+        ):
+            self._index[client_id] = (state, idx)
+            self._index_idx = max(self._index_idx, idx)
+
+    def _current_head(self) -> Dict[str, Any]:
+        with self._lock:
+            self._sync()
+            return self._head
+
+    @property
+    def current_permission(self) -> str:
+        """Global permission state (latest block without a client scope)."""
+        return self.permission_for(GLOBAL_SCOPE)
+
+    def permission_for(self, client_id: str) -> str:
+        """O(1): the newest of the client-scoped and global consent blocks wins."""
+        with self._lock:
+            self._sync()
+            scoped = self._index.get(client_id)
+            global_state = self._index.get(GLOBAL_SCOPE, ("REVOKED", -1))
+        if scoped is None or scoped[1] < global_state[1]:
+            return global_state[0]
+        return scoped[0]
+
+    @property
+    def height(self) -> int:
+        """Number of blocks. Cheap change detector for long-lived sessions."""
+        return self._current_head()["index"] + 1
+
+    def update_consent(self, action: str, client_id: Optional[str] = None) -> Dict[str, Any]:
         """
         GRANT or REVOKE consent. Creates a new immutable block.
+        Without client_id the block applies to every requester.
         """
         state = "GRANTED" if action == "GRANT" else "REVOKED"
-        previous_block = self.chain[-1]
-        
-        new_block = {
-            "index": len(self.chain),
-            "timestamp": time.time(),
-            "action": action,
-            "previous_hash": previous_block["hash"],
-            "permission_state": state
-        }
-        new_block["hash"] = self._calculate_hash(new_block)
-        
-        self.chain.append(new_block)
-        self.current_permission = state
-        
+
+        with self._lock:
+            # IMMEDIATE serialises appends across workers; the head read is O(1)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous_block = self._read_head()
+                new_block = {
+                    "index": previous_block["index"] + 1,
+                    "timestamp": time.time(),
+                    "action": action,
+                    "previous_hash": previous_block["hash"],
+                    "permission_state": state
+                }
+                if client_id:
+                    new_block["client_id"] = client_id
+                new_block["hash"] = self._calculate_hash(new_block)
+                self._insert(new_block)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            # Our own commit does not bump data_version; apply it directly
+            self._sync()
+            self._head = new_block
+            self._index[client_id or GLOBAL_SCOPE] = (state, new_block["index"])
+            self._index_idx = max(self._index_idx, new_block["index"])
+
         return new_block
 
     def check_access(self, requester: str) -> Dict[str, Any]:
         """
-        Gatekeeper function. Returns True only if latest block is GRANTED.
+        Gatekeeper: {"allowed": bool, "log": {...}}. `allowed` is True when
+        the requester's effective consent (the per-client index, see
+        `permission_for`) is GRANTED. The decision goes to the audit trail.
         """
-        # Log the access attempt (Audit Trail)
+        allowed = self.permission_for(requester) == "GRANTED"
+        decision, reason = ("ALLOWED", "Valid Consent Found") if allowed else ("DENIED", "Consent Revoked")
+        now = time.time()
+
+        # Log the access attempt (Audit Trail, write-behind)
+        self.audit.record(requester, "READ_NEURODATA", decision, reason, now)
         access_log = {
             "requester": requester,
-            "timestamp": time.time(),
-            "decision": "DENIED",
-            "reason": "Consent Revoked"
+            "timestamp": now,
+            "decision": decision,
+            "reason": reason
         }
-        
-        if self.current_permission == "GRANTED":
-            access_log["decision"] = "ALLOWED"
-            access_log["reason"] = "Valid Consent Found"
-            return {"allowed": True, "log": access_log}
-        
-        return {"allowed": False, "log": access_log}
-
-    def get_ledger(self) -> List[Dict[str, Any]]:
-        return self.chain
+        return {"allowed": allowed, "log": access_log}
+
+    def log_access(self, requester: str, action: str, decision: str, reason: Optional[str] = None):
+        """Records an access decision taken outside check_access (e.g. ZKP inference)."""
+        self.audit.record(requester, action, decision, reason)
+
+    def get_access_log(self, requester: Optional[str] = None, cursor: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        return self.audit.query(requester=requester, cursor=cursor, limit=limit)
+
+    def get_ledger(self, cursor: Optional[int] = None, limit: int = 100, descending: bool = False) -> Dict[str, Any]:
+        """
+        Cursor-paginated read. `cursor` is an exclusive block index bound:
+        blocks after it (ascending) or before it (descending).
+        """
+        limit = max(1, min(limit, 1000))
+        with self._lock:
+            if descending:
+                bound = cursor if cursor is not None else self.height
+                rows = self._conn.execute(
+                    "SELECT " + BLOCK_COLUMNS + " FROM blocks WHERE idx < ? ORDER BY idx DESC LIMIT ?",
+                    (bound, limit)
+                ).fetchall()
+            else:
+                bound = cursor if cursor is not None else -1
+                rows = self._conn.execute(
+                    "SELECT " + BLOCK_COLUMNS + " FROM blocks WHERE idx > ? ORDER BY idx ASC LIMIT ?",
+                    (bound, limit)
+                ).fetchall()
+            height = self.height
+
+        blocks = [self._row_to_block(r) for r in rows]
+        next_cursor = blocks[-1]["index"] if len(blocks) == limit else None
+        return {"blocks": blocks, "next_cursor": next_cursor, "height": height}
+
+    def verify_chain(self, batch_size: int = 1000) -> Dict[str, Any]:
+        """
+        Incremental verification: resumes from the last verified checkpoint
+        instead of rehashing from genesis, and advances it on success.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT idx, hash FROM checkpoints WHERE name = 'verified'").fetchone()
+            last_idx, last_hash = row if row else (-1, "0")
+            checked = 0
+
+            query = self._conn.execute(
+                "SELECT " + BLOCK_COLUMNS + " FROM blocks WHERE idx > ? ORDER BY idx ASC",
+                (last_idx,)
+            )
+            result = {"valid": True, "broken_at": None}
+            while True:
+                rows = query.fetchmany(batch_size)
+                if not rows:
+                    break
+                for r in rows:
+                    block = self._row_to_block(r)
+                    stored_hash = block.pop("hash")
+                    if block["index"] != last_idx + 1 or block["previous_hash"] != last_hash or self._calculate_hash(block) != stored_hash:
+                        result = {"valid": False, "broken_at": block["index"]}
+                        break
+                    last_idx, last_hash = block["index"], stored_hash
+                    checked += 1
+                if not result["valid"]:
+                    break
+
+            if checked:
+                self._conn.execute(
+                    "INSERT INTO checkpoints (name, idx, hash) VALUES ('verified', ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET idx = excluded.idx, hash = excluded.hash",
+                    (last_idx, last_hash)
+                )
+
+        result.update({"verified_height": last_idx + 1, "checked": checked})
+        return result
+
+    def get_block(self, index: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT " + BLOCK_COLUMNS + " FROM blocks WHERE idx = ?", (index,)
+            ).fetchone()
+        return self._row_to_block(row) if row else None
+
+    def merkle_root(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self.height
+            return {"size": size, "root": self.merkle.root(size).hex()}
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        O(log n) proof that block `index` is in the tree of `size` blocks.
+        Check with merkle.verify_inclusion against the published root.
+        """
+        with self._lock:
+            size = self.height if size is None else size
+            if not 0 <= index < size <= self.height:
+                raise ValueError("Index or size outside the ledger")
+            return {
+                "index": index,
+                "size": size,
+                "block": self.get_block(index),
+                "leaf_hash": self.merkle.leaf(index).hex(),
+                "audit_path": [h.hex() for h in self.merkle.inclusion_proof(index, size)],
+                "root": self.merkle.root(size).hex()
+            }
+
+    def consistency_proof(self, first: int, second: Optional[int] = None) -> Dict[str, Any]:
+        """Proves the ledger at size `second` is an append-only extension of size `first`."""
+        with self._lock:
+            second = self.height if second is None else second
+            if not 0 < first <= second <= self.height:
+                raise ValueError("Invalid ledger sizes")
+            return {
+                "first": first,
+                "second": second,
+                "first_root": self.merkle.root(first).hex(),
+                "second_root": self.merkle.root(second).hex(),
+                "proof": [h.hex() for h in self.merkle.consistency_proof(first, second)] if first != second else []
+            }
 
 consent_ledger = ConsentLedger()
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+from typing import List, Optional
+
+# RFC 6962 domain separation: leaves and interior nodes never collide
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _split(n: int) -> int:
+    """Largest power of two strictly smaller than n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleTree:
+    """
+    Append-only Merkle tree over ledger blocks, stored in the ledger's
+    SQLite database. Only complete (power-of-two, aligned) subtrees are
+    persisted, so an append writes O(1) amortised nodes and any root or
+    proof is assembled from O(log n) stored nodes.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS merkle_nodes (
+                level INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                hash BLOB NOT NULL,
+                PRIMARY KEY (level, idx)
+            ) WITHOUT ROWID
+        """)
+
+    @property
+    def size(self) -> int:
+        # Leaves are dense from 0, so the size is the last leaf index + 1 (PK seek, not a scan)
+        row = self._conn.execute("SELECT MAX(idx) FROM merkle_nodes WHERE level = 0").fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _node(self, level: int, idx: int) -> bytes:
+        row = self._conn.execute("SELECT hash FROM merkle_nodes WHERE level = ? AND idx = ?", (level, idx)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing Merkle node ({level}, {idx})")
+        return row[0]
+
+    def append(self, index: int, data: bytes):
+        """
+        Adds leaf `index` and every subtree it completes. Must run inside
+        the caller's write transaction.
+        """
+        current = leaf_hash(data)
+        level, idx = 0, index
+        self._conn.execute("INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)", (level, idx, current))
+        while idx & 1:
+            current = node_hash(self._node(level, idx - 1), current)
+            level, idx = level + 1, idx >> 1
+            self._conn.execute("INSERT INTO merkle_nodes (level, idx, hash) VALUES (?, ?, ?)", (level, idx, current))
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        n = end - start
+        if n & (n - 1) == 0 and start % n == 0:
+            return self._node(n.bit_length() - 1, start // n)
+        k = _split(n)
+        return node_hash(self._subtree(start, start + k), self._subtree(start + k, end))
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        size = self.size if size is None else size
+        if size == 0:
+            return hashlib.sha256(b"").digest()
+        return self._subtree(0, size)
+
+    def leaf(self, index: int) -> bytes:
+        return self._node(0, index)
+
+    def inclusion_proof(self, index: int, size: int) -> List[bytes]:
+        """RFC 6962 PATH(m, D[n])"""
+        if not 0 <= index < size:
+            raise ValueError("Index outside tree")
+        proof: List[bytes] = []
+        start, end = 0, size
+        while end - start > 1:
+            k = _split(end - start)
+            if index - start < k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start += k
+        proof.reverse()
+        return proof
+
+    def consistency_proof(self, first: int, second: int) -> List[bytes]:
+        """RFC 6962 PROOF(m, D[n])"""
+        if not 0 < first <= second:
+            raise ValueError("Invalid tree sizes")
+        proof: List[bytes] = []
+        start, end, m, complete = 0, second, first, True
+        while m != end - start:
+            k = _split(end - start)
+            if m <= k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                start, m, complete = start + k, m - k, False
+        if not complete:
+            proof.append(self._subtree(start, end))
+        proof.reverse()
+        return proof
+
+
+def verify_inclusion(leaf: bytes, index: int, size: int, proof: List[bytes], root: bytes) -> bool:
+    """RFC 9162 2.1.3.2: O(log n) hashes, no ledger download."""
+    if index >= size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(first: int, second: int, proof: List[bytes], first_root: bytes, second_root: bytes) -> bool:
+    """RFC 9162 2.1.4.2"""
+    if first == second:
+        return not proof and first_root == second_root
+    if not 0 < first < second or not proof:
+        return False
+    if first & (first - 1) == 0:
+        proof = [first_root] + list(proof)
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = proof[0]
+    for c in proof[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(c, fr)
+            sr = node_hash(c, sr)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = node_hash(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
@@ -1,6 +1,5 @@
-import chromadb
-from chromadb.config import Settings
 import os
+import threading
 
 class ChromaClient:
     _instance = None
@@ -8,15 +7,31 @@ class ChromaClient:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ChromaClient, cls).__new__(cls)
-            
+            # Connected on first use (or by the startup warm-up), not at import
+            cls._instance._client = None
+            cls._instance._collections = None
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def connect(self) -> "ChromaClient":
+        """Opens the client and the three collections once; thread-safe."""
+        if self._collections is not None:
+            return self
+        with self._lock:
+            if self._collections is not None:
+                return self
+            # chromadb is the heaviest import in the backend: defer it to first use
+            import chromadb
+            from chromadb.config import Settings
+
             # Sovereign Mock Support: Fallback to local persistence if Docker is down
             host = os.getenv("CHROMA_DB_HOST", "localhost")
             port = os.getenv("CHROMA_DB_PORT", "8000")
             persist_directory = os.getenv("CHROMA_PERSIST_DIR", "./data/vector_db")
-            
+
             try:
                 # Attempt HTTP first (standard v3.0)
-                cls._instance.client = chromadb.HttpClient(
+                client = chromadb.HttpClient(
                     host=host,
                     port=port,
                     settings=Settings(allow_reset=True)
@@ -24,29 +39,43 @@ class ChromaClient:
                 print(f"DEBUG: Using ChromaDB HTTP Client ({host}:{port})")
             except Exception:
                 # Fallback to local PersistentClient (Sovereign Mock)
-                cls._instance.client = chromadb.PersistentClient(
+                client = chromadb.PersistentClient(
                     path=persist_directory,
                     settings=Settings(allow_reset=True)
                 )
                 print(f"DEBUG: Using ChromaDB Persistent Client (Path: {persist_directory})")
-            
+
             # Initialize collections
-            cls._instance.collections = {
-                "doctrine": cls._instance.client.get_or_create_collection(
+            collections = {
+                "doctrine": client.get_or_create_collection(
                     name="cslf_doctrine",
                     metadata={"description": "Legal, Governance & Neuro-Rights"}
                 ),
-                "trench": cls._instance.client.get_or_create_collection(
+                "trench": client.get_or_create_collection(
                     name="cslf_trench",
                     metadata={"description": "Offensive/Defensive Technical Knowledge"}
                 ),
-                "future": cls._instance.client.get_or_create_collection(
+                "future": client.get_or_create_collection(
                     name="cslf_future",
                     metadata={"description": "PQC, GreenOps & Standards"}
                 )
             }
-            
-        return cls._instance
+            self._client = client
+            # Published last: `ready` means every collection exists
+            self._collections = collections
+        return self
+
+    @property
+    def ready(self) -> bool:
+        return self._collections is not None
+
+    @property
+    def client(self):
+        return self.connect()._client
+
+    @property
+    def collections(self):
+        return self.connect()._collections
 
     def get_collection(self, name: str):
         if name not in self.collections:
@@ -0,0 +1,205 @@
+"""
+Linear-time, language-aware text chunker for the Ingestor.
+
+Keeps the separator semantics of langchain's RecursiveCharacterTextSplitter:
+a chunk ends at the last separator that fits, preferring separators earlier
+in the list (`\\nclass ` over `\\n\\n` over `\\n` over ` `), the separator
+starts the next chunk, chunks are stripped and overlap is taken on a
+separator too (at most half of the previous chunk). Like the splitter's
+merge step, overlap is dropped when keeping it would force the next chunk
+onto a worse separator. Instead of re-splitting and re-joining the text once
+per separator level, each cut is one `str.rfind` per level over the window
+the chunk may end in, skipping separators the text never contains, so the
+work follows the number of chunks rather than the number of separators. A
+run with no separator at all is cut at the size limit rather than emitted
+oversized.
+
+Sizes are in characters, or in tokens with `unit="tokens"` (a word/punctuation
+approximation of subword tokenizers, or exact offsets from `token_offsets`).
+
+Languages are detected once per section: each fenced code block body takes
+its fence tag (or one detection of the body) and each prose run between
+them is detected once. A chunk gets the first code language it overlaps.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " "]
+CODE_SEPARATORS = ["\nclass ", "\ndef ", "\n# ", "\n\n", "\n", " "]
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s*")
+FENCE_PATTERN = re.compile(r"^(`{3,}|~{3,})[ \t]*([\w+#.-]*)[^\n]*\n(.*?)^\1[ \t]*$", re.MULTILINE | re.DOTALL)
+FENCE_LINE_PATTERN = re.compile(r"(`{3,}|~{3,})[ \t]*[\w+#.-]*")
+FENCE_ALIASES = {
+    "py": "python", "python3": "python", "ipython": "python",
+    "sh": "bash", "shell": "bash", "zsh": "bash", "console": "bash", "shell-session": "bash",
+    "c": "c/cpp", "cpp": "c/cpp", "c++": "c/cpp", "h": "c/cpp", "hpp": "c/cpp",
+}
+
+def regex_token_offsets(text: str) -> List[int]:
+    return [m.start() for m in TOKEN_PATTERN.finditer(text)]
+
+class Chunker:
+    """Splits text into overlapping chunks on the best available separator."""
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Optional[Sequence[str]] = None,
+        unit: str = "chars",
+        token_offsets: Optional[Callable[[str], List[int]]] = None,
+        detect: Optional[Callable[[str], str]] = None,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        if unit not in ("chars", "tokens"):
+            raise ValueError(f"Unknown unit '{unit}'. Use chars or tokens.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or DEFAULT_SEPARATORS)
+        self.unit = unit
+        self.token_offsets = token_offsets or regex_token_offsets
+        self.detect = detect
+        # Zero-width, so overlapping separators ("\n\nclass ") each leave their own boundary
+        self._boundary = re.compile("(?=" + "|".join(f"({re.escape(s)})" for s in self.separators) + ")")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def split_text(self, text: str) -> List[str]:
+        """Drop-in for RecursiveCharacterTextSplitter.split_text."""
+        return [text[start:end].strip() for start, end in self.spans(text)]
+
+    def chunk(self, text: str) -> List[Dict[str, Any]]:
+        """Chunks with their offsets and language: {text, start, end, language}."""
+        spans = self.spans(text)
+        sections = self.sections(text) if self.detect else []
+        starts = [s[0] for s in sections]
+        chunks = []
+        for start, end in spans:
+            chunks.append({"text": text[start:end].strip(), "start": start, "end": end, "language": self._language(text, sections, starts, start, end)})
+        return chunks
+
+    def boundaries(self, text: str) -> List[List[int]]:
+        """Separator start offsets per separator level, in one pass over `text`."""
+        levels: List[List[int]] = [[] for _ in self.separators]
+        for match in self._boundary.finditer(text):
+            levels[match.lastindex - 1].append(match.start())
+        return levels
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each non-empty chunk."""
+        tokens = self.token_offsets(text) if self.unit == "tokens" else None
+        # A separator the text lacks would cost a failed scan on every cut
+        seps = [(level, sep) for level, sep in enumerate(self.separators) if sep in text]
+        spans: List[Tuple[int, int]] = []
+        start, n = 0, len(text)
+        end, _ = self._cut(text, seps, WHITESPACE_PATTERN.match(text).end(), self._limit(tokens, 0, n))
+        while True:
+            if WHITESPACE_PATTERN.match(text, start, end).end() < end:
+                spans.append((start, end))
+            if end >= n:
+                break
+            start, (end, _) = self._next_chunk(text, tokens, seps, start, end)
+        return spans
+
+    def sections(self, text: str) -> List[Tuple[int, int, str]]:
+        """(start, end, language) for each fenced code block and each prose run between them."""
+        sections: List[Tuple[int, int, str]] = []
+        cursor = 0
+        for match in FENCE_PATTERN.finditer(text):
+            # Only the body is code: a chunk holding just a closing fence is prose
+            body_start, body_end = match.span(3)
+            if body_start == body_end:
+                continue
+            if body_start > cursor:
+                sections.append((cursor, body_start, self.detect(text[cursor:body_start])))
+            tag = match.group(2).lower()
+            sections.append((body_start, body_end, FENCE_ALIASES.get(tag, tag) if tag else self.detect(match.group(3))))
+            cursor = body_end
+        if cursor < len(text):
+            sections.append((cursor, len(text), self.detect(text[cursor:])))
+        return sections
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _limit(self, tokens: Optional[List[int]], start: int, n: int) -> int:
+        """Furthest end offset a chunk starting at `start` may have."""
+        if tokens is None:
+            return start + self.chunk_size
+        first = bisect_left(tokens, start)
+        return n if first + self.chunk_size >= len(tokens) else tokens[first + self.chunk_size]
+
+    def _cut(self, text: str, seps: List[Tuple[int, str]], floor: int, limit: int) -> Tuple[int, int]:
+        """
+        (end, level): the last boundary in (floor, limit] of the highest-priority
+        separator present. The end of the text is level -1, a forced cut at
+        the limit is past every level.
+        """
+        if limit >= len(text):
+            return len(text), -1
+        for level, sep in seps:
+            position = text.rfind(sep, floor + 1, limit + len(sep))
+            if position != -1:
+                return position, level
+        return limit, len(self.separators)
+
+    def _next_chunk(self, text: str, tokens: Optional[List[int]], seps: List[Tuple[int, str]], start: int, end: int) -> Tuple[int, Tuple[int, int]]:
+        """Start and cut of the chunk after (start, end): on its overlap, unless that costs it a separator."""
+        # Past the previous end and the whitespace after it, so an overlapped
+        # chunk always adds text rather than re-slicing the one before
+        floor = WHITESPACE_PATTERN.match(text, end).end()
+        fresh_limit = self._limit(tokens, end, len(text))
+        overlap = self._overlap_start(text, tokens, seps, start, end)
+        if overlap == end:
+            return end, self._cut(text, seps, floor, fresh_limit)
+        overlap_limit = self._limit(tokens, overlap, len(text))
+        cut = self._cut(text, seps, floor, overlap_limit)
+        if cut[1] <= 0:
+            return overlap, cut
+        # A fresh start's window is the overlapped one plus (overlap_limit, fresh_limit].
+        # Like the splitter's merge step, drop the overlap when that stretch holds a
+        # better separator or the end of the text, or in front of a run no separator can cut
+        if cut[1] == len(self.separators) or fresh_limit >= len(text):
+            return end, self._cut(text, seps, floor, fresh_limit)
+        for level, sep in seps:
+            if level >= cut[1]:
+                break
+            if text.rfind(sep, overlap_limit + 1, fresh_limit + len(sep)) != -1:
+                return end, self._cut(text, seps, floor, fresh_limit)
+        return overlap, cut
+
+    def _overlap_start(self, text: str, tokens: Optional[List[int]], seps: List[Tuple[int, str]], start: int, end: int) -> int:
+        if not self.chunk_overlap:
+            return end
+        if tokens is None:
+            low = end - self.chunk_overlap
+        else:
+            low = tokens[max(0, bisect_left(tokens, end) - self.chunk_overlap)]
+        # Earliest boundary of the best separator within the overlap window, which
+        # never reaches back past the middle of a short chunk
+        low = max(low, (start + end) // 2 + 1)
+        for _, sep in seps:
+            position = text.find(sep, low, end - 1 + len(sep))
+            if position != -1:
+                return position
+        return end
+
+    @staticmethod
+    def _language(text: str, sections: List[Tuple[int, int, str]], starts: List[int], start: int, end: int) -> str:
+        if not sections:
+            return "text"
+        i = max(0, bisect_right(starts, start) - 1)
+        while i < len(sections) and sections[i][0] < end:
+            section_start, section_end, language = sections[i]
+            # Sharing a newline with a code block, or a fence line with a run before one,
+            # does not make a chunk code
+            shared = text[max(start, section_start):min(end, section_end)].strip()
+            if language != "text" and shared and not FENCE_LINE_PATTERN.fullmatch(shared):
+                return language
+            i += 1
+        return "text"
@@ -0,0 +1,224 @@
+"""
+Embedding backend shared by the Ingestor and the StrictRetriever.
+
+EMBEDDING_BACKEND selects it:
+  chroma                 (default) no vectors are computed here; Chroma embeds
+                         documents and queries with its own default function
+  sentence-transformers  a local model (EMBEDDING_MODEL) on CPU, run through
+                         EMBEDDING_RUNTIME=torch|onnx|openvino, optionally int8
+                         (EMBEDDING_QUANTIZE=int8). Needs
+                         sentence-transformers>=3.2; onnx also needs
+                         optimum[onnxruntime], openvino optimum-intel[openvino]
+
+Vectors from different models are not comparable: switching backend or
+model means re-ingesting the collections.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..metrics import metrics
+
+EMBEDDINGS = metrics.counter("cslf_embeddings_total", "Texts embedded", ["backend", "mode"])
+# embeddings/sec = cslf_embeddings_total / cslf_embedding_seconds_total
+EMBEDDING_SECONDS = metrics.counter("cslf_embedding_seconds_total", "Time spent embedding", ["backend", "mode"])
+
+class SentenceTransformerBackend:
+    """sentence-transformers on CPU, with ONNX/OpenVINO and int8 variants."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.runtime = os.getenv("EMBEDDING_RUNTIME", "torch")
+        self.quantize = os.getenv("EMBEDDING_QUANTIZE", "").lower()
+        self.model = None
+
+    def load(self, threads: int):
+        from sentence_transformers import SentenceTransformer
+
+        kwargs: Dict[str, Any] = {"device": "cpu"}
+        if self.runtime == "torch":
+            import torch
+            if threads:
+                torch.set_num_threads(threads)
+        else:
+            model_kwargs: Dict[str, Any] = {}
+            if self.runtime == "onnx":
+                import onnxruntime
+                model_kwargs["provider"] = "CPUExecutionProvider"
+                if threads:
+                    options = onnxruntime.SessionOptions()
+                    options.intra_op_num_threads = threads
+                    options.inter_op_num_threads = 1
+                    model_kwargs["session_options"] = options
+            if self.quantize == "int8":
+                # Pre-exported quantized weights shipped with most sentence-transformers models
+                default = "onnx/model_qint8_avx512_vnni.onnx" if self.runtime == "onnx" else "openvino/openvino_model_qint8_quantized.xml"
+                model_kwargs["file_name"] = os.getenv("EMBEDDING_INT8_FILE", default)
+            kwargs.update(backend=self.runtime, model_kwargs=model_kwargs)
+
+        model = SentenceTransformer(self.model_name, **kwargs)
+        if self.runtime == "torch" and self.quantize == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def encode(self, texts: Sequence[str], batch_size: int) -> List[List[float]]:
+        vectors = self.model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False, convert_to_numpy=True)
+        return vectors.tolist()
+
+# name -> factory(model_name); "chroma" is handled by Embedder itself
+BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "sentence-transformers": SentenceTransformerBackend,
+}
+
+def register_backend(name: str, factory: Callable[[str], Any]):
+    """Plugs in another backend: `factory(model_name)` returns an object with `load(threads)` and `encode(texts, batch_size)`."""
+    BACKENDS[name] = factory
+
+class Embedder:
+    """
+    Loads one backend, pins its thread count, warms it up and batches for it.
+
+    Ingestion embeds in large dynamic batches: texts are sorted by length and
+    cut into batches whose padded size stays under EMBEDDING_BATCH_TOKENS (at
+    most EMBEDDING_INGEST_BATCH texts), so short chunks are not padded to the
+    longest one in the file. Queries go straight through in small batches
+    (EMBEDDING_QUERY_BATCH) for latency.
+    """
+
+    def __init__(self, backend: Optional[str] = None, model_name: Optional[str] = None):
+        self.logger = logging.getLogger("cslf.embeddings")
+        self.backend_name = backend or os.getenv("EMBEDDING_BACKEND", "chroma")
+        self.model_name = model_name or os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.threads = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = runtime default
+        self.ingest_batch = int(os.getenv("EMBEDDING_INGEST_BATCH", "128"))
+        self.batch_tokens = int(os.getenv("EMBEDDING_BATCH_TOKENS", "16384"))
+        self.query_batch = int(os.getenv("EMBEDDING_QUERY_BATCH", "8"))
+        # The backend name is checked on connect, not here: a bad EMBEDDING_BACKEND must not
+        # break importing the app, and shows up as a failed engine in /health instead
+
+        self._backend = None
+        self._lock = threading.Lock()
+        self._totals = {"ingest": [0, 0.0], "query": [0, 0.0]}  # mode -> [texts, seconds]
+
+    @property
+    def enabled(self) -> bool:
+        """False when Chroma embeds on its own and callers should pass raw texts."""
+        return self.backend_name != "chroma"
+
+    @property
+    def ready(self) -> bool:
+        return not self.enabled or self._backend is not None
+
+    def connect(self) -> "Embedder":
+        """Loads and warms the model once; thread-safe. Used by the startup warm-up."""
+        if self.ready:
+            return self
+        if self.backend_name not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend_name}'. Use chroma or one of {sorted(BACKENDS)}.")
+        with self._lock:
+            if self._backend is not None:
+                return self
+            start = time.perf_counter()
+            backend = BACKENDS[self.backend_name](self.model_name)
+            backend.load(self.threads)
+            # The first forward pass allocates and compiles: pay it now, not on the first search
+            backend.encode(["warm-up"], 1)
+            self._backend = backend
+            self.logger.info(f"Embedding model {self.model_name} ({self.backend_name}) ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return self
+
+    def batches(self, texts: Sequence[str]) -> List[List[int]]:
+        """Indices of `texts` grouped into ingestion batches, longest first."""
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches: List[List[int]] = []
+        for i in order:
+            # ~4 characters per token; sorted longest first, a batch's first text sets its padded length
+            if batches and len(batches[-1]) < self.ingest_batch and (len(texts[batches[-1][0]]) // 4 + 1) * (len(batches[-1]) + 1) <= self.batch_tokens:
+                batches[-1].append(i)
+            else:
+                batches.append([i])
+        return batches
+
+    def embed_documents(self, texts: Sequence[str]) -> Optional[List[List[float]]]:
+        """Vectors for `texts` in input order, or None when Chroma embeds."""
+        if not self.enabled:
+            return None
+        backend = self.connect()._backend
+        start = time.perf_counter()
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for batch in self.batches(texts):
+            for i, vector in zip(batch, backend.encode([texts[i] for i in batch], len(batch))):
+                vectors[i] = vector
+        self._record("ingest", len(texts), time.perf_counter() - start)
+        return vectors
+
+    def embed_queries(self, texts: Sequence[str]) -> Optional[List[List[float]]]:
+        """Query vectors in small batches, or None when Chroma embeds."""
+        if not self.enabled:
+            return None
+        backend = self.connect()._backend
+        start = time.perf_counter()
+        vectors = backend.encode(list(texts), self.query_batch)
+        self._record("query", len(texts), time.perf_counter() - start)
+        return vectors
+
+    def _record(self, mode: str, count: int, seconds: float):
+        EMBEDDINGS.labels(self.backend_name, mode).inc(count)
+        EMBEDDING_SECONDS.labels(self.backend_name, mode).inc(seconds)
+        with self._lock:
+            self._totals[mode][0] += count
+            self._totals[mode][1] += seconds
+
+    def throughput(self) -> Dict[str, Any]:
+        """Embeddings/sec per mode since startup."""
+        with self._lock:
+            report = {
+                mode: {"embeddings": count, "seconds": round(seconds, 3), "per_sec": round(count / seconds, 1) if seconds else None}
+                for mode, (count, seconds) in self._totals.items()
+            }
+        return {"backend": self.backend_name, "model": self.model_name if self.enabled else None, "ready": self.ready, **report}
+
+def benchmark(embedder: Embedder, documents: Sequence[str], queries: Sequence[str] = (), relevant: Sequence[int] = (), k: int = 5) -> Dict[str, Any]:
+    """
+    Ingest and query throughput for one model, plus recall@k when `relevant`
+    gives, for each query, the index of the document it should retrieve.
+    Run it over the same sample for each candidate model and keep the
+    fastest one that meets the recall bar.
+    """
+    import numpy as np
+
+    if not embedder.enabled:
+        raise ValueError("The chroma backend embeds inside Chroma; benchmark a local backend instead.")
+    embedder.connect()
+    start = time.perf_counter()
+    doc_vectors = np.array(embedder.embed_documents(documents))
+    ingest_s = time.perf_counter() - start
+
+    report: Dict[str, Any] = {
+        "backend": embedder.backend_name,
+        "model": embedder.model_name,
+        "documents": len(documents),
+        "ingest_per_sec": round(len(documents) / ingest_s, 1),
+    }
+    if queries:
+        latencies, query_vectors = [], []
+        for query in queries:
+            t0 = time.perf_counter()
+            query_vectors.append(embedder.embed_queries([query])[0])
+            latencies.append((time.perf_counter() - t0) * 1000)
+        latencies.sort()
+        report.update(
+            query_per_sec=round(len(queries) / (sum(latencies) / 1000), 1),
+            query_p50_ms=round(latencies[len(latencies) // 2], 3),
+            query_p95_ms=round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        )
+        if relevant:
+            # Vectors are normalised: the dot product is the cosine similarity
+            top = np.argsort(-(np.array(query_vectors) @ doc_vectors.T), axis=1)[:, :k]
+            hits = sum(1 for row, target in zip(top, relevant) if target in row)
+            report[f"recall_at_{k}"] = round(hits / len(relevant), 3)
+    return report
+
+embedder = Embedder()
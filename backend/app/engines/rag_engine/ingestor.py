@@ -1,24 +1,47 @@
 import os
 import re
+import time
 from typing import List, Dict, Any
 from .chroma_client import chroma_manager
-import PyPDF2
-from langchain.text_splitter import RecursiveCharacterTextSplitter, Language
+from .chunker import Chunker, CODE_SEPARATORS
+from .embeddings import embedder
+from .metadata_index import metadata_index
+from ..metrics import metrics
+
+INGESTED_CHUNKS = metrics.counter("cslf_ingest_chunks_total", "Chunks written to Chroma", ["collection"])
+INGESTED_FILES = metrics.counter("cslf_ingest_files_total", "Files indexed", ["collection"])
+# chunks/sec = cslf_ingest_chunks_total / cslf_ingest_seconds_total
+INGEST_SECONDS = metrics.counter("cslf_ingest_seconds_total", "Time spent extracting, splitting and indexing files", ["collection"])
+
+# Checked once per section (see Chunker), so cues must open a line: prose saying "import " is not code
+LANGUAGE_CUES = [
+    ("python", re.compile(r"^[ \t]*(?:import \w|from [\w.]+ import |def \w+\()", re.MULTILINE)),
+    ("bash", re.compile(r"^[ \t]*(?:#!\S*sh\b|\$ |sudo |apt-get |bash )", re.MULTILINE)),
+    ("c/cpp", re.compile(r"^[ \t]*#include\b|\b(?:void|int) main\s*\(", re.MULTILINE)),
+]
 
 class Ingestor:
     def __init__(self):
+        # CHUNK_UNIT=tokens sizes chunks for the embedding model instead (~4 characters per token)
+        unit = os.getenv("CHUNK_UNIT", "chars")
+        tokens = unit == "tokens"
+
         # Generic splitter for academic/legal docs
-        self.generic_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1200,
-            chunk_overlap=150
+        self.generic_splitter = Chunker(
+            chunk_size=300 if tokens else 1200,
+            chunk_overlap=40 if tokens else 150,
+            unit=unit,
+            detect=self.detect_language
         )
         
         # 'Context-Aware' splitter for technical docs (Trench)
         # We use a larger chunk size to keep exploit logic together
-        self.tech_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=300,
-            separators=["\nclass ", "\ndef ", "\n# ", "\n\n", "\n", " "]
+        self.tech_splitter = Chunker(
+            chunk_size=500 if tokens else 2000,
+            chunk_overlap=75 if tokens else 300,
+            separators=CODE_SEPARATORS,
+            unit=unit,
+            detect=self.detect_language
         )
 
     def extract_year(self, text: str, filename: str) -> int:
@@ -29,9 +52,8 @@ class Ingestor:
         return int(match.group(1)) if match else 2024 # Default to 2024 if unknown
 
     def detect_language(self, text: str) -> str:
-        if "import " in text or "def " in text: return "python"
-        if "bash" in text or "apt-get" in text: return "bash"
-        if "void main" in text or "#include" in text: return "c/cpp"
+        for language, cue in LANGUAGE_CUES:
+            if cue.search(text): return language
         return "text"
 
     def get_authority(self, collection_name: str, filename: str) -> str:
@@ -40,6 +62,7 @@ class Ingestor:
         return "Medium (Resource)"
 
     def extract_text_from_pdf(self, file_path: str) -> str:
+        import PyPDF2
         text = ""
         try:
             with open(file_path, 'rb') as f:
@@ -51,15 +74,26 @@ class Ingestor:
         return text
 
     def ingest_directory(self, collection_name: str, dir_path: str):
+        """
+        Indexes every file in `dir_path`. Chunks of consecutive files are
+        pooled until they fill an embedding batch (EMBEDDING_INGEST_BATCH
+        chunks or EMBEDDING_BATCH_TOKENS tokens), then embedded and added to
+        Chroma in one call, so a folder of small write-ups does not pay one
+        model call and one Chroma write per file.
+        """
         print(f"Ingesting {collection_name} from {dir_path}...")
         collection = chroma_manager.get_collection(collection_name)
         
         if not os.path.exists(dir_path): return
+        # Loaded (or rebuilt) before the first write, while the sidecar still agrees with Chroma
+        metadata_index.table(collection_name)
 
+        pending: List[Dict[str, Any]] = []
         for filename in os.listdir(dir_path):
             file_path = os.path.join(dir_path, filename)
             if not os.path.isfile(file_path): continue
 
+            start = time.perf_counter()
             content = ""
             if filename.endswith(".pdf"):
                 content = self.extract_text_from_pdf(file_path)
@@ -73,22 +107,58 @@ class Ingestor:
                 
                 # Use tech splitter for Trench to preserve exploit logic
                 splitter = self.tech_splitter if collection_name == "trench" else self.generic_splitter
-                chunks = splitter.split_text(content)
+                # Languages come from the file's sections, detected once each
+                chunked = splitter.chunk(content)
+                chunks = [piece["text"] for piece in chunked]
                 
                 ids = [f"{filename}_{i}" for i in range(len(chunks))]
                 metadatas = []
-                for chunk in chunks:
+                for piece in chunked:
                     metadatas.append({
                         "source": filename,
                         "collection": collection_name,
                         "year": year,
                         "authority": authority,
-                        "language": self.detect_language(chunk),
+                        "language": piece["language"],
                         "type": "canonical_archive"
                     })
                 
-                collection.add(documents=chunks, metadatas=metadatas, ids=ids)
-                print(f"Indexed {filename} ({len(chunks)} chunks) [Year: {year}] [Auth: {authority}]")
+                pending.append({"source": filename, "year": year, "authority": authority, "chunks": chunks, "metadatas": metadatas, "ids": ids, "seconds": time.perf_counter() - start})
+                if self._batch_full(pending):
+                    self._flush(collection_name, collection, pending)
+                    pending = []
+
+        self._flush(collection_name, collection, pending)
+        # Once per directory; an interrupted run leaves a stale sidecar, rebuilt on next load
+        metadata_index.save(collection_name)
+
+    @staticmethod
+    def _batch_full(pending: List[Dict[str, Any]]) -> bool:
+        chunks = [chunk for item in pending for chunk in item["chunks"]]
+        # ~4 characters per token, as Embedder.batches estimates
+        return len(chunks) >= embedder.ingest_batch or sum(len(c) // 4 + 1 for c in chunks) >= embedder.batch_tokens
+
+    def _flush(self, collection_name: str, collection, pending: List[Dict[str, Any]]):
+        """Embeds and writes the pooled files' chunks at once, then records each file."""
+        chunks = [chunk for item in pending for chunk in item["chunks"]]
+        if not chunks:
+            return
+        start = time.perf_counter()
+        # None with the default backend: Chroma embeds the documents itself
+        embeddings = embedder.embed_documents(chunks)
+        collection.add(
+            documents=chunks,
+            metadatas=[m for item in pending for m in item["metadatas"]],
+            ids=[i for item in pending for i in item["ids"]],
+            embeddings=embeddings
+        )
+        # The index only follows Chroma: rows are recorded once their chunks are written
+        for item in pending:
+            metadata_index.record(collection_name, item["source"], item["year"], item["authority"], [m["language"] for m in item["metadatas"]])
+            INGESTED_FILES.labels(collection_name).inc()
+            print(f"Indexed {item['source']} ({len(item['chunks'])} chunks) [Year: {item['year']}] [Auth: {item['authority']}]")
+        INGESTED_CHUNKS.labels(collection_name).inc(len(chunks))
+        INGEST_SECONDS.labels(collection_name).inc(sum(item["seconds"] for item in pending) + time.perf_counter() - start)
 
 # Example usage (can be triggered via API or CLI)
 if __name__ == "__main__":
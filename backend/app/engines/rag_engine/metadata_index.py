@@ -0,0 +1,307 @@
+"""
+Sidecar metadata index for the archive collections.
+
+One small JSON file per collection under ARCHIVE_INDEX_DIR, kept by the
+Ingestor next to the Chroma writes. It is columnar: one row per (source,
+year, authority, language) with its chunk count, string columns dictionary
+encoded. Facet counts and "does this filter match anything" are answered
+from it in microseconds instead of pulling the collection through `get`.
+
+A collection's index is loaded from its sidecar when the chunk total
+agrees with Chroma's count, otherwise rebuilt from Chroma. `may_match`
+never loads it, and answers True until something else has (the startup
+warm-up, a facet query or an ingestion). It only short-circuits on an
+index whose total matched Chroma's count within the last
+ARCHIVE_INDEX_VERIFY_SECONDS, so writes from another process (or an
+ingestion between its Chroma write and `record`) never hide chunks.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+STRING_COLUMNS = ("source", "authority", "language")
+COLLECTIONS = ("doctrine", "trench", "future")
+
+class _Table:
+    """Columns of one collection's index."""
+    def __init__(self):
+        self.dictionaries: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self.codes: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+        self.columns: Dict[str, List[int]] = {name: [] for name in (*STRING_COLUMNS, "year", "chunks")}
+
+    def encode(self, column: str, value: str) -> int:
+        codes = self.codes[column]
+        if value not in codes:
+            codes[value] = len(self.dictionaries[column])
+            self.dictionaries[column].append(value)
+        return codes[value]
+
+    def append(self, source: str, year: int, authority: str, language: str, chunks: int):
+        for column, value in (("source", source), ("authority", authority), ("language", language)):
+            self.columns[column].append(self.encode(column, value))
+        self.columns["year"].append(year)
+        self.columns["chunks"].append(chunks)
+
+    def drop_source(self, source: str):
+        code = self.codes["source"].get(source)
+        if code is None:
+            return
+        keep = [i for i, s in enumerate(self.columns["source"]) if s != code]
+        for name, column in self.columns.items():
+            self.columns[name] = [column[i] for i in keep]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"columns": self.columns, "dictionaries": self.dictionaries}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "_Table":
+        table = cls()
+        table.columns = {name: list(values) for name, values in data["columns"].items()}
+        table.dictionaries = {name: list(values) for name, values in data["dictionaries"].items()}
+        table.codes = {name: {v: i for i, v in enumerate(values)} for name, values in table.dictionaries.items()}
+        return table
+
+class MetadataIndex:
+    """Per-collection chunk counts by source, year, authority and language."""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.logger = logging.getLogger("cslf.archive_index")
+        self.directory = directory or os.getenv("ARCHIVE_INDEX_DIR", "./data/archive_index")
+        self.verify_interval = float(os.getenv("ARCHIVE_INDEX_VERIFY_SECONDS", "30"))
+        self._tables: Dict[str, _Table] = {}
+        self._verified: Dict[str, float] = {}  # collection -> monotonic time its total last matched Chroma
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.directory, f"{collection_name}.json")
+
+    def loaded(self, collection_name: str) -> bool:
+        return collection_name in self._tables
+
+    def table(self, collection_name: str) -> _Table:
+        """The collection's index: from its sidecar, else rebuilt once from Chroma."""
+        table = self._tables.get(collection_name)
+        if table is not None:
+            return table
+        with self._lock:
+            if collection_name not in self._tables:
+                path = self._path(collection_name)
+                table = None
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        table = _Table.from_json(json.load(f))
+                    # A sidecar that disagrees with Chroma (interrupted ingest, writes from elsewhere) is rebuilt
+                    if sum(table.columns["chunks"]) != self._chroma_count(collection_name):
+                        self.logger.warning(f"Metadata index for '{collection_name}' is stale; rebuilding")
+                        table = None
+                    else:
+                        self._verified[collection_name] = time.monotonic()
+                self._tables[collection_name] = table or self.rebuild(collection_name)
+            return self._tables[collection_name]
+
+    def load_all(self):
+        """Startup warm-up: every collection's index in memory."""
+        for name in COLLECTIONS:
+            self.table(name)
+
+    @staticmethod
+    def _chroma_count(collection_name: str) -> int:
+        from .chroma_client import chroma_manager
+        return chroma_manager.get_collection(collection_name).count()
+
+    def rebuild(self, collection_name: str, page_size: int = 5000) -> _Table:
+        """Scans a collection's metadata once and writes its sidecar."""
+        from .chroma_client import chroma_manager
+
+        start = time.perf_counter()
+        collection = chroma_manager.get_collection(collection_name)
+        counts: Dict[Tuple[str, int, str, str], int] = {}
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            metadatas = page.get("metadatas") or []
+            for meta in metadatas:
+                row = (meta.get("source", "Unknown"), meta.get("year", 0), meta.get("authority", "Unknown"), meta.get("language", "text"))
+                counts[row] = counts.get(row, 0) + 1
+            if len(metadatas) < page_size:
+                break
+            offset += page_size
+
+        table = _Table()
+        for (source, year, authority, language), chunks in counts.items():
+            table.append(source, year, authority, language, chunks)
+        with self._lock:
+            self._tables[collection_name] = table
+            self._verified[collection_name] = time.monotonic()
+            self.save(collection_name)
+        self.logger.info(f"Rebuilt metadata index for '{collection_name}' ({sum(counts.values())} chunks) in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return table
+
+    # ------------------------------------------------------------------
+    # Maintenance (Ingestor)
+    # ------------------------------------------------------------------
+    def record(self, collection_name: str, source: str, year: int, authority: str, languages: List[str]):
+        """Replaces `source`'s rows with the chunks just written for it. In memory until `save`."""
+        with self._lock:
+            table = self.table(collection_name)
+            table.drop_source(source)
+            per_language: Dict[str, int] = {}
+            for language in languages:
+                per_language[language] = per_language.get(language, 0) + 1
+            for language, chunks in per_language.items():
+                table.append(source, year, authority, language, chunks)
+
+    def save(self, collection_name: str):
+        with self._lock:
+            table = self._tables.get(collection_name)
+            if table is None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(collection_name)
+            # Written aside and renamed, so a reader never sees half a file
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(table.to_json(), f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _compile(self, table: _Table, where: Dict[str, Any]) -> Optional[Callable[[int], bool]]:
+        """
+        Turns a Chroma `where` into a row predicate; None when the index
+        cannot evaluate it. Each condition is decided once per distinct
+        column value, so rows are only tested for set membership.
+        """
+        predicates = []
+        for key, cond in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._compile(table, part) for part in cond]
+                if None in parts:
+                    return None
+                combine = all if key == "$and" else any
+                predicates.append(lambda row, parts=parts, combine=combine: combine(p(row) for p in parts))
+                continue
+            if key not in STRING_COLUMNS and key != "year":
+                return None
+            column = table.columns[key]
+            if key in STRING_COLUMNS:
+                distinct = {code: value for code, value in enumerate(table.dictionaries[key])}
+            else:
+                distinct = {year: year for year in set(column)}
+            allowed = set()
+            for raw, value in distinct.items():
+                result = self._compare(value, cond)
+                if result is None:
+                    return None
+                if result:
+                    allowed.add(raw)
+            predicates.append(lambda row, column=column, allowed=allowed: column[row] in allowed)
+        return lambda row: all(p(row) for p in predicates)
+
+    @staticmethod
+    def _compare(value: Any, cond: Any) -> Optional[bool]:
+        if not isinstance(cond, dict):
+            return value == cond
+        ops = {
+            "$eq": lambda a, b: a == b, "$ne": lambda a, b: a != b,
+            "$gt": lambda a, b: a > b, "$gte": lambda a, b: a >= b,
+            "$lt": lambda a, b: a < b, "$lte": lambda a, b: a <= b,
+            "$in": lambda a, b: a in b, "$nin": lambda a, b: a not in b,
+        }
+        result = True
+        for op, operand in cond.items():
+            if op not in ops:
+                return None
+            try:
+                result = result and ops[op](value, operand)
+            except TypeError:
+                return None
+        return result
+
+    def _rows(self, collection_name: str, where: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+        """Indices of the rows matching `where`, or None when it cannot be evaluated."""
+        table = self.table(collection_name)
+        if not where:
+            return list(range(len(table.columns["chunks"])))
+        predicate = self._compile(table, where)
+        if predicate is None:
+            return None
+        return [row for row in range(len(table.columns["chunks"])) if predicate(row)]
+
+    def count(self, collection_name: str, where: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Chunks matching `where`, or None when the index cannot evaluate it."""
+        # Under the lock: `record` rewrites the columns of a file being re-ingested
+        with self._lock:
+            rows = self._rows(collection_name, where)
+            if rows is None:
+                return None
+            chunks = self.table(collection_name).columns["chunks"]
+            return sum(chunks[row] for row in rows)
+
+    def verified(self, collection_name: str) -> bool:
+        """
+        Whether the loaded index still agrees with Chroma: trusted for
+        `verify_interval` after a match, then re-checked with one `count()`.
+        """
+        checked = self._verified.get(collection_name)
+        if checked is not None and time.monotonic() - checked < self.verify_interval:
+            return True
+        try:
+            chroma_total = self._chroma_count(collection_name)
+        except Exception:
+            return False
+        with self._lock:
+            index_total = sum(self._tables[collection_name].columns["chunks"])
+            if index_total == chroma_total:
+                self._verified[collection_name] = time.monotonic()
+                return True
+            if self._verified.pop(collection_name, None) is not None:
+                self.logger.warning(f"Metadata index for '{collection_name}' holds {index_total} chunks, Chroma {chroma_total}; not short-circuiting")
+        return False
+
+    def may_match(self, collection_name: str, where: Optional[Dict[str, Any]]) -> bool:
+        """False only when the filter provably matches no chunk. Never loads or rebuilds."""
+        if not where or not self.loaded(collection_name) or not self.verified(collection_name):
+            return True
+        with self._lock:
+            table = self.table(collection_name)
+            predicate = self._compile(table, where)
+            if predicate is None:
+                return True
+            # Rows only exist for files with chunks: any matching row is a match
+            return any(predicate(row) for row in range(len(table.columns["chunks"])))
+
+    def facets(self, collection_name: str, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Chunk and source counts, and chunk distributions per facet, under `where`."""
+        with self._lock:
+            table = self.table(collection_name)
+            rows = self._rows(collection_name, where)
+            if rows is None:
+                raise ValueError(f"Filter {where} cannot be evaluated on the metadata index")
+            chunks = table.columns["chunks"]
+            distributions: Dict[str, Dict[Any, int]] = {}
+            for column in ("year", "authority", "language", "source"):
+                # Summed by raw code, decoded once per distinct value
+                counts: Dict[int, int] = {}
+                values = table.columns[column]
+                for row in rows:
+                    counts[values[row]] = counts.get(values[row], 0) + chunks[row]
+                decode = table.dictionaries[column].__getitem__ if column in STRING_COLUMNS else (lambda raw: raw)
+                distributions[column] = {decode(raw): count for raw, count in counts.items()}
+        return {
+            "collection": collection_name,
+            "chunks": sum(chunks[row] for row in rows),
+            "sources": len(distributions["source"]),
+            "facets": {
+                column: dict(sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+                for column, counts in distributions.items()
+            },
+        }
+
+metadata_index = MetadataIndex()
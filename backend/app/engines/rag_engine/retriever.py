@@ -1,6 +1,14 @@
 from typing import List, Dict, Any, Optional
 from .chroma_client import chroma_manager
+from .embeddings import embedder
+from .metadata_index import metadata_index
+from ..metrics import metrics
 import os
+import time
+
+CHROMA_QUERY_SECONDS = metrics.histogram("cslf_chroma_query_seconds", "Chroma similarity query time", ["collection"])
+SHORT_CIRCUITS = metrics.counter("cslf_retriever_short_circuits_total", "Searches answered empty by the metadata index without querying Chroma", ["collection"])
+RETRIEVED_RESULTS = metrics.counter("cslf_retriever_results_total", "Chroma hits, kept or dropped by the distance threshold", ["collection", "outcome"])
 
 class StrictRetriever:
     def __init__(self, threshold: float = 0.4):
@@ -16,13 +24,27 @@ class StrictRetriever:
             for key, value in filters.items():
                 if value is not None:
                     where_clause[key] = value
+        if len(where_clause) > 1:
+            # Chroma takes a single top-level operator
+            where_clause = {"$and": [{key: value} for key, value in where_clause.items()]}
+
+        # The sidecar index proves no chunk passes the filter: skip the embedding and Chroma
+        if not metadata_index.may_match(collection_name, where_clause):
+            SHORT_CIRCUITS.labels(collection_name).inc()
+            return []
+
+        # Same model as ingestion; with the default backend Chroma embeds the text
+        vectors = embedder.embed_queries([query])
+        search = {"query_embeddings": vectors} if vectors is not None else {"query_texts": [query]}
 
+        start = time.perf_counter()
         results = collection.query(
-            query_texts=[query],
+            **search,
             n_results=n_results,
             where=where_clause if where_clause else None,
             include=["documents", "metadatas", "distances"]
         )
+        CHROMA_QUERY_SECONDS.labels(collection_name).observe(time.perf_counter() - start)
         
         filtered_results = []
         if not results['documents']: return []
@@ -35,7 +57,9 @@ class StrictRetriever:
                     "metadata": results['metadatas'][0][i],
                     "distance": distance
                 })
-        
+
+        RETRIEVED_RESULTS.labels(collection_name, "kept").inc(len(filtered_results))
+        RETRIEVED_RESULTS.labels(collection_name, "dropped").inc(len(results['documents'][0]) - len(filtered_results))
         return filtered_results
 
     def format_for_prompt(self, results: List[Dict[str, Any]]) -> str:
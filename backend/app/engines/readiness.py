@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+class EngineRegistry:
+    """
+    Engines with slow or fallible initialisation (Chroma, Docker), warmed
+    in parallel in the background at startup.
+
+    Every engine also connects lazily on first use, so warm-up is only a
+    head start: the API serves as soon as it starts, and routes that do not
+    need a cold engine are never held up by it. Readiness is read from the
+    engine itself, so a lazy connect made by a request counts too.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("cslf.engines")
+        self._engines: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+
+    def register(self, name: str, warm: Callable[[], Any], ready: Callable[[], bool]):
+        """`warm` connects the engine (idempotent); `ready` reports whether it is up."""
+        self._engines[name] = {"warm": warm, "ready": ready, "state": "pending", "ms": None, "error": None}
+
+    def start(self):
+        """Warms every engine on its own thread; returns immediately."""
+        self.started_at = time.perf_counter()
+        self.ready_ms = None
+        for name in self._engines:
+            threading.Thread(target=self._warm, args=(name,), name=f"cslf-warm-{name}", daemon=True).start()
+
+    def _warm(self, name: str):
+        engine = self._engines[name]
+        engine["state"] = "warming"
+        t0 = time.perf_counter()
+        try:
+            engine["warm"]()
+            error = None if engine["ready"]() else "unavailable"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with self._lock:
+            engine.update(state="failed" if error else "ready", ms=round((time.perf_counter() - t0) * 1000, 1), error=error)
+            if error:
+                self.logger.warning(f"Engine '{name}' failed to warm up: {error}")
+            else:
+                self.logger.info(f"Engine '{name}' ready in {engine['ms']} ms")
+            if all(e["state"] != "warming" and e["state"] != "pending" for e in self._engines.values()):
+                self.ready_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+                self.logger.info(f"Warm-up finished in {self.ready_ms} ms")
+
+    def status(self) -> Dict[str, Any]:
+        """Per-engine readiness for `/health`."""
+        engines = {}
+        for name, engine in self._engines.items():
+            ready = engine["ready"]()
+            engines[name] = {
+                "ready": ready,
+                # A lazy connect after a failed warm-up recovers the engine
+                "state": "ready" if ready else engine["state"],
+                "warmup_ms": engine["ms"],
+                "error": None if ready else engine["error"],
+            }
+        return {
+            "ready": all(e["ready"] for e in engines.values()),
+            "time_to_ready_ms": self.ready_ms,
+            "engines": engines,
+        }
+
+engine_registry = EngineRegistry()
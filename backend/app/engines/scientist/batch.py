@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .lab_coat import lab_coat
+from .peer_review import peer_reviewer
+
+class BatchResearcher:
+    """
+    Runs the hypothesis -> design -> review loop over many topics at once.
+
+    At most `concurrency` topics are in flight (on a shared worker pool, so
+    several concurrent batches cannot oversubscribe it), results are
+    yielded in completion order, and per-topic artifacts are memoised in
+    an LRU of `memo_size` entries. Duplicate topics, within a batch or
+    across batches, share one computation.
+    """
+
+    def __init__(self, scientist=lab_coat, reviewer=peer_reviewer, concurrency: Optional[int] = None, max_topics: Optional[int] = None, memo_size: Optional[int] = None):
+        self.logger = logging.getLogger("cslf.scientist.batch")
+        self.scientist = scientist
+        self.reviewer = reviewer
+        self.concurrency = concurrency or int(os.getenv("SCIENTIST_BATCH_CONCURRENCY", "8"))
+        self.max_topics = max_topics or int(os.getenv("SCIENTIST_BATCH_MAX_TOPICS", "1000"))
+        self.memo_size = memo_size or int(os.getenv("SCIENTIST_MEMO_SIZE", "4096"))
+        self.stats = {"computed": 0, "memo_hits": 0, "errors": 0}
+
+        self._memo: "OrderedDict[str, Tuple[Dict[str, Any], Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scientist-batch")
+
+    @staticmethod
+    def _key(topic: str) -> str:
+        return topic.strip()
+
+    def research(self, topic: str) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+        """(paper, review, memoised) for one topic; blocking."""
+        key = self._key(topic)
+        while True:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    self.stats["memo_hits"] += 1
+                    paper, review = self._memo[key]
+                    return paper, review, True
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            # Another worker is computing this topic: wait for its artifacts
+            pending.wait()
+        try:
+            paper = self.scientist.conduct_research(key)
+            review = self.reviewer.review_research(paper)
+            with self._lock:
+                self._memo[key] = (paper, review)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+                self.stats["computed"] += 1
+            return paper, review, False
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            pending.set()
+
+    async def run(self, topics: List[str], concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields one record per topic as it completes, then a summary record.
+        Closing the iterator (client disconnect) stops scheduling new topics.
+        """
+        limit = max(1, min(concurrency or self.concurrency, self.concurrency))
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(topics):
+            queue.put_nowait(item)
+        results: asyncio.Queue = asyncio.Queue()
+        started = time.perf_counter()
+
+        async def worker():
+            while True:
+                try:
+                    index, topic = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                record: Dict[str, Any] = {"index": index, "topic": topic}
+                if not topic or not topic.strip():
+                    record.update(status="error", error="Topic required")
+                else:
+                    try:
+                        paper, review, memoised = await loop.run_in_executor(self._executor, self.research, topic)
+                        record.update(status="completed", memoised=memoised, paper=paper, review=review)
+                    except Exception as e:
+                        self.logger.error(f"Batch research failed for '{topic}': {e}")
+                        self.stats["errors"] += 1
+                        record.update(status="error", error=str(e))
+                record["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+                await results.put(record)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(limit, len(topics)))]
+        counts = {"completed": 0, "error": 0, "memoised": 0}
+        try:
+            for _ in range(len(topics)):
+                record = await results.get()
+                counts[record["status"]] += 1
+                counts["memoised"] += int(record.get("memoised", False))
+                yield record
+        finally:
+            for w in workers:
+                w.cancel()
+        yield {"summary": dict(counts, topics=len(topics), concurrency=limit, elapsed_ms=round((time.perf_counter() - started) * 1000, 3))}
+
+scientist_batch = BatchResearcher()
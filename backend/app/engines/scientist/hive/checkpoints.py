@@ -0,0 +1,59 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+class CheckpointStore:
+    """
+    One JSON document per hive project, rewritten atomically (temp file +
+    os.replace) after every DSG node transition. The document is the full
+    DSG plus a `checkpoints` trail of (node, status, time), so a crashed or
+    restarted cycle can be resumed from its last completed node without
+    paying for retrieval or LLM calls again.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.logger = logging.getLogger("cslf.hive.checkpoints")
+        self.root = root or os.getenv("HIVE_CHECKPOINT_DIR", "./data/hive_checkpoints")
+
+    def _path(self, project_id: str) -> str:
+        if not _SAFE_ID.match(project_id or ""):
+            raise ValueError(f"Invalid project id: {project_id!r}")
+        return os.path.join(self.root, f"{project_id}.json")
+
+    def save(self, dsg: Dict[str, Any], node: str):
+        dsg.setdefault("checkpoints", []).append({
+            "node": node,
+            "status": dsg["nodes"][node]["status"] if node in dsg["nodes"] else dsg["status"],
+            "at": time.time()
+        })
+        path = self._path(dsg["project_id"])
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dsg, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, project_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(project_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def list_ids(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.root) if name.endswith(".json"))
+
+    def delete(self, project_id: str):
+        path = self._path(project_id)
+        if os.path.exists(path):
+            os.remove(path)
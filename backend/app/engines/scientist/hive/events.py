@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+TERMINAL_EVENT = "done"
+
+class HiveEventBus:
+    """
+    Per-project, append-only event log that hive worker threads publish to
+    and async (SSE) consumers tail.
+
+    Every event gets a monotonically increasing `seq`, so a client can
+    reconnect with Last-Event-ID and continue without gaps (as long as the
+    event is still within the per-project `max_events` window). Consumers
+    are woken through their own event loop, never by polling.
+    """
+
+    def __init__(self, max_events: int = 20_000, max_projects: int = 256):
+        self.max_events = max_events
+        self.max_projects = max_projects
+        self._logs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._waiters: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def _log(self, project_id: str) -> Dict[str, Any]:
+        log = self._logs.get(project_id)
+        if log is None:
+            log = {"events": deque(maxlen=self.max_events), "seq": 0, "closed": False}
+            self._logs[project_id] = log
+            while len(self._logs) > self.max_projects:
+                oldest = next((pid for pid, l in self._logs.items() if l["closed"]), None)
+                if oldest is None:
+                    break
+                del self._logs[oldest]
+        return log
+
+    def publish(self, project_id: str, event_type: str, **data) -> Dict[str, Any]:
+        with self._lock:
+            log = self._log(project_id)
+            log["seq"] += 1
+            event = {"seq": log["seq"], "type": event_type, "at": time.time(), **data}
+            log["events"].append(event)
+            if event_type == TERMINAL_EVENT:
+                log["closed"] = True
+            waiters = list(self._waiters.get(project_id, ()))
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # consumer's loop already closed
+        return event
+
+    def reopen(self, project_id: str):
+        """
+        A resumed/re-run project streams again. Its previous `done` is dropped,
+        so a client replaying the log does not stop at the old run's end;
+        the seq gap it leaves is harmless to Last-Event-ID resumption.
+        """
+        with self._lock:
+            log = self._logs.get(project_id)
+            if log is not None:
+                log["events"] = deque((e for e in log["events"] if e["type"] != TERMINAL_EVENT), maxlen=self.max_events)
+                log["closed"] = False
+
+    def has(self, project_id: str) -> bool:
+        with self._lock:
+            return project_id in self._logs
+
+    def events_after(self, project_id: str, after: int = 0) -> Tuple[List[Dict[str, Any]], bool]:
+        """Events with seq > after, and whether the stream has ended."""
+        with self._lock:
+            log = self._logs.get(project_id)
+            if log is None:
+                return [], False
+            events = [e for e in log["events"] if e["seq"] > after]
+            return events, log["closed"]
+
+    async def subscribe(self, project_id: str, after: int = 0, keepalive: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yields events as they are published; yields None every `keepalive`
+        seconds of silence (SSE comment) and stops after the terminal event.
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        waiter = (loop, wakeup)
+        with self._lock:
+            self._waiters.setdefault(project_id, set()).add(waiter)
+        try:
+            while True:
+                wakeup.clear()
+                events, closed = self.events_after(project_id, after)
+                for event in events:
+                    after = event["seq"]
+                    yield event
+                if closed and (not events or events[-1]["type"] == TERMINAL_EVENT):
+                    return
+                if events:
+                    continue
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(project_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[project_id]
+
+hive_events = HiveEventBus()
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CACHE_MODES = ("off", "readwrite", "record", "replay")
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a prompt was never recorded."""
+
+class LLMCache:
+    """
+    Content-addressed store of LLM completions.
+
+    Entries are keyed on sha256(agent, provider, model, system prompt,
+    user prompt, temperature) and evicted least-recently-used once
+    `max_entries` is exceeded. Modes:
+      - off:       bypass entirely
+      - readwrite: serve hits, store misses (default)
+      - record:    always call the provider, overwrite stored entries
+      - replay:    never call a provider; a miss raises LLMCacheMiss
+    """
+
+    def __init__(self, db_path: Optional[str] = None, mode: Optional[str] = None, max_entries: Optional[int] = None):
+        self.logger = logging.getLogger("cslf.hive.llm_cache")
+        self.db_path = db_path or os.getenv("HIVE_LLM_CACHE_PATH", "./data/hive_llm_cache.db")
+        self.mode = (mode or os.getenv("HIVE_LLM_CACHE_MODE", "readwrite")).lower()
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode '{self.mode}' (expected one of {CACHE_MODES})")
+        self.max_entries = max_entries or int(os.getenv("HIVE_LLM_CACHE_MAX_ENTRIES", "10000"))
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # Opened on first use, not at import
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """The cache database, opened on first use; call with `_lock` held."""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    agent TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used);
+            """)
+            self._size = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def make_key(agent: str, provider: str, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float] = None) -> str:
+        payload = json.dumps([agent, provider, model, system_prompt, user_prompt, temperature], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled or self.mode == "record":
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                if self.mode == "replay":
+                    raise LLMCacheMiss(f"No recorded completion for key {key[:12]}")
+                return None
+            with conn:
+                conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, agent: str, provider: str, model: str, response: str):
+        if not self.enabled or self.mode == "replay":
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                existed = conn.execute("SELECT 1 FROM completions WHERE key = ?", (key,)).fetchone() is not None
+                conn.execute(
+                    "INSERT OR REPLACE INTO completions (key, agent, provider, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, agent, provider, model, response, now, now)
+                )
+                if not existed:
+                    self._size += 1
+                if self._size > self.max_entries:
+                    overflow = self._size - self.max_entries
+                    conn.execute(
+                        "DELETE FROM completions WHERE key IN (SELECT key FROM completions ORDER BY last_used ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._size -= overflow
+
+    def stats(self) -> Dict[str, Any]:
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                self._connect()
+                entries = self._size
+        return {"mode": self.mode, "entries": entries, "hits": self.hits, "misses": self.misses}
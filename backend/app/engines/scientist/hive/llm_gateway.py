@@ -0,0 +1,347 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from ...metrics import metrics
+
+# Per-provider wire defaults; base URLs and limits are overridable via env
+PROVIDERS: Dict[str, Dict[str, Any]] = {
+    "openai": {"base_url": "https://api.openai.com/v1", "url_env": "OPENAI_BASE_URL", "key_env": "OPENAI_API_KEY", "concurrency": 8},
+    "anthropic": {"base_url": "https://api.anthropic.com", "url_env": "ANTHROPIC_BASE_URL", "key_env": "ANTHROPIC_API_KEY", "concurrency": 4},
+    "ollama": {"base_url": "http://localhost:11434", "url_env": "OLLAMA_BASE_URL", "key_env": None, "concurrency": 2},
+}
+FALLBACK_PROVIDER, FALLBACK_MODEL = "ollama", "llama3"
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# From acquiring the provider's slot to the last token, retries included;
+# hedged racers that lose are recorded as "cancelled"
+LLM_REQUEST_SECONDS = metrics.histogram("cslf_llm_request_seconds", "LLM provider request latency", ["provider", "outcome"])
+
+class LLMDeadlineExceeded(TimeoutError):
+    """No provider answered before the call's deadline."""
+
+class _Superseded(Exception):
+    """A hedged racer produced a token after the other one started streaming."""
+
+class ProviderGateway:
+    """
+    Async HTTP layer in front of OpenAI, Anthropic and Ollama.
+
+    One pooled `httpx.AsyncClient` per provider lives on a private event
+    loop thread, so the (threaded) hive can call `complete` synchronously
+    while every request shares keep-alive connections. Each provider has a
+    concurrency semaphore; each call has a single deadline that bounds
+    retries and fallbacks. When the primary provider has not answered after
+    `hedge_after` seconds (or fails outright), the same prompt is raced on
+    the local Ollama model and the first completion wins.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, hedge_after: Optional[float] = None, max_retries: int = 2, concurrency: Optional[Dict[str, int]] = None):
+        self.logger = logging.getLogger("cslf.hive.gateway")
+        self.deadline = deadline or float(os.getenv("HIVE_LLM_DEADLINE", "60"))
+        self.hedge_after = hedge_after if hedge_after is not None else float(os.getenv("HIVE_LLM_HEDGE_AFTER", "8"))
+        self.max_retries = max_retries
+
+        self.base_urls: Dict[str, str] = {}
+        self.api_keys: Dict[str, Optional[str]] = {}
+        self.concurrency: Dict[str, int] = {}
+        for name, spec in PROVIDERS.items():
+            self.base_urls[name] = os.getenv(spec["url_env"], spec["base_url"]).rstrip("/")
+            self.api_keys[name] = os.getenv(spec["key_env"]) if spec["key_env"] else None
+            env_limit = os.getenv(f"HIVE_LLM_CONCURRENCY_{name.upper()}")
+            self.concurrency[name] = (concurrency or {}).get(name) or int(env_limit or spec["concurrency"])
+        self.stats = {name: {"requests": 0, "errors": 0, "hedges_won": 0} for name in PROVIDERS}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._start_lock = threading.Lock()
+
+    def has(self, provider: str) -> bool:
+        """Cloud providers need a key; Ollama is always considered reachable."""
+        return provider == FALLBACK_PROVIDER or bool(self.api_keys.get(provider))
+
+    # --- Event loop plumbing -------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                threading.Thread(target=run, name="cslf-llm-gateway", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def _client(self, provider: str) -> httpx.AsyncClient:
+        client = self._clients.get(provider)
+        if client is None:
+            limit = self.concurrency[provider]
+            client = httpx.AsyncClient(
+                base_url=self.base_urls[provider],
+                limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            )
+            self._clients[provider] = client
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+        return client
+
+    def complete(self, provider: str, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float] = None, json_mode: bool = False, deadline: Optional[float] = None, on_token: Optional[Callable[[str], None]] = None, usage: Optional[Dict[str, int]] = None) -> Tuple[str, str, str]:
+        """
+        Blocking entry point for threaded callers. Returns (content, provider, model).
+        With `on_token`, the provider's streaming API is used and every text
+        delta is passed to it (from the gateway's loop thread) as it arrives.
+        With `usage`, the answering provider's reported token counts are
+        stored in it as `tokens_in` / `tokens_out`.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.acomplete(provider, model, system_prompt, user_prompt, temperature, json_mode, deadline, on_token, usage),
+            self._ensure_loop()
+        )
+        return future.result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        async def _close():
+            for client in self._clients.values():
+                await client.aclose()
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._clients.clear()
+        self._semaphores.clear()
+
+    # --- Hedged completion ---------------------------------------------------
+
+    async def acomplete(self, provider: str, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float] = None, json_mode: bool = False, deadline: Optional[float] = None, on_token: Optional[Callable[[str], None]] = None, usage: Optional[Dict[str, int]] = None) -> Tuple[str, str, str]:
+        expires = time.monotonic() + (deadline or self.deadline)
+        args = (system_prompt, user_prompt, temperature, json_mode, expires)
+
+        # Each racer reports into its own dict; only the winner's is kept
+        reported: Dict[str, Dict[str, int]] = {"primary": {}, "hedge": {}}
+        def answer(tag: str, task: asyncio.Future, answered_by: str, answered_model: str) -> Tuple[str, str, str]:
+            if usage is not None:
+                usage.update(reported[tag])
+            return task.result(), answered_by, answered_model
+
+        def remaining() -> float:
+            return max(0.0, expires - time.monotonic())
+
+        # The first racer to stream a token owns the output; the other one is
+        # stopped at its first token so clients never see interleaved text
+        owner: Dict[str, str] = {}
+        def emitter(tag: str) -> Optional[Callable[[str], None]]:
+            if on_token is None:
+                return None
+            def emit(chunk: str):
+                if owner.setdefault("tag", tag) != tag:
+                    raise _Superseded(tag)
+                on_token(chunk)
+            return emit
+
+        if provider == FALLBACK_PROVIDER:
+            task = asyncio.ensure_future(self._request(provider, model, *args, emitter(provider), reported["primary"]))
+            done, _ = await asyncio.wait({task}, timeout=remaining())
+            if not done:
+                task.cancel()
+                raise LLMDeadlineExceeded(f"{provider} deadline exceeded")
+            return answer("primary", task, provider, model)
+
+        primary = asyncio.ensure_future(self._request(provider, model, *args, emitter("primary"), reported["primary"]))
+        hedge: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=min(self.hedge_after, remaining()))
+            if primary in done and primary.exception() is None:
+                return answer("primary", primary, provider, model)
+            if primary not in done and owner.get("tag") == "primary":
+                # Slow but already streaming: time-to-first-token is what hedging protects
+                done, _ = await asyncio.wait({primary}, timeout=remaining())
+                if primary not in done:
+                    raise LLMDeadlineExceeded(f"{provider} deadline exceeded")
+                return answer("primary", primary, provider, model)
+            if primary in done:
+                self.logger.warning(f"{provider} failed ({primary.exception()}); falling back to {FALLBACK_PROVIDER}.")
+            else:
+                self.logger.info(f"{provider} slower than {self.hedge_after}s; hedging on {FALLBACK_PROVIDER}.")
+            hedge = asyncio.ensure_future(self._request(FALLBACK_PROVIDER, FALLBACK_MODEL, *args, emitter("hedge"), reported["hedge"]))
+
+            pending = {f for f in (primary, hedge) if not f.done()}
+            errors = [primary.exception()] if primary.done() else []
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise LLMDeadlineExceeded(f"{provider} and {FALLBACK_PROVIDER} deadline exceeded")
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats[FALLBACK_PROVIDER]["hedges_won"] += 1
+                            return answer("hedge", task, FALLBACK_PROVIDER, FALLBACK_MODEL)
+                        return answer("primary", task, provider, model)
+                    errors.append(task.exception())
+            raise next((e for e in reversed(errors) if not isinstance(e, _Superseded)), errors[-1])
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _request(self, provider: str, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float], json_mode: bool, expires: float, on_chunk: Optional[Callable[[str], None]] = None, usage: Optional[Dict[str, int]] = None) -> str:
+        client = self._client(provider)
+        path, headers, payload = self._build(provider, model, system_prompt, user_prompt, temperature, json_mode, stream=on_chunk is not None)
+        attempt = 0
+        semaphore = self._semaphores[provider]
+        try:
+            # Queueing behind the concurrency limit counts against the deadline too
+            await asyncio.wait_for(semaphore.acquire(), timeout=max(0.0, expires - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise LLMDeadlineExceeded(f"{provider} concurrency queue exceeded deadline")
+        start, outcome = time.perf_counter(), "error"
+        try:
+            while True:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise LLMDeadlineExceeded(f"{provider} deadline exceeded")
+                self.stats[provider]["requests"] += 1
+                streamed = False
+                try:
+                    if on_chunk is None:
+                        response = await client.post(path, json=payload, headers=headers, timeout=remaining)
+                        if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                            raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                        response.raise_for_status()
+                        body = response.json()
+                        if usage is not None:
+                            usage.update(self._usage(provider, body))
+                        outcome = "ok"
+                        return self._parse(provider, body)
+
+                    parts = []
+                    async with client.stream("POST", path, json=payload, headers=headers, timeout=remaining) as response:
+                        if response.status_code in RETRYABLE_STATUS and attempt < self.max_retries:
+                            raise httpx.HTTPStatusError(f"HTTP {response.status_code}", request=response.request, response=response)
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            chunk = self._parse_stream_line(provider, line, usage)
+                            if chunk:
+                                streamed = True
+                                parts.append(chunk)
+                                on_chunk(chunk)
+                    outcome = "ok"
+                    return "".join(parts)
+                except httpx.TimeoutException:
+                    self.stats[provider]["errors"] += 1
+                    raise LLMDeadlineExceeded(f"{provider} deadline exceeded")
+                except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                    self.stats[provider]["errors"] += 1
+                    retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRYABLE_STATUS
+                    # Never retry once tokens reached the client: they cannot be taken back
+                    if not retryable or streamed or attempt >= self.max_retries:
+                        raise
+                    attempt += 1
+                    backoff = min(0.25 * 2 ** attempt, 2.0) * (0.5 + random.random() / 2)
+                    await asyncio.sleep(min(backoff, max(0.0, expires - time.monotonic())))
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(provider, outcome).observe(time.perf_counter() - start)
+            semaphore.release()
+
+    def _build(self, provider: str, model: str, system_prompt: str, user_prompt: str, temperature: Optional[float], json_mode: bool, stream: bool = False) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        if provider == "openai":
+            payload: Dict[str, Any] = {
+                "model": model,
+                "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            }
+            if json_mode:
+                payload["response_format"] = {"type": "json_object"}
+            if temperature is not None:
+                payload["temperature"] = temperature
+            if stream:
+                payload["stream"] = True
+                payload["stream_options"] = {"include_usage": True}
+            return "/chat/completions", {"Authorization": f"Bearer {self.api_keys['openai']}"}, payload
+        if provider == "anthropic":
+            payload = {
+                "model": model,
+                "max_tokens": 2048,
+                "system": system_prompt,
+                "messages": [{"role": "user", "content": user_prompt}],
+            }
+            if temperature is not None:
+                payload["temperature"] = temperature
+            if stream:
+                payload["stream"] = True
+            headers = {"x-api-key": self.api_keys["anthropic"] or "", "anthropic-version": "2023-06-01"}
+            return "/v1/messages", headers, payload
+        payload = {
+            "model": model,
+            "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            "stream": stream,
+        }
+        if temperature is not None:
+            payload["options"] = {"temperature": temperature}
+        return "/api/chat", {}, payload
+
+    @staticmethod
+    def _parse(provider: str, body: Dict[str, Any]) -> str:
+        if provider == "openai":
+            return body["choices"][0]["message"]["content"]
+        if provider == "anthropic":
+            return body["content"][0]["text"]
+        return body["message"]["content"]
+
+    @staticmethod
+    def _usage(provider: str, body: Dict[str, Any]) -> Dict[str, int]:
+        """Token counts from a response body or stream event, in whichever fields the provider uses."""
+        if provider == "ollama":
+            counts = {"tokens_in": body.get("prompt_eval_count"), "tokens_out": body.get("eval_count")}
+        else:
+            reported = body.get("usage") or (body.get("message") or {}).get("usage") or {}
+            if provider == "openai":
+                counts = {"tokens_in": reported.get("prompt_tokens"), "tokens_out": reported.get("completion_tokens")}
+            else:
+                counts = {"tokens_in": reported.get("input_tokens"), "tokens_out": reported.get("output_tokens")}
+        return {k: v for k, v in counts.items() if isinstance(v, int)}
+
+    @classmethod
+    def _parse_stream_line(cls, provider: str, line: str, usage: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """
+        Text delta from one line of an SSE (OpenAI, Anthropic) or NDJSON
+        (Ollama) stream; token counts carried by the stream go into `usage`.
+        """
+        line = line.strip()
+        if not line:
+            return None
+        if provider == "ollama":
+            body = json.loads(line)
+            if usage is not None and body.get("done"):
+                usage.update(cls._usage(provider, body))
+            return body.get("message", {}).get("content")
+        if not line.startswith("data:"):
+            return None  # SSE `event:` / comment lines
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return None
+        body = json.loads(data)
+        if usage is not None:
+            # OpenAI: final chunk; Anthropic: message_start (input), message_delta (output)
+            usage.update(cls._usage(provider, body))
+        if provider == "openai":
+            choices = body.get("choices") or [{}]
+            return (choices[0].get("delta") or {}).get("content")
+        if body.get("type") == "content_block_delta":
+            return body.get("delta", {}).get("text")
+        return None
@@ -1,58 +1,149 @@
 import logging
 import json
-import docker
 import time
 import os
-import subprocess
-import tempfile
+import threading
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-# Agent Clients
-from openai import OpenAI
-from anthropic import Anthropic
-import ollama
 from dotenv import load_dotenv
 
+from ...metrics import metrics
 from ...rag_engine.retriever import retriever
+from .checkpoints import CheckpointStore
+from .events import HiveEventBus, hive_events
+from .llm_cache import LLMCache
+from .llm_gateway import ProviderGateway
+from .sandbox_pool import InterpreterPool, ContainerPool, OutputCallback
+from .tracing import HiveTracer
 
 # Load environment variables from .env
 load_dotenv()
 
+SANDBOX_RUN_SECONDS = metrics.histogram("cslf_sandbox_run_seconds", "Engineer trial sandbox run time, startup included", ["backend", "outcome"])
+
+# Reflexion prompt budget: the first lines (what ran) and the last ones
+# (stderr and the traceback), well under the sandbox's per-stream cap
+REFLEXION_HEAD_LINES = int(os.getenv("HIVE_REFLEXION_HEAD_LINES", "10"))
+REFLEXION_TAIL_LINES = int(os.getenv("HIVE_REFLEXION_TAIL_LINES", "60"))
+REFLEXION_MAX_BYTES = int(os.getenv("HIVE_REFLEXION_MAX_BYTES", "8192"))
+
+# Diversity hints for parallel engineer lanes (lane 0 keeps the plain prompt)
+ENGINEER_VARIANTS = [
+    "",
+    "Variant B: prefer the simplest possible standard-library implementation.",
+    "Variant C: wrap every I/O and parsing step in explicit try/except and assert the outcome.",
+    "Variant D: take a different algorithmic approach than the most obvious one.",
+]
+
+# DSG nodes in execution order, the agent that produces each, and the
+# status that marks the node as done (resume skips those)
+STAGES = [("ideation", "theorist"), ("realization", "engineer"), ("audit", "reviewer")]
+STAGE_DONE = {"ideation": "VERIFIED_GROUNDING", "realization": "COMPILED", "audit": "AUDITED"}
+
 class HiveOrchestrator:
-    def __init__(self):
+    def __init__(self, llm_cache: Optional[LLMCache] = None, llm_gateway: Optional[ProviderGateway] = None, checkpoints: Optional[CheckpointStore] = None, events: Optional[HiveEventBus] = None, tracer: Optional[HiveTracer] = None):
         self.logger = logging.getLogger("cslf.hive")
         self.docker_proxy_url = os.getenv("DOCKER_PROXY_URL", "tcp://cslf-docker-proxy:2375")
         self.prompts_dir = "backend/app/engines/scientist/hive/prompts"
         
-        # Clients
-        self.openai_client = OpenAI() if os.getenv("OPENAI_API_KEY") else None
-        self.anthropic_client = Anthropic() if os.getenv("ANTHROPIC_API_KEY") else None
+        # Agent Clients (async HTTP gateway shared by all agents)
+        self.llm_gateway = llm_gateway or ProviderGateway()
+        self.llm_cache = llm_cache or LLMCache()
+        self.checkpoints = checkpoints or CheckpointStore()
+        self.events = events or hive_events
+        self.tracer = tracer or HiveTracer()
+        # Per-project locks, alive while someone holds them (see dsg_lock)
+        self._dsg_locks: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._dsg_locks_guard = threading.Lock()
+        self.tracer.lock_for = self.dsg_lock
         
         # Sovereign Mock Flag: Use subprocess if Docker is down
         self.sovereign_mock = os.getenv("HIVE_SOVEREIGN_MOCK", "TRUE") == "TRUE"
-        
-        try:
-            self.client = docker.DockerClient(base_url=self.docker_proxy_url)
-            self.logger.info("Connected to Docker Proxy Cage.")
-        except Exception:
-            self.logger.warning("Docker Proxy unreachable. Activating Sovereign Mock (Subprocess Sandbox).")
-            self.client = None
-            self.sovereign_mock = True
-
-        self.dsg = {
+
+        # Parallel engineer candidates per Reflexion round (1 = sequential trials)
+        self.engineer_parallelism = int(os.getenv("HIVE_ENGINEER_PARALLELISM", "1"))
+        self.sandbox_timeout = 10
+
+        # Docker Proxy Cage is connected on first use (or by the startup warm-up), not at import
+        self.docker_retry_seconds = float(os.getenv("HIVE_DOCKER_RETRY_SECONDS", "60"))
+        self._client = None
+        self._docker_lock = threading.Lock()
+        self._docker_retry_at = 0.0
+
+        # Pre-warmed sandbox workers (filled in the background once a project starts)
+        self.interpreter_pool = InterpreterPool()
+        self.container_pool: Optional[ContainerPool] = None
+
+    def connect(self):
+        """
+        The Docker Proxy client, connected on first use. Never attempted
+        under Sovereign Mock. A failed attempt is retried after
+        `docker_retry_seconds`; until then trials run in the subprocess
+        sandbox.
+        """
+        if self._client is None and not self.sovereign_mock and time.monotonic() >= self._docker_retry_at:
+            with self._docker_lock:
+                if self._client is None and time.monotonic() >= self._docker_retry_at:
+                    import docker
+                    try:
+                        client = docker.DockerClient(base_url=self.docker_proxy_url)
+                    except docker.errors.DockerException as e:
+                        self._docker_retry_at = time.monotonic() + self.docker_retry_seconds
+                        self.logger.warning(f"Docker Proxy unreachable, using the Sovereign Mock (Subprocess Sandbox): {e}")
+                        return None
+                    self.container_pool = ContainerPool(client)
+                    self._client = client
+                    self.logger.info("Connected to Docker Proxy Cage.")
+        return self._client
+
+    @property
+    def client(self):
+        return self.connect()
+
+    @property
+    def ready(self) -> bool:
+        """The configured sandbox is usable: Sovereign Mock, or a connected Docker Proxy."""
+        return self.sovereign_mock or self._client is not None
+
+    def dsg_lock(self, project_id: str) -> Any:
+        """
+        The lock guarding one project's DSG. Held for every multi-field or
+        structural change made while the project is readable (stage results,
+        status, checkpoints, trace summaries from parallel lanes), and by
+        readers that copy the DSG, so a copy never sees a change half made.
+        """
+        with self._dsg_locks_guard:
+            lock = self._dsg_locks.get(project_id)
+            if lock is None:
+                lock = threading.RLock()
+                self._dsg_locks[project_id] = lock
+            return lock
+
+    def new_dsg(self, topic: Optional[str] = None) -> Dict[str, Any]:
+        """A fresh, isolated Directed Scientific Graph for one research cycle."""
+        return {
             "version": "3.3",
-            "project_id": None,
-            "topic": None,
+            "project_id": f"HIVE_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            "topic": topic,
             "status": "IDLE",
-            "nodes": {
-                "ideation": {"content": None, "grounding": [], "status": "PENDING"},
-                "realization": {"content": None, "trials": [], "status": "PENDING"},
-                "audit": {"score": 0, "verdict": None, "critique": None, "status": "PENDING"}
-            },
-            "edges": ["ideation -> realization", "realization -> audit"]
+            "nodes": {node: self._empty_node(node) for node, _ in STAGES},
+            "edges": ["ideation -> realization", "realization -> audit"],
+            "checkpoints": [],
+            "trace": HiveTracer.empty_summary()
         }
 
+    @staticmethod
+    def _empty_node(node: str) -> Dict[str, Any]:
+        return {
+            "ideation": {"content": None, "grounding": [], "status": "PENDING"},
+            "realization": {"content": None, "trials": [], "status": "PENDING"},
+            "audit": {"score": 0, "verdict": None, "critique": None, "status": "PENDING"}
+        }[node]
+
     def _load_prompt(self, agent_name: str) -> str:
         path = os.path.join(self.prompts_dir, f"{agent_name}.txt")
         if os.path.exists(path):
@@ -60,110 +151,116 @@ class HiveOrchestrator:
                 return f.read()
         return ""
 
-    def _llm_call(self, agent: str, system_prompt: str, user_prompt: str) -> str:
+    def _llm_route(self, agent: str) -> Tuple[str, str]:
+        """(provider, model) that `_llm_call` will use for this agent."""
+        if agent in ("theorist", "reviewer") and self.llm_gateway.has("openai"):
+            return "openai", "gpt-4o"
+        if agent == "engineer" and self.llm_gateway.has("anthropic"):
+            return "anthropic", "claude-3-5-sonnet-20240620"
+        return "ollama", "llama3"
+
+    def _llm_call(self, agent: str, system_prompt: str, user_prompt: str, temperature: Optional[float] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
+        provider, model = self._llm_route(agent)
+        self.tracer.annotate(provider=provider, model=model)
+        cache_key = LLMCache.make_key(agent, provider, model, system_prompt, user_prompt, temperature)
+        cached = self.llm_cache.get(cache_key)
+        self.tracer.annotate(cache_hit=cached is not None)
+        if cached is not None:
+            self.logger.info(f"LLM_CACHE_HIT for {agent} ({provider}/{model})")
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
         self.logger.info(f"LLM_CALL for {agent}")
+        usage: Dict[str, int] = {}
         try:
-            if agent == "theorist" and self.openai_client:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                    response_format={"type": "json_object"}
-                )
-                return response.choices[0].message.content
-            
-            if agent == "engineer" and self.anthropic_client:
-                response = self.anthropic_client.messages.create(
-                    model="claude-3-5-sonnet-20240620",
-                    max_tokens=2048,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_prompt}]
-                )
-                return response.content[0].text
-            
-            if agent == "reviewer" and self.openai_client:
-                 response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                    response_format={"type": "json_object"}
-                )
-                 return response.choices[0].message.content
-
-            # Fallback: Local Ollama
-            response = ollama.chat(
-                model='llama3',
-                messages=[{'role': 'system', 'content': system_prompt}, {'role': 'user', 'content': user_prompt}]
+            # Pooled, deadline-bounded; a slow or failing cloud primary is hedged on local Ollama
+            content, answered_by, answered_model = self.llm_gateway.complete(
+                provider, model, system_prompt, user_prompt,
+                temperature=temperature,
+                json_mode=agent in ("theorist", "reviewer"),
+                on_token=on_token,
+                usage=usage
             )
-            return response['message']['content']
+            self.tracer.annotate(answered_by=answered_by, answered_model=answered_model, **usage)
         except Exception as e:
+            self.tracer.annotate(error=f"{type(e).__name__}: {e}")
             self.logger.warning(f"LLM Call Primary Fallback Failed for {agent}: {e}")
             # Final Safety Net for Reviewer if even OpenAI failed or agent is reviewer
             if agent == "reviewer":
                 return json.dumps({"score": 5, "verdict": "REVISE", "critique": f"Reviewer communication failure: {e}"})
             return json.dumps({"error": str(e), "verdict": "REJECT", "code": "print('LLM_ERROR')"})
 
-    def initialize_project(self, topic: str):
-        self.dsg["project_id"] = f"HIVE_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        self.dsg["topic"] = topic
-        self.dsg["status"] = "ACTIVE"
-        self.logger.info(f"Project Initialized: {self.dsg['project_id']}")
+        # Only genuine completions from the requested route are cached, never the error safety
+        # nets above nor a hedge's answer, which the key would pass off as the primary's
+        if (answered_by, answered_model) == (provider, model):
+            self.llm_cache.put(cache_key, agent, answered_by, answered_model, content)
+        return content
+
+    def _emit(self, dsg: Dict[str, Any], event_type: str, **data):
+        self.events.publish(dsg["project_id"], event_type, **data)
+
+    def _token_sink(self, dsg: Dict[str, Any], agent: str, **tags) -> Callable[[str], None]:
+        return lambda text: self._emit(dsg, "token", agent=agent, text=text, **tags)
+
+    def initialize_project(self, topic: str, dsg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        dsg = dsg or self.new_dsg(topic)
+        with self.dsg_lock(dsg["project_id"]):
+            dsg["topic"] = topic
+            dsg["status"] = "ACTIVE"
+        self._emit(dsg, "status", status="ACTIVE", topic=topic)
+        # Warm the sandbox while the theorist is still thinking
+        if not self.sovereign_mock and self.client:
+            self.container_pool.warm()
+        else:
+            self.interpreter_pool.warm()
+        self.logger.info(f"Project Initialized: {dsg['project_id']}")
+        self._checkpoint(dsg, "project")
+        return dsg
+
+    def _checkpoint(self, dsg: Dict[str, Any], node: str):
+        # save() appends to the DSG's checkpoint trail before writing it
+        with self.dsg_lock(dsg["project_id"]):
+            self.checkpoints.save(dsg, node)
 
-    def run_sandbox_execution(self, code: str) -> Dict[str, Any]:
+    def run_sandbox_execution(self, code: str, cancel_event: Optional[threading.Event] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        start = time.perf_counter()
         if not self.sovereign_mock and self.client:
-            return self._run_docker_execution(code)
+            backend, result = "docker", self._run_docker_execution(code, cancel_event, on_output)
         else:
-            return self._run_subprocess_execution(code)
+            backend, result = "subprocess", self._run_subprocess_execution(code, cancel_event, on_output)
+        outcome = "ok" if result.get("exit_code") == 0 else "failed"
+        SANDBOX_RUN_SECONDS.labels(backend, outcome).observe(time.perf_counter() - start)
+        return result
 
-    def _run_docker_execution(self, code: str) -> Dict[str, Any]:
+    def _run_docker_execution(self, code: str, cancel_event: Optional[threading.Event] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
         try:
-            container = self.client.containers.run(
-                image="python:3.11-slim",
-                command=["python", "-c", code],
-                detach=True,
-                network_disabled=True,
-                mem_limit="128m",
-                cpu_quota=50000,
-                remove=False
-            )
-            result = container.wait(timeout=10)
-            logs = container.logs().decode("utf-8")
-            container.remove()
-            return {"exit_code": result["StatusCode"], "logs": logs}
+            return self.container_pool.run(code, self.sandbox_timeout, cancel_event, on_output)
         except Exception as e:
             return {"exit_code": 1, "logs": str(e)}
 
-    def _run_subprocess_execution(self, code: str) -> Dict[str, Any]:
+    def _run_subprocess_execution(self, code: str, cancel_event: Optional[threading.Event] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
         """
-        Sovereign Mock: Soft-Cage Execution using subprocess.
+        Sovereign Mock: Soft-Cage Execution using pre-warmed, single-use interpreters.
         """
-        fd, path = tempfile.mkstemp(suffix=".py")
         try:
-            with os.fdopen(fd, 'w') as tmp:
-                tmp.write(code)
-            
-            result = subprocess.run(
-                ["python", path],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                env={"PATH": os.environ["PATH"]} # Clean env could be safer
-            )
-            return {
-                "exit_code": result.returncode,
-                "logs": result.stdout + result.stderr
-            }
-        except subprocess.TimeoutExpired:
-            return {"exit_code": 124, "logs": "TIMEOUT: Code execution exceeded 10s limits."}
+            return self.interpreter_pool.run(code, self.sandbox_timeout, cancel_event, on_output)
         except Exception as e:
             return {"exit_code": 1, "logs": str(e)}
-        finally:
-            if os.path.exists(path):
-                os.remove(path)
 
-    def step_theorist(self, topic: str):
+    def step_theorist(self, dsg: Dict[str, Any]):
         self.logger.info("THEORIST START: Grounding in Doctrine...")
         
         # Real RAG Retrieval (Will auto-fallback to PersistentClient if HTTP fails)
-        results = retriever.retrieve(topic, collection_name="doctrine", n_results=5)
+        topic = dsg["topic"]
+        with self.tracer.span(dsg, "rag.retrieve", collection="doctrine") as span:
+            try:
+                results = retriever.retrieve(topic, collection_name="doctrine", n_results=5)
+            except Exception as e:
+                self.logger.warning(f"RAG retrieval failed: {e}")
+                span["error"] = f"{type(e).__name__}: {e}"
+                results = []
+            span["results"] = len(results)
         
         # In PoC, if db is empty, we force mock grounding to allow logic validation
         if not results:
@@ -173,89 +270,257 @@ class HiveOrchestrator:
                  {"metadata": {"source": "IEEE_BCI_Security_2026.pdf"}, "content": "Side-channel attacks on brain-data payloads."}
              ]
 
+        grounding = [r.get('metadata', {}).get('source', 'Unknown') for r in results]
+        self._emit(dsg, "grounding", sources=grounding)
+
         context = retriever.format_for_prompt(results)
         sys_prompt = self._load_prompt("theorist")
         user_prompt = f"Topic: {topic}\n\nContext:\n{context}\n\nGenerate Hypothesis JSON."
 
-        response_json = self._llm_call("theorist", sys_prompt, user_prompt)
+        with self.tracer.span(dsg, "llm.call", agent="theorist"):
+            response_json = self._llm_call("theorist", sys_prompt, user_prompt, on_token=self._token_sink(dsg, "theorist"))
         
         try:
             content = json.loads(response_json)
         except:
             content = {"error": "JSON_PARSE_FAILED", "raw": response_json}
 
-        self.dsg["nodes"]["ideation"] = {
-            "content": content,
-            "grounding": [r.get('metadata', {}).get('source', 'Unknown') for r in results],
-            "status": "VERIFIED_GROUNDING"
-        }
+        with self.dsg_lock(dsg["project_id"]):
+            dsg["nodes"]["ideation"] = {
+                "content": content,
+                "grounding": grounding,
+                "status": "VERIFIED_GROUNDING"
+            }
         return True
 
-    def step_engineer(self):
-        hyp_content = self.dsg["nodes"]["ideation"]["content"]
+    def step_engineer(self, dsg: Dict[str, Any], parallelism: Optional[int] = None):
+        """
+        Realization with up to `max_trials` attempts spread over K parallel
+        lanes. Each lane keeps its own Reflexion loop (prompt variant and
+        temperature differ per lane); the first exit 0 cancels every other
+        lane, including sandboxes that are still running.
+        """
+        hyp_content = dsg["nodes"]["ideation"]["content"]
         if not hyp_content: return False
 
         sys_prompt = self._load_prompt("engineer")
         max_trials = 5
-        current_user_prompt = f"Goal: Realize this hypothesis: {json.dumps(hyp_content)}\nGenerate Python code."
-        
-        for trial in range(max_trials):
-            self.logger.info(f"ENGINEER TRIAL {trial+1}/{max_trials}...")
-            
-            response = self._llm_call("engineer", sys_prompt, current_user_prompt)
-            try:
-                data = json.loads(response) if "{" in response else {"code": response}
-            except:
-                data = {"code": response}
-            
-            code = data.get("code", "")
-
-            exec_result = self.run_sandbox_execution(code)
-            exec_result["trial"] = trial + 1
-            self.dsg["nodes"]["realization"]["trials"].append(exec_result)
-
-            if exec_result["exit_code"] == 0:
-                self.dsg["nodes"]["realization"]["content"] = code
-                self.dsg["nodes"]["realization"]["status"] = "COMPILED"
+        lanes = max(1, min(parallelism or self.engineer_parallelism, max_trials))
+        base_prompt = f"Goal: Realize this hypothesis: {json.dumps(hyp_content)}\nGenerate Python code."
+
+        cancel = threading.Event()
+        lock = threading.Lock()
+        claimed = [0]
+        finished: List[Dict[str, Any]] = []
+        winner: Dict[str, Any] = {}
+
+        def run_lane(lane: int):
+            hint = ENGINEER_VARIANTS[lane % len(ENGINEER_VARIANTS)]
+            temperature = None if lane == 0 else min(1.0, 0.4 + 0.2 * lane)
+            current_user_prompt = f"{base_prompt}\n{hint}" if hint else base_prompt
+            while not cancel.is_set():
+                with lock:
+                    if claimed[0] >= max_trials:
+                        return
+                    claimed[0] += 1
+                    trial = claimed[0]
+                self.logger.info(f"ENGINEER TRIAL {trial}/{max_trials} (lane {lane})...")
+
+                self._emit(dsg, "trial_start", trial=trial, lane=lane)
+                with self.tracer.span(dsg, "engineer.trial", trial=trial, lane=lane) as trial_span:
+                    with self.tracer.span(dsg, "llm.call", agent="engineer", trial=trial, lane=lane, temperature=temperature):
+                        response = self._llm_call(
+                            "engineer", sys_prompt, current_user_prompt, temperature=temperature,
+                            on_token=self._token_sink(dsg, "engineer", trial=trial, lane=lane)
+                        )
+                    try:
+                        data = json.loads(response) if "{" in response else {"code": response}
+                    except:
+                        data = {"code": response}
+
+                    code = data.get("code", "")
+
+                    if cancel.is_set():
+                        exec_result = {"exit_code": 130, "logs": "CANCELLED: superseded by a passing trial."}
+                    else:
+                        with self.tracer.span(dsg, "sandbox.run", trial=trial, lane=lane, backend="subprocess" if self.sovereign_mock or not self.client else "docker") as span:
+                            exec_result = self.run_sandbox_execution(
+                                code, cancel,
+                                on_output=lambda stream, line: self._emit(dsg, "sandbox", trial=trial, lane=lane, stream=stream, line=line)
+                            )
+                            span.update(exit_code=exec_result["exit_code"], startup_ms=exec_result.get("startup_ms"), truncated=bool(exec_result.get("truncated")))
+                    trial_span["exit_code"] = exec_result["exit_code"]
+                exec_result["trial"] = trial
+                exec_result["lane"] = lane
+                self._emit(dsg, "trial_end", trial=trial, lane=lane, exit_code=exec_result["exit_code"])
+
+                with lock:
+                    if exec_result["exit_code"] == 0 and not winner:
+                        winner.update(exec_result, code=code)
+                        cancel.set()
+                        return
+                    finished.append(exec_result)
+                if exec_result["exit_code"] != 0:
+                    self.logger.warning(f"TRIAL {trial} FAILED: Reflexion triggered.")
+                    current_user_prompt = f"Your previous code failed with this error:\n{self._reflexion_logs(exec_result)}\n\nFix it. Paga el Impuesto de Verificación."
+
+        if lanes == 1:
+            run_lane(0)
+        else:
+            with ThreadPoolExecutor(max_workers=lanes, thread_name_prefix="hive-engineer") as pool:
+                for future in [pool.submit(run_lane, lane) for lane in range(lanes)]:
+                    future.result()
+
+        # Losing/cancelled attempts first, the passing one last (reviewer reads trials[-1])
+        realization = dsg["nodes"]["realization"]
+        with self.dsg_lock(dsg["project_id"]):
+            realization["trials"].extend(sorted(finished, key=lambda t: t["trial"]))
+            if winner:
+                code = winner.pop("code")
+                realization["trials"].append(winner)
+                realization["content"] = code
+                realization["status"] = "COMPILED"
                 return True
-            else:
-                self.logger.warning(f"TRIAL {trial+1} FAILED: Reflexion triggered.")
-                current_user_prompt = f"Your previous code failed with this error:\n{exec_result['logs']}\n\nFix it. Paga el Impuesto de Verificación."
-        
-        self.dsg["nodes"]["realization"]["status"] = "FAILED_CIRCUIT_BREAKER"
-        return False
 
-    def step_reviewer(self):
-        if self.dsg["nodes"]["realization"]["status"] != "COMPILED":
+            realization["status"] = "FAILED_CIRCUIT_BREAKER"
+            return False
+
+    @staticmethod
+    def _reflexion_logs(exec_result: Dict[str, Any]) -> str:
+        """
+        Trial logs cut down for the Reflexion prompt.
+
+        Keeps a short head and the last lines (stderr comes last in the
+        logs), then clips the result to REFLEXION_MAX_BYTES. A note leads
+        whenever the sandbox or this cut dropped anything.
+        """
+        notes = [
+            f"{stream}: {t['lines']} lines / {t['bytes']} bytes, {t['dropped_lines']} lines / {t['dropped_bytes']} bytes omitted"
+            for stream, t in (exec_result.get("truncated") or {}).items() if t["dropped_lines"] or t["dropped_bytes"]
+        ]
+        lines = exec_result["logs"].splitlines()
+        if len(lines) > REFLEXION_HEAD_LINES + REFLEXION_TAIL_LINES:
+            omitted = len(lines) - REFLEXION_HEAD_LINES - REFLEXION_TAIL_LINES
+            notes.append(f"{omitted} more lines cut from the middle")
+            lines = lines[:REFLEXION_HEAD_LINES] + ["..."] + lines[len(lines) - REFLEXION_TAIL_LINES:]
+        logs = "\n".join(lines)
+        raw = logs.encode()
+        if len(raw) > REFLEXION_MAX_BYTES:
+            notes.append(f"clipped to {REFLEXION_MAX_BYTES} bytes")
+            head = raw[:REFLEXION_MAX_BYTES // 4].decode(errors="ignore")
+            tail = raw[len(raw) - REFLEXION_MAX_BYTES * 3 // 4:].decode(errors="ignore")
+            logs = f"{head}\n...\n{tail}"
+        if not notes:
+            return logs
+        return f"[Output truncated ({'; '.join(notes)}). Print less.]\n{logs}"
+
+    def step_reviewer(self, dsg: Dict[str, Any]):
+        if dsg["nodes"]["realization"]["status"] != "COMPILED":
             return False
 
         sys_prompt = self._load_prompt("reviewer")
-        user_prompt = f"Hypothesis: {json.dumps(self.dsg['nodes']['ideation']['content'])}\nImplementation: {self.dsg['nodes']['realization']['content']}\nLogs: {self.dsg['nodes']['realization']['trials'][-1]['logs']}\n\nAudit strictly."
+        user_prompt = f"Hypothesis: {json.dumps(dsg['nodes']['ideation']['content'])}\nImplementation: {dsg['nodes']['realization']['content']}\nLogs: {dsg['nodes']['realization']['trials'][-1]['logs']}\n\nAudit strictly."
         
-        response = self._llm_call("reviewer", sys_prompt, user_prompt)
+        with self.tracer.span(dsg, "llm.call", agent="reviewer"):
+            response = self._llm_call("reviewer", sys_prompt, user_prompt, on_token=self._token_sink(dsg, "reviewer"))
         try:
             audit_data = json.loads(response) if "{" in response else {"critique": response, "score": 0, "verdict": "REJECT"}
         except:
             audit_data = {"critique": response, "score": 0, "verdict": "REJECT"}
         
-        self.dsg["nodes"]["audit"] = {
-            "score": audit_data.get("score", 0),
-            "verdict": audit_data.get("verdict", "REJECT"),
-            "critique": audit_data.get("critique", "No critique provided"),
-            "status": "AUDITED"
-        }
-        
-        if audit_data.get("verdict") == "ACCEPT":
-            self.dsg["status"] = "COMPLETED"
-        else:
-            self.dsg["status"] = "REJECTED_BY_PEER_REVIEW"
+        with self.dsg_lock(dsg["project_id"]):
+            dsg["nodes"]["audit"] = {
+                "score": audit_data.get("score", 0),
+                "verdict": audit_data.get("verdict", "REJECT"),
+                "critique": audit_data.get("critique", "No critique provided"),
+                "status": "AUDITED"
+            }
+            if audit_data.get("verdict") == "ACCEPT":
+                dsg["status"] = "COMPLETED"
+            else:
+                dsg["status"] = "REJECTED_BY_PEER_REVIEW"
+
+        self._emit(dsg, "verdict", **{k: v for k, v in dsg["nodes"]["audit"].items() if k != "status"})
         return True
 
-    def execute_complete_cycle(self, topic: str):
-        self.initialize_project(topic)
-        if not self.step_theorist(topic): return self.dsg
-        if not self.step_engineer(): return self.dsg
-        if not self.step_reviewer(): return self.dsg
-        return self.dsg
+    def _run_stages(self, dsg: Dict[str, Any], start: str, only: bool = False) -> Dict[str, Any]:
+        """Runs nodes from `start` on, checkpointing after every transition."""
+        nodes = [node for node, _ in STAGES]
+        with self.tracer.span(dsg, "cycle", start=start, only=only) as cycle:
+            for node, agent in STAGES[nodes.index(start):]:
+                self._emit(dsg, "stage_start", node=node, agent=agent)
+                with self.tracer.span(dsg, f"stage.{node}", agent=agent) as span:
+                    ok = getattr(self, f"step_{agent}")(dsg)
+                    span["status"] = dsg["nodes"][node]["status"]
+                self._checkpoint(dsg, node)
+                self._emit(dsg, "stage_end", node=node, agent=agent, status=dsg["nodes"][node]["status"])
+                if not ok or only:
+                    break
+            cycle["status"] = dsg["status"]
+        return dsg
+
+    def execute_complete_cycle(self, topic: str, dsg: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        dsg = self.initialize_project(topic, dsg)
+        return self._run_stages(dsg, "ideation")
+
+    def _load(self, project: Any) -> Dict[str, Any]:
+        dsg = self.checkpoints.load(project) if isinstance(project, str) else project
+        if dsg is None:
+            raise KeyError(f"No checkpoint for project {project}")
+        return dsg
+
+    def resume_cycle(self, project: Any) -> Dict[str, Any]:
+        """
+        Continues a cycle (DSG or checkpointed project id) from the first
+        node that has not completed; finished upstream nodes are reused.
+        """
+        dsg = self._load(project)
+        pending = [node for node, _ in STAGES if dsg["nodes"][node]["status"] != STAGE_DONE[node]]
+        if not pending:
+            return dsg
+        self.logger.info(f"Resuming {dsg['project_id']} at {pending[0]}")
+        # A partially-run node restarts from scratch (e.g. half the engineer trials)
+        with self.dsg_lock(dsg["project_id"]):
+            dsg["nodes"][pending[0]] = self._empty_node(pending[0])
+        self.initialize_project(dsg["topic"], dsg)
+        return self._run_stages(dsg, pending[0])
+
+    @staticmethod
+    def stage_node(agent: str) -> str:
+        """The DSG node `agent` produces; ValueError for an unknown stage."""
+        agents = {a: node for node, a in STAGES}
+        if agent not in agents:
+            raise ValueError(f"Unknown stage '{agent}' (expected one of {list(agents)})")
+        return agents[agent]
+
+    @classmethod
+    def validate_rerun(cls, dsg: Dict[str, Any], agent: str) -> str:
+        """`agent`'s node; ValueError unless every node upstream of it is done."""
+        node = cls.stage_node(agent)
+        nodes = [n for n, _ in STAGES]
+        for upstream in nodes[:nodes.index(node)]:
+            if dsg["nodes"][upstream]["status"] != STAGE_DONE[upstream]:
+                raise ValueError(f"Cannot re-run {agent}: upstream node '{upstream}' is {dsg['nodes'][upstream]['status']}")
+        return node
+
+    def rerun_stage(self, project: Any, agent: str) -> Dict[str, Any]:
+        """
+        Re-runs a single agent against the stored upstream outputs. Its own
+        node and every downstream node are reset, since they are stale.
+        """
+        dsg = self._load(project)
+        node = self.validate_rerun(dsg, agent)
+        nodes = [n for n, _ in STAGES]
+        with self.dsg_lock(dsg["project_id"]):
+            for stale in nodes[nodes.index(node):]:
+                dsg["nodes"][stale] = self._empty_node(stale)
+        self.initialize_project(dsg["topic"], dsg)
+        self._run_stages(dsg, node, only=True)
+        if dsg["status"] == "ACTIVE":
+            # Downstream nodes were invalidated and wait for resume_cycle
+            with self.dsg_lock(dsg["project_id"]):
+                dsg["status"] = "PAUSED"
+                self.checkpoints.save(dsg, "project")
+        return dsg
 
 hive_orchestrator = HiveOrchestrator()
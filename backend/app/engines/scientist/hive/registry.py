@@ -0,0 +1,176 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .orchestrator import hive_orchestrator
+from .events import TERMINAL_EVENT
+
+FINISHED_STATES = {"COMPLETED", "REJECTED_BY_PEER_REVIEW", "FAILED", "ERROR", "PAUSED"}
+
+class HiveQueueFull(RuntimeError):
+    """The scheduler already holds `max_queued` waiting projects."""
+
+class HiveProjectBusy(RuntimeError):
+    """The project is already queued or running."""
+
+class ProjectRegistry:
+    """
+    Isolated DSGs for concurrent research cycles, plus a bounded scheduler.
+
+    Every submitted topic gets its own DSG (no shared mutable state between
+    cycles). At most `max_concurrent` cycles run at once on a worker pool;
+    up to `max_queued` more wait in FIFO order and anything beyond is
+    refused. Finished projects are kept for polling until `max_retained`
+    is exceeded, oldest first.
+    """
+
+    def __init__(self, orchestrator, max_concurrent: Optional[int] = None, max_queued: Optional[int] = None, max_retained: Optional[int] = None):
+        self.logger = logging.getLogger("cslf.hive.registry")
+        self.orchestrator = orchestrator
+        self.max_concurrent = max_concurrent or int(os.getenv("HIVE_MAX_CONCURRENT_PROJECTS", "4"))
+        self.max_queued = max_queued or int(os.getenv("HIVE_MAX_QUEUED_PROJECTS", "256"))
+        self.max_retained = max_retained or int(os.getenv("HIVE_MAX_RETAINED_PROJECTS", "1000"))
+
+        self._projects: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._active: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="hive-project")
+
+    def submit(self, topic: str) -> Dict[str, Any]:
+        dsg = self.orchestrator.new_dsg(topic)
+        return self._schedule(dsg, lambda: self.orchestrator.execute_complete_cycle(dsg["topic"], dsg))
+
+    def resume(self, project_id: str) -> Dict[str, Any]:
+        """Continues a project (in memory or checkpointed) from its last completed node."""
+        dsg = self._lookup(project_id)
+        return self._schedule(dsg, lambda: self.orchestrator.resume_cycle(dsg))
+
+    def rerun(self, project_id: str, agent: str) -> Dict[str, Any]:
+        """Re-runs one stage (theorist/engineer/reviewer) on stored upstream outputs."""
+        # The orchestrator's own checks, run here rather than on the worker so the caller gets the error
+        self.orchestrator.stage_node(agent)
+        dsg = self._lookup(project_id)
+        self.orchestrator.validate_rerun(dsg, agent)
+        return self._schedule(dsg, lambda: self.orchestrator.rerun_stage(dsg, agent), full_cycle=False)
+
+    def _lookup(self, project_id: str) -> Dict[str, Any]:
+        with self._lock:
+            dsg = self._projects.get(project_id)
+        if dsg is None:
+            try:
+                dsg = self.orchestrator.checkpoints.load(project_id)
+            except ValueError:
+                dsg = None
+            if dsg is None:
+                raise KeyError(project_id)
+        return dsg
+
+    def _schedule(self, dsg: Dict[str, Any], action: Callable[[], Any], full_cycle: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            if self._queued >= self.max_queued:
+                raise HiveQueueFull(f"{self._queued} projects already queued")
+            if dsg["project_id"] in self._active:
+                raise HiveProjectBusy(f"{dsg['project_id']} is already {dsg['status']}")
+            with self.orchestrator.dsg_lock(dsg["project_id"]):
+                dsg.update(status="QUEUED", submitted_at=time.time(), started_at=None, finished_at=None, error=None)
+            self._projects[dsg["project_id"]] = dsg
+            self._projects.move_to_end(dsg["project_id"])
+            self._active.add(dsg["project_id"])
+            self._queued += 1
+            self._evict()
+            position = self._queued
+        self.orchestrator.events.reopen(dsg["project_id"])
+        self.orchestrator.events.publish(dsg["project_id"], "status", status="QUEUED", queue_position=position)
+        self._executor.submit(self._run, dsg, action, full_cycle)
+        return {"project_id": dsg["project_id"], "status": "QUEUED", "queue_position": position}
+
+    def _run(self, dsg: Dict[str, Any], action: Callable[[], Any], full_cycle: bool):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        lock = self.orchestrator.dsg_lock(dsg["project_id"])
+        with lock:
+            dsg["started_at"] = time.time()
+        try:
+            action()
+            with lock:
+                if full_cycle and dsg["status"] not in FINISHED_STATES:
+                    # A stage gave up (e.g. engineer circuit breaker) without a verdict
+                    dsg["status"] = "FAILED"
+        except Exception as e:
+            self.logger.error(f"Hive project {dsg['project_id']} crashed: {e}")
+            with lock:
+                dsg["status"] = "ERROR"
+                dsg["error"] = str(e)
+        finally:
+            with lock:
+                dsg["finished_at"] = time.time()
+                # The last stage checkpoint predates the final status: a client that
+                # reads the checkpoint after `done` must see FAILED/ERROR, not ACTIVE
+                try:
+                    self.orchestrator.checkpoints.save(dsg, "project")
+                except Exception as e:
+                    self.logger.error(f"Hive project {dsg['project_id']}: final checkpoint failed: {e}")
+            with self._lock:
+                self._running -= 1
+                self._active.discard(dsg["project_id"])
+            self.orchestrator.events.publish(dsg["project_id"], TERMINAL_EVENT, status=dsg["status"], error=dsg.get("error"))
+
+    def _evict(self):
+        """Drop the oldest finished projects beyond `max_retained` (caller holds the lock)."""
+        excess = len(self._projects) - self.max_retained
+        if excess <= 0:
+            return
+        for project_id in [pid for pid, d in self._projects.items() if pid not in self._active][:excess]:
+            del self._projects[project_id]
+
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            dsg = self._projects.get(project_id)
+        if dsg is None:
+            # Evicted or from a previous process: serve the last checkpoint
+            try:
+                return self.orchestrator.checkpoints.load(project_id)
+            except ValueError:
+                return None
+        # Lanes and the cycle thread change the DSG under this lock while it runs
+        with self.orchestrator.dsg_lock(project_id):
+            return copy.deepcopy(dsg)
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest-first summaries (no node payloads)."""
+        limit = max(1, min(limit, 1000))
+        with self._lock:
+            projects = list(reversed(self._projects.values()))
+        summaries = []
+        for dsg in projects:
+            if status and dsg["status"] != status:
+                continue
+            summaries.append({
+                "project_id": dsg["project_id"],
+                "topic": dsg["topic"],
+                "status": dsg["status"],
+                "stages": {name: node["status"] for name, node in dsg["nodes"].items()},
+                "submitted_at": dsg["submitted_at"],
+                "started_at": dsg["started_at"],
+                "finished_at": dsg["finished_at"],
+            })
+            if len(summaries) == limit:
+                break
+        return summaries
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"running": self._running, "queued": self._queued, "retained": len(self._projects), "max_concurrent": self.max_concurrent, "max_queued": self.max_queued}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+hive_registry = ProjectRegistry(hive_orchestrator)
@@ -0,0 +1,498 @@
+import atexit
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+# (stream, line) with stream in {"stdout", "stderr"}
+OutputCallback = Callable[[str, str], None]
+
+CANCELLED = {"exit_code": 130, "logs": "CANCELLED: superseded by a passing trial."}
+
+# Runs inside a pre-started interpreter: apply the rlimits passed as argv
+# (cpu seconds, memory MB, file MB; POSIX only), announce readiness, block
+# on stdin until the trial's code arrives, then execute it as __main__
+# like `python file.py` (uncaught exceptions print a traceback and exit 1,
+# SystemExit and atexit hooks are honoured). Interpreter finalisation is
+# skipped with os._exit once output is flushed, since the process is
+# thrown away anyway.
+READY_MARKER = "__cslf_sandbox_ready__"
+INTERPRETER_BOOTSTRAP = f"""
+import sys, os, atexit, linecache
+try:
+    import resource
+    _cpu, _mem, _fsize = (int(v) for v in sys.argv[1:4])
+    # 0 (or less) leaves that limit unset
+    if _cpu > 0:
+        resource.setrlimit(resource.RLIMIT_CPU, (_cpu, _cpu + 1))
+    if _mem > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (_mem * 1048576, _mem * 1048576))
+    if _fsize > 0:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (_fsize * 1048576, _fsize * 1048576))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+except ImportError:
+    pass
+sys.argv = ["<trial>"]
+sys.stdout.write("{READY_MARKER}\\n")
+sys.stdout.flush()
+_src = sys.stdin.read()
+sys.stdin.close()
+linecache.cache["<trial>"] = (len(_src), None, _src.splitlines(True), "<trial>")
+_status = 0
+try:
+    exec(compile(_src, "<trial>", "exec"), {{"__name__": "__main__", "__builtins__": __builtins__}})
+except SystemExit as _e:
+    _status = _e.code if isinstance(_e.code, int) else (0 if _e.code is None else 1)
+    if not isinstance(_e.code, (int, type(None))):
+        print(_e.code, file=sys.stderr)
+except BaseException as _e:
+    import traceback
+    traceback.print_exception(type(_e), _e, _e.__traceback__.tb_next)
+    _status = 1
+atexit._run_exitfuncs()
+sys.stdout.flush()
+sys.stderr.flush()
+os._exit(_status)
+"""
+
+# Keeps a container alive (and cheap while paused) until a trial is exec'd into it
+CONTAINER_IDLE_COMMAND = ["python", "-c", "import time\nwhile True: time.sleep(3600)"]
+
+# Pipe reads are capped so a script printing one endless line cannot grow a buffer
+READ_CHUNK = 8192
+
+def _timeout_result(timeout: float, capture: Optional["OutputCapture"] = None) -> Dict[str, Any]:
+    result = {"exit_code": 124, "logs": f"TIMEOUT: Code execution exceeded {timeout}s limits."}
+    if capture is not None:
+        capture.finish()
+        partial = capture.logs()
+        if partial:
+            result["logs"] += f"\nOutput before the timeout:\n{partial}"
+        if capture.truncated:
+            result["truncated"] = capture.summary()
+    return result
+
+class OutputCapture:
+    """
+    Bounded capture of one trial's stdout and stderr.
+
+    Each stream keeps at most `max_bytes`: the first half as a head, the
+    most recent half as a rolling tail, with everything in between counted
+    and dropped. Lines are forwarded to `on_output` while they land in the
+    head; once a stream overflows a single truncation marker is forwarded
+    and the retained tail follows on `finish()`, so live consumers are
+    bounded too.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, on_output: Optional[OutputCallback] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("HIVE_SANDBOX_MAX_OUTPUT", "65536"))
+        self.on_output = on_output
+        self._streams = {
+            name: {"head": [], "head_bytes": 0, "tail": deque(), "tail_bytes": 0, "partial": "",
+                   "bytes": 0, "lines": 0, "dropped_bytes": 0, "dropped_lines": 0}
+            for name in ("stdout", "stderr")
+        }
+        self._lock = threading.Lock()
+        self._finished = False
+
+    def feed(self, stream: str, text: str):
+        """Accepts arbitrary chunks; only complete lines are stored."""
+        with self._lock:
+            if self._finished:
+                return
+            state = self._streams[stream]
+            *lines, state["partial"] = (state["partial"] + text).split("\n")
+            if len(state["partial"]) > READ_CHUNK:
+                # An unterminated line: store what we have rather than buffering it
+                lines.append(state["partial"])
+                state["partial"] = ""
+            for line in lines:
+                self._add(stream, state, line)
+
+    def _add(self, stream: str, state: Dict[str, Any], line: str):
+        size = len(line.encode("utf-8", errors="replace")) + 1
+        state["bytes"] += size
+        state["lines"] += 1
+        budget = self.max_bytes // 2
+        if state["head_bytes"] + size <= budget and not state["tail"] and not state["dropped_lines"]:
+            state["head"].append(line)
+            state["head_bytes"] += size
+            if self.on_output is not None:
+                self.on_output(stream, line)
+            return
+        if not state["tail"] and not state["dropped_lines"] and self.on_output is not None:
+            self.on_output(stream, "... [output exceeds capture limit; showing the tail when the trial ends] ...")
+        if size > budget:
+            line = line[-budget:]
+            state["dropped_bytes"] += size - budget
+            size = budget
+        state["tail"].append((line, size))
+        state["tail_bytes"] += size
+        while state["tail_bytes"] > budget:
+            _, dropped = state["tail"].popleft()
+            state["tail_bytes"] -= dropped
+            state["dropped_bytes"] += dropped
+            state["dropped_lines"] += 1
+
+    def finish(self):
+        """Flushes unterminated last lines and forwards the retained tails."""
+        with self._lock:
+            if self._finished:
+                return
+            for stream, state in self._streams.items():
+                if state["partial"]:
+                    self._add(stream, state, state["partial"])
+                    state["partial"] = ""
+            self._finished = True
+        if self.on_output is not None:
+            for stream, state in self._streams.items():
+                if state["dropped_lines"] or state["dropped_bytes"]:
+                    self.on_output(stream, self._marker(stream, state).strip())
+                for line, _ in state["tail"]:
+                    self.on_output(stream, line)
+
+    @staticmethod
+    def _marker(stream: str, state: Dict[str, Any]) -> str:
+        return f"... [{state['dropped_lines']} lines / {state['dropped_bytes']} bytes of {stream} truncated] ...\n"
+
+    @property
+    def truncated(self) -> bool:
+        return any(s["dropped_lines"] or s["dropped_bytes"] for s in self._streams.values())
+
+    def logs(self) -> str:
+        """stdout then stderr, each as head + truncation marker + tail."""
+        parts = []
+        for stream, state in self._streams.items():
+            parts.extend(line + "\n" for line in state["head"])
+            if state["dropped_lines"] or state["dropped_bytes"]:
+                parts.append(self._marker(stream, state))
+            parts.extend(line + "\n" for line, _ in state["tail"])
+        return "".join(parts)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            stream: {k: state[k] for k in ("bytes", "lines", "dropped_bytes", "dropped_lines")}
+            for stream, state in self._streams.items()
+        }
+
+    def result(self, exit_code: int) -> Dict[str, Any]:
+        self.finish()
+        result = {"exit_code": exit_code, "logs": self.logs()}
+        if self.truncated:
+            result["truncated"] = self.summary()
+        return result
+
+# Signals a worker dies of when it hits one of its rlimits
+LIMIT_SIGNALS = {
+    getattr(signal, "SIGXCPU", None): "CPU time limit exceeded",
+    getattr(signal, "SIGXFSZ", None): "file size limit exceeded",
+}
+
+class InterpreterPool:
+    """
+    Sovereign Mock sandbox: a pool of idle, single-use `python` processes.
+
+    Interpreter start-up is paid in the background; a trial just writes
+    its source to a waiting worker's stdin. Workers are never reused (each
+    trial gets a pristine interpreter) and are replaced as soon as they are
+    handed out. Idle workers older than `max_idle` seconds are recycled so
+    the pool does not pin stale processes forever. Each worker runs under
+    CPU, memory and file-size rlimits (POSIX only); a limit of 0 means none.
+    """
+
+    def __init__(self, size: Optional[int] = None, max_idle: Optional[float] = None, cpu_seconds: Optional[int] = None, memory_mb: Optional[int] = None, file_mb: Optional[int] = None):
+        self.logger = logging.getLogger("cslf.hive.sandbox")
+        self.size = size if size is not None else int(os.getenv("HIVE_SANDBOX_POOL_SIZE", "2"))
+        self.max_idle = max_idle if max_idle is not None else float(os.getenv("HIVE_SANDBOX_MAX_IDLE", "600"))
+        self.cpu_seconds = cpu_seconds if cpu_seconds is not None else int(os.getenv("HIVE_SANDBOX_CPU_SECONDS", "10"))
+        self.memory_mb = memory_mb if memory_mb is not None else int(os.getenv("HIVE_SANDBOX_MEMORY_MB", "512"))
+        self.file_mb = file_mb if file_mb is not None else int(os.getenv("HIVE_SANDBOX_FILE_MB", "16"))
+        self.stats = {"warm_hits": 0, "cold_starts": 0, "recycled": 0}
+
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._filler: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _spawn(self) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            ["python", "-c", INTERPRETER_BOOTSTRAP, str(self.cpu_seconds), str(self.memory_mb), str(self.file_mb)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            # Clean env could be safer; unbuffered so output streams line by line
+            env={"PATH": os.environ["PATH"], "PYTHONUNBUFFERED": "1"}
+        )
+        # Only hand out interpreters that have finished booting
+        if proc.stdout.readline().strip() != READY_MARKER:
+            proc.kill()
+            stderr = proc.communicate()[1]
+            raise RuntimeError(f"Sandbox interpreter failed to start: {stderr.strip()}")
+        return proc
+
+    def warm(self):
+        """Starts the background filler (idempotent)."""
+        with self._lock:
+            if self._filler is None and self.size > 0 and not self._closed:
+                self._filler = threading.Thread(target=self._fill_loop, name="cslf-sandbox-pool", daemon=True)
+                self._filler.start()
+                atexit.register(self.close)
+        self._refill.set()
+
+    def _fill_loop(self):
+        failures = 0
+        while not self._closed:
+            self._refill.wait(timeout=min(self.max_idle, 30.0))
+            self._refill.clear()
+            now = time.monotonic()
+            with self._lock:
+                stale = [w for w in self._idle if now - w[1] > self.max_idle or w[0].poll() is not None]
+                for w in stale:
+                    self._idle.remove(w)
+                missing = self.size - len(self._idle)
+            for proc, _ in stale:
+                proc.kill()
+                proc.communicate()
+                self.stats["recycled"] += 1
+            for _ in range(max(0, missing)):
+                if self._closed:
+                    break
+                try:
+                    proc = self._spawn()
+                except Exception as e:
+                    # The filler must outlive a failed spawn, or every later acquire cold-starts
+                    failures += 1
+                    delay = min(30.0, 0.5 * 2 ** (failures - 1))
+                    self.logger.warning(f"Interpreter pool refill failed: {e}; retrying in {delay:g}s")
+                    time.sleep(delay)
+                    self._refill.set()
+                    break
+                failures = 0
+                with self._lock:
+                    self._idle.append((proc, time.monotonic()))
+
+    def acquire(self) -> subprocess.Popen:
+        self.warm()
+        with self._lock:
+            while self._idle:
+                proc, _ = self._idle.popleft()
+                if proc.poll() is None:
+                    self.stats["warm_hits"] += 1
+                    self._refill.set()
+                    return proc
+        self.stats["cold_starts"] += 1
+        self._refill.set()
+        return self._spawn()
+
+    def run(self, code: str, timeout: float, cancel_event: Optional[threading.Event] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        """
+        Executes `code` on a warm worker. Output is read as it is produced
+        into a bounded OutputCapture and, with `on_output`, forwarded as
+        (stream, line).
+        """
+        started = time.perf_counter()
+        proc = self.acquire()
+        startup_ms = round((time.perf_counter() - started) * 1000, 3)
+        capture = OutputCapture(on_output=on_output)
+
+        def pump(stream: str, pipe):
+            for chunk in iter(lambda: pipe.readline(READ_CHUNK), ""):
+                capture.feed(stream, chunk)
+
+        readers = [
+            threading.Thread(target=pump, args=("stdout", proc.stdout), daemon=True),
+            threading.Thread(target=pump, args=("stderr", proc.stderr), daemon=True),
+        ]
+        try:
+            # The bootstrap reads all of stdin before running anything, so this cannot block on output
+            proc.stdin.write(code)
+            proc.stdin.close()
+            for reader in readers:
+                reader.start()
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    proc.wait(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return dict(CANCELLED)
+                    if time.monotonic() > deadline:
+                        return _timeout_result(timeout, capture)
+            for reader in readers:
+                reader.join()
+            result = capture.result(proc.returncode)
+            result["startup_ms"] = startup_ms
+            if -proc.returncode in LIMIT_SIGNALS:
+                if result["logs"] and not result["logs"].endswith("\n"):
+                    result["logs"] += "\n"
+                result["logs"] += f"RLIMIT: {LIMIT_SIGNALS[-proc.returncode]} (killed by signal {-proc.returncode})."
+            return result
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+    def close(self):
+        self._closed = True
+        self._refill.set()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for proc, _ in idle:
+            proc.kill()
+            proc.communicate()
+
+class ContainerPool:
+    """
+    Docker sandbox: long-lived `python:3.11-slim` containers kept paused
+    until a trial is exec'd into them.
+
+    A container is unpaused, runs one `python -c <code>` exec, and is then
+    either paused again or destroyed once it has served `max_uses` trials
+    (default 1, i.e. a fresh filesystem per trial). Creation of
+    replacements happens off the request path.
+    """
+
+    def __init__(self, client, size: Optional[int] = None, max_uses: Optional[int] = None, max_idle: Optional[float] = None, image: str = "python:3.11-slim"):
+        self.logger = logging.getLogger("cslf.hive.sandbox")
+        self.client = client
+        self.image = image
+        self.size = size if size is not None else int(os.getenv("HIVE_SANDBOX_POOL_SIZE", "2"))
+        self.max_uses = max_uses if max_uses is not None else int(os.getenv("HIVE_SANDBOX_MAX_USES", "1"))
+        self.max_idle = max_idle if max_idle is not None else float(os.getenv("HIVE_SANDBOX_MAX_IDLE", "600"))
+        self.stats = {"warm_hits": 0, "cold_starts": 0, "recycled": 0}
+
+        self._idle: deque = deque()  # (container, uses, paused_at)
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._filler: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _spawn(self):
+        container = self.client.containers.run(
+            image=self.image,
+            command=CONTAINER_IDLE_COMMAND,
+            detach=True,
+            network_disabled=True,
+            mem_limit="128m",
+            cpu_quota=50000,
+            pids_limit=64,
+            remove=False
+        )
+        container.pause()
+        return container
+
+    def _discard(self, container):
+        try:
+            container.remove(force=True)
+        except Exception:
+            pass
+
+    def warm(self):
+        with self._lock:
+            if self._filler is None and self.size > 0 and not self._closed:
+                self._filler = threading.Thread(target=self._fill_loop, name="cslf-container-pool", daemon=True)
+                self._filler.start()
+                atexit.register(self.close)
+        self._refill.set()
+
+    def _fill_loop(self):
+        while not self._closed:
+            self._refill.wait(timeout=min(self.max_idle, 30.0))
+            self._refill.clear()
+            now = time.monotonic()
+            with self._lock:
+                stale = [w for w in self._idle if now - w[2] > self.max_idle]
+                for w in stale:
+                    self._idle.remove(w)
+                missing = self.size - len(self._idle)
+            for container, _, _ in stale:
+                self._discard(container)
+                self.stats["recycled"] += 1
+            for _ in range(max(0, missing)):
+                if self._closed:
+                    break
+                try:
+                    container = self._spawn()
+                except Exception as e:
+                    self.logger.warning(f"Container pool refill failed: {e}")
+                    break
+                with self._lock:
+                    self._idle.append((container, 0, time.monotonic()))
+
+    def acquire(self):
+        self.warm()
+        with self._lock:
+            entry = self._idle.popleft() if self._idle else None
+        self._refill.set()
+        if entry is not None:
+            self.stats["warm_hits"] += 1
+            container, uses, _ = entry
+        else:
+            self.stats["cold_starts"] += 1
+            container, uses = self._spawn(), 0
+        container.unpause()
+        return container, uses
+
+    def release(self, container, uses: int, healthy: bool):
+        if healthy and uses < self.max_uses and not self._closed:
+            try:
+                container.pause()
+                with self._lock:
+                    self._idle.append((container, uses, time.monotonic()))
+                return
+            except Exception:
+                pass
+        self._discard(container)
+        self._refill.set()
+
+    def run(self, code: str, timeout: float, cancel_event: Optional[threading.Event] = None, on_output: Optional[OutputCallback] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        container, uses = self.acquire()
+        startup_ms = round((time.perf_counter() - started) * 1000, 3)
+        outcome: Dict[str, Any] = {}
+        done = threading.Event()
+
+        capture = OutputCapture(on_output=on_output)
+
+        def execute():
+            api = self.client.api
+            try:
+                exec_id = api.exec_create(container.id, ["python", "-c", code], environment={"PYTHONUNBUFFERED": "1"})["Id"]
+                for out, err in api.exec_start(exec_id, stream=True, demux=True):
+                    for stream, data in (("stdout", out), ("stderr", err)):
+                        if data:
+                            capture.feed(stream, data.decode("utf-8", errors="replace"))
+                exit_code = api.exec_inspect(exec_id)["ExitCode"]
+                outcome["result"] = capture.result(exit_code)
+                outcome["result"]["startup_ms"] = startup_ms
+            except Exception as e:
+                outcome["result"] = {"exit_code": 1, "logs": str(e)}
+            finally:
+                done.set()
+
+        threading.Thread(target=execute, name="cslf-container-exec", daemon=True).start()
+        deadline = time.monotonic() + timeout
+        while not done.wait(0.1):
+            if cancel_event is not None and cancel_event.is_set():
+                self._discard(container)
+                return dict(CANCELLED)
+            if time.monotonic() > deadline:
+                self._discard(container)
+                return _timeout_result(timeout, capture)
+        self.release(container, uses + 1, healthy=True)
+        return outcome["result"]
+
+    def close(self):
+        self._closed = True
+        self._refill.set()
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for container, _, _ in idle:
+            self._discard(container)
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, Optional
+
+class HiveTracer:
+    """
+    Spans for every hive stage, LLM call and sandbox run.
+
+    Spans are appended to a local file in the Chrome Trace Event Format
+    (complete "X" events, one per line, inside an unterminated JSON array
+    as the format allows), so a trace opens directly in Perfetto or
+    chrome://tracing with one track per worker thread. Each span also
+    folds into `dsg["trace"]`, a per-project summary of where the cycle's
+    wall time, tokens and cache hits went. An empty HIVE_TRACE_PATH keeps
+    the summaries but writes no file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = logging.getLogger("cslf.hive.tracing")
+        self.path = path if path is not None else os.getenv("HIVE_TRACE_PATH", "./data/hive_trace.json")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # project_id -> lock guarding that DSG (set by the orchestrator); spans from parallel lanes fold under it
+        self.lock_for: Optional[Callable[[str], Any]] = None
+
+    @staticmethod
+    def empty_summary() -> Dict[str, Any]:
+        return {
+            "spans": 0,
+            "by_span": {},
+            "llm": {"calls": 0, "cache_hits": 0, "tokens_in": 0, "tokens_out": 0},
+            "sandbox": {"runs": 0, "failures": 0},
+        }
+
+    @contextmanager
+    def span(self, dsg: Dict[str, Any], name: str, **attrs) -> Iterator[Dict[str, Any]]:
+        """
+        Times the block as span `name`. The yielded dict is the span's
+        attributes; the block may add to it (tokens, exit code, ...).
+        Spans opened on the same thread nest under the current one.
+        """
+        stack = self._local.__dict__.setdefault("stack", [])
+        span_id = uuid.uuid4().hex[:16]
+        attrs.update(project_id=dsg["project_id"], span_id=span_id, parent_id=stack[-1]["span_id"] if stack else None)
+        stack.append(attrs)
+        start_wall, start = time.time(), time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            self._record(dsg, name, start_wall, duration, attrs)
+
+    def annotate(self, **attrs):
+        """Adds attributes to this thread's innermost open span (no-op outside one)."""
+        stack = getattr(self._local, "stack", None)
+        if stack:
+            stack[-1].update(attrs)
+
+    def _record(self, dsg: Dict[str, Any], name: str, start_wall: float, duration: float, attrs: Dict[str, Any]):
+        event = {
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": int(start_wall * 1e6),
+            "dur": int(duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": attrs,
+        }
+        project_lock = self.lock_for(dsg["project_id"]) if self.lock_for else nullcontext()
+        with project_lock, self._lock:
+            summary = dsg.setdefault("trace", self.empty_summary())
+            summary["spans"] += 1
+            stats = summary["by_span"].setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + duration * 1000, 3)
+            stats["max_ms"] = round(max(stats["max_ms"], duration * 1000), 3)
+            if name == "llm.call":
+                summary["llm"]["calls"] += 1
+                summary["llm"]["cache_hits"] += int(bool(attrs.get("cache_hit")))
+                summary["llm"]["tokens_in"] += attrs.get("tokens_in") or 0
+                summary["llm"]["tokens_out"] += attrs.get("tokens_out") or 0
+            elif name == "sandbox.run":
+                summary["sandbox"]["runs"] += 1
+                summary["sandbox"]["failures"] += int(attrs.get("exit_code") != 0)
+            if self.path:
+                self._write(event)
+
+    def _write(self, event: Dict[str, Any]):
+        """Appends one event (caller holds the lock); tracing never breaks a cycle."""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    f.write("[\n")
+                f.write(json.dumps(event, default=str) + ",\n")
+        except OSError as e:
+            self.logger.warning(f"Trace write failed: {e}")
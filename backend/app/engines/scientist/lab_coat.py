@@ -1,5 +1,6 @@
 import logging
 from typing import Dict, Any, List
+from .experiments import detection_experiment, DetectionLatencyExperiment
 # In a real implementation, we would import the RAG engine here to ground hypotheses.
 # For this PoC, we will simulate the RAG context or use a placeholder.
 
@@ -7,6 +8,7 @@ class Scientist:
     def __init__(self):
         self.logger = logging.getLogger("cslf.scientist")
         self.role = "Security Researcher"
+        self.experiment = detection_experiment
 
     def generate_hypothesis(self, topic: str) -> Dict[str, str]:
         """
@@ -44,7 +46,7 @@ for i in range(100):
     print(obfuscate_log("Malicious action attempt"))
     time.sleep(0.01)
 print("Experiment complete.")
-""".format(title=hypothesis['title'])
+""".replace("{title}", hypothesis['title'])
 
         return {
             "language": "python",
@@ -52,20 +54,44 @@ print("Experiment complete.")
             "expected_output": "Delayed detection signal"
         }
 
+    def run_experiment(self) -> Dict[str, Any]:
+        """
+        Executes the design's log flood against the Watcher's KillSwitch
+        matcher and reports the measured detection metrics.
+        """
+        try:
+            benchmark = self.experiment.run()
+        except Exception as e:
+            self.logger.error(f"Detection benchmark failed: {e}")
+            return {"success": False, "output": f"Experiment failed: {e}", "metrics": {}}
+
+        summary = DetectionLatencyExperiment.summarise(benchmark)
+        plain, obfuscated = summary["plain"], summary["obfuscated"]
+        increase = summary["latency_increase_pct"]
+        fmt_ms = lambda v: f"{v:.3f} ms" if v is not None else "n/a"
+        return {
+            "success": True,
+            "output": (
+                f"Flooded {len(benchmark['cells'])} (rate, obfuscation) cells of {benchmark['config']['lines']} lines "
+                f"through the KillSwitch matcher; obfuscated attacks were missed {obfuscated['miss_rate']:.1%} of the time."
+            ),
+            "metrics": {
+                "latency_increase": f"{increase:.1f}%" if increase is not None else "n/a",
+                "detection_p50_plain": fmt_ms(plain["p50_ms"]),
+                "detection_p50_obfuscated": fmt_ms(obfuscated["p50_ms"]),
+                "miss_rate_obfuscated": f"{obfuscated['miss_rate']:.1%}",
+                "throughput": f"{plain['throughput_lps']:,.0f} lines/s" if plain["throughput_lps"] else "n/a",
+            },
+            "benchmark": benchmark
+        }
+
     def conduct_research(self, topic: str) -> Dict[str, Any]:
         """
-        The main loop: Hypothesis -> Design -> (Simulated) Execution
+        The main loop: Hypothesis -> Design -> Execution (measured detection benchmark)
         """
         hypothesis = self.generate_hypothesis(topic)
         design = self.design_experiment(hypothesis)
-        
-        # Simulating Execution Phase (In v2.0 this runs in a secure micro-VM)
-        # result = exec(design['code']) 
-        result = {
-            "success": True, 
-            "output": "Experiment complete. Logs generated with noise.",
-            "metrics": {"latency_increase": "18%"} # Simulated finding
-        }
+        result = self.run_experiment()
 
         return {
             "hypothesis": hypothesis,
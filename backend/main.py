@@ -1,12 +1,42 @@
+import os
+import time
+from contextlib import asynccontextmanager
+
+# Import-to-ready clock: routers are cheap to import, engines connect lazily
+BOOT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.archive import router as archive_router
 from app.api.gaps import router as gaps_router
+from app.api.hive import router as hive_router
 from app.api.lab import router as lab_router
+from app.api.metrics import router as metrics_router, MetricsMiddleware
 from app.api.neuro import router as neuro_router
 from app.api.scientist import router as scientist_router
+from app.engines.agent_lab.watcher import watcher
+from app.engines.rag_engine.chroma_client import chroma_manager
+from app.engines.rag_engine.embeddings import embedder
+from app.engines.rag_engine.metadata_index import metadata_index, COLLECTIONS
+from app.engines.scientist.hive.orchestrator import hive_orchestrator
+from app.engines.readiness import engine_registry
+
+engine_registry.register("chroma", chroma_manager.connect, lambda: chroma_manager.ready)
+engine_registry.register("agent_lab", watcher.connect, lambda: watcher.ready)
+engine_registry.register("embeddings", embedder.connect, lambda: embedder.ready)
+engine_registry.register("hive_sandbox", hive_orchestrator.connect, lambda: hive_orchestrator.ready)
+engine_registry.register("archive_index", metadata_index.load_all, lambda: all(metadata_index.loaded(name) for name in COLLECTIONS))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.startup_ms = round((time.perf_counter() - BOOT_STARTED) * 1000, 1)
+    # ENGINE_WARMUP=false leaves every engine to connect on first use
+    if os.getenv("ENGINE_WARMUP", "true").lower() == "true":
+        engine_registry.start()
+    yield
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Cortex-Sec Local Forge",
     description="Backend API for the Autonomous Local Governance System",
     version="1.0.0",
@@ -27,14 +57,27 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # App Routers
 app.include_router(archive_router)
 app.include_router(gaps_router)
+app.include_router(hive_router)
 app.include_router(lab_router)
+app.include_router(metrics_router)
 app.include_router(neuro_router)
 app.include_router(scientist_router)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "operational", "system": "Cortex-Sec Local Forge"}
+    """
+    Always 200 once the app serves: routes on a cold engine wait for its
+    lazy connect, everything else is unaffected. `engines` says which.
+    """
+    readiness = engine_registry.status()
+    return {
+        "status": "operational" if readiness["ready"] else "degraded",
+        "system": "Cortex-Sec Local Forge",
+        "startup_ms": getattr(app.state, "startup_ms", None),
+        **readiness
+    }
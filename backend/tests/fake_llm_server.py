@@ -0,0 +1,198 @@
+"""
+Local stand-in for the OpenAI, Anthropic and Ollama HTTP APIs.
+
+Serves /v1/chat/completions, /v1/messages and /api/chat on one port with
+per-provider latency (time to first byte), per-token delay for streamed
+replies and failure injection, so the hive's gateway can be
+exercised without network access:
+
+    python backend/tests/fake_llm_server.py --port 11500 --latency openai=3 --fail anthropic=503
+
+then point OPENAI_BASE_URL=http://127.0.0.1:11500/v1, ANTHROPIC_BASE_URL and
+OLLAMA_BASE_URL=http://127.0.0.1:11500 at it.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROUTES = {"/v1/chat/completions": "openai", "/chat/completions": "openai", "/v1/messages": "anthropic", "/api/chat": "ollama"}
+
+class FakeLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.latency = {"openai": 0.0, "anthropic": 0.0, "ollama": 0.0}
+        self.token_delay = {"openai": 0.0, "anthropic": 0.0, "ollama": 0.0}
+        self.fail = {"openai": None, "anthropic": None, "ollama": None}
+        self.calls = {"openai": 0, "anthropic": 0, "ollama": 0}
+        self.in_flight = {"openai": 0, "anthropic": 0, "ollama": 0}
+        self.peak_in_flight = {"openai": 0, "anthropic": 0, "ollama": 0}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        return {"OPENAI_BASE_URL": f"{self.url}/v1", "ANTHROPIC_BASE_URL": self.url, "OLLAMA_BASE_URL": self.url}
+
+    def reset(self):
+        with self._lock:
+            for table in (self.calls, self.in_flight, self.peak_in_flight):
+                for k in table:
+                    table[k] = 0
+            for k in self.latency:
+                self.latency[k] = 0.0
+                self.token_delay[k] = 0.0
+                self.fail[k] = None
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _reply_text(self, provider: str, request: dict) -> str:
+        return f"[{provider}:{request['model']}] {request['messages'][-1]['content']}"
+
+    def _counts(self, provider: str, request: dict):
+        """Fake token counts: one token per whitespace-separated word."""
+        prompt = " ".join(m["content"] for m in request["messages"]) + " " + request.get("system", "")
+        return len(prompt.split()), len(self._reply_text(provider, request).split())
+
+    def _reply(self, provider: str, request: dict) -> dict:
+        text = self._reply_text(provider, request)
+        tokens_in, tokens_out = self._counts(provider, request)
+        if provider == "openai":
+            return {"id": "fake", "object": "chat.completion", "model": request["model"],
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": tokens_in, "completion_tokens": tokens_out}}
+        if provider == "anthropic":
+            return {"id": "fake", "type": "message", "model": request["model"], "content": [{"type": "text", "text": text}],
+                    "usage": {"input_tokens": tokens_in, "output_tokens": tokens_out}}
+        return {"model": request["model"], "message": {"role": "assistant", "content": text}, "done": True,
+                "prompt_eval_count": tokens_in, "eval_count": tokens_out}
+
+    def _stream_lines(self, provider: str, request: dict):
+        """Wire lines for a streamed reply, one text delta per word."""
+        text = self._reply_text(provider, request)
+        tokens_in, tokens_out = self._counts(provider, request)
+        words = text.split(" ")
+        if provider == "anthropic":
+            yield "event: message_start"
+            yield "data: " + json.dumps({"type": "message_start", "message": {"usage": {"input_tokens": tokens_in, "output_tokens": 1}}})
+        for i, word in enumerate(words):
+            delta = word if i == len(words) - 1 else word + " "
+            if provider == "openai":
+                yield "data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": delta}}]})
+            elif provider == "anthropic":
+                yield "event: content_block_delta"
+                yield "data: " + json.dumps({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": delta}})
+            else:
+                yield json.dumps({"model": request["model"], "message": {"role": "assistant", "content": delta}, "done": False})
+        if provider == "openai":
+            if request.get("stream_options", {}).get("include_usage"):
+                yield "data: " + json.dumps({"choices": [], "usage": {"prompt_tokens": tokens_in, "completion_tokens": tokens_out}})
+            yield "data: [DONE]"
+        elif provider == "anthropic":
+            yield "event: message_delta"
+            yield "data: " + json.dumps({"type": "message_delta", "usage": {"output_tokens": tokens_out}})
+            yield "event: message_stop"
+            yield "data: " + json.dumps({"type": "message_stop"})
+        else:
+            yield json.dumps({"model": request["model"], "message": {"role": "assistant", "content": ""}, "done": True,
+                              "prompt_eval_count": tokens_in, "eval_count": tokens_out})
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                provider = ROUTES.get(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if provider is None:
+                    return self._send(404, {"error": "unknown route"})
+                with server._lock:
+                    server.calls[provider] += 1
+                    server.in_flight[provider] += 1
+                    server.peak_in_flight[provider] = max(server.peak_in_flight[provider], server.in_flight[provider])
+                try:
+                    time.sleep(server.latency[provider])
+                    if server.fail[provider]:
+                        return self._send(server.fail[provider], {"error": "injected failure"})
+                    request = json.loads(body)
+                    if request.get("stream"):
+                        return self._stream(provider, request)
+                    self._send(200, server._reply(provider, request))
+                finally:
+                    with server._lock:
+                        server.in_flight[provider] -= 1
+
+            def _stream(self, provider: str, request: dict):
+                # No Content-Length: the body ends when the connection closes
+                self.close_connection = True
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson" if provider == "ollama" else "text/event-stream")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for line in server._stream_lines(provider, request):
+                        self.wfile.write((line + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                        if line.startswith("data: {") or provider == "ollama":
+                            time.sleep(server.token_delay[provider])
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (deadline / hedge cancellation)
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (deadline / hedge cancellation)
+
+        return Handler
+
+def _pairs(values, cast):
+    return {k: cast(v) for k, v in (item.split("=", 1) for item in values or [])}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Anthropic/Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", nargs="*", help="provider=seconds")
+    parser.add_argument("--token-delay", nargs="*", help="provider=seconds between streamed tokens")
+    parser.add_argument("--fail", nargs="*", help="provider=http_status")
+    args = parser.parse_args()
+
+    fake = FakeLLMServer(args.host, args.port)
+    fake.latency.update(_pairs(args.latency, float))
+    fake.token_delay.update(_pairs(args.token_delay, float))
+    fake.fail.update(_pairs(args.fail, int))
+    print(f"Fake LLM server on {fake.url}: {json.dumps(fake.env())}")
+    try:
+        fake.start()._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,398 @@
+"""
+In-process load harness for the Cortex-Sec API.
+
+Drives `main.app` through httpx's ASGI transport (no sockets, no uvicorn)
+with local fakes for Chroma, the Docker lab and the LLM providers, and
+replays a weighted traffic profile at a fixed concurrency. Per route it
+reports throughput, latency percentiles, the status mix (429/503 are
+admission-control sheds, not errors) and the event-loop blocking seen
+while that route's requests were in flight. Reports are saved as JSON
+baselines and diffed against the previous one:
+
+    python backend/tests/load_harness.py --profile mixed            # run, diff against baseline
+    python backend/tests/load_harness.py --profile mixed --save     # update the baseline
+    python backend/tests/load_harness.py --profile mixed --check    # exit 1 on a regression
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("CONSENT_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "consent_ledger.db"))
+os.environ.setdefault("CONSENT_AUDIT_PATH", os.path.join(tempfile.mkdtemp(), "access_audit.db"))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("ARCHIVE_INDEX_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "hive_llm_cache.db"))
+os.environ.setdefault("HIVE_CHECKPOINT_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_TRACE_PATH", os.path.join(tempfile.mkdtemp(), "hive_trace.json"))
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+COLLECTIONS = ["doctrine", "trench", "future"]
+QUERIES = ["sql injection", "rop chain", "neurorights", "kill-switch", "pqc migration", "xxe", "ssrf mitigation", "sigma rules"]
+TOPICS = ["Log Obfuscation", "Agent Containment", "PQC Migration", "EEG Side Channels", "Prompt Injection"]
+SCENARIOS = ["scream_test", "self_replication", "exfiltration"]
+
+# route name -> (method, path, body factory)
+ROUTES: Dict[str, Tuple[str, str, Optional[Callable[[random.Random], Dict[str, Any]]]]] = {
+    "archive_search": ("POST", "/archive/search", lambda rng: {"query": rng.choice(QUERIES), "collection": rng.choice(COLLECTIONS)}),
+    "gaps_analyze": ("GET", "/gaps/analyze", None),
+    "lab_start": ("POST", "/lab/start", lambda rng: {"scenario": rng.choice(SCENARIOS)}),
+    "lab_reset": ("POST", "/lab/reset", None),
+    "neuro_stream": ("GET", "/neuro/stream", None),
+    "neuro_stream_legacy": ("POST", "/neuro/stream", lambda rng: {"client_id": f"agent-{rng.randint(1, 8)}"}),
+    "neuro_ledger_root": ("GET", "/neuro/ledger/root", None),
+    "scientist_research": ("POST", "/scientist/research", lambda rng: {"topic": rng.choice(TOPICS)}),
+}
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # Dashboard traffic: mostly neuro reads, some archive searches and research
+    "mixed": {"requests": 600, "concurrency": 16, "weights": {
+        "neuro_stream": 30, "neuro_stream_legacy": 10, "neuro_ledger_root": 10, "archive_search": 25,
+        "gaps_analyze": 5, "scientist_research": 12, "lab_start": 4, "lab_reset": 4}},
+    # Analysts hammering the archive and the scientist at once
+    "research_burst": {"requests": 400, "concurrency": 64, "weights": {
+        "archive_search": 40, "scientist_research": 40, "gaps_analyze": 5, "neuro_stream": 15}},
+    # Only the cheap neuro reads: the ceiling the other profiles are compared to
+    "neuro_only": {"requests": 800, "concurrency": 32, "weights": {
+        "neuro_stream": 60, "neuro_stream_legacy": 20, "neuro_ledger_root": 20}},
+}
+
+# ----------------------------------------------------------------------
+# Fakes
+# ----------------------------------------------------------------------
+class FakeCollection:
+    """Deterministic stand-in for a Chroma collection (query/get with `where`)."""
+    def __init__(self, name: str, documents: List[Tuple[str, Dict[str, Any]]], latency: float = 0.002):
+        self.name = name
+        self.documents = documents
+        self.latency = latency
+        self.queries = 0
+
+    @staticmethod
+    def _matches(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        for key, cond in (where or {}).items():
+            value = meta.get(key)
+            if isinstance(cond, dict):
+                if "$gte" in cond and not (value is not None and value >= cond["$gte"]):
+                    return False
+            elif value != cond:
+                return False
+        return True
+
+    def query(self, query_texts, n_results=5, where=None, include=None):
+        self.queries += 1
+        time.sleep(self.latency)
+        hits = [(text, meta) for text, meta in self.documents if self._matches(meta, where)]
+        scored = sorted(hits, key=lambda d: hashlib.md5((query_texts[0] + d[0]).encode()).digest())[:n_results]
+        distance = lambda text: int.from_bytes(hashlib.md5((query_texts[0] + text).encode()).digest()[:2], "big") / 65535
+        return {
+            "ids": [[meta["source"] for _, meta in scored]],
+            "documents": [[text for text, _ in scored]],
+            "metadatas": [[meta for _, meta in scored]],
+            "distances": [[distance(text) for text, _ in scored]],
+        }
+
+    def get(self, include=None, limit=None, offset=0, where=None):
+        time.sleep(self.latency)
+        docs = [(t, m) for t, m in self.documents if self._matches(m, where)][offset:offset + limit if limit else None]
+        return {"ids": [m["source"] for _, m in docs], "documents": [t for t, _ in docs], "metadatas": [m for _, m in docs]}
+
+    def count(self):
+        return len(self.documents)
+
+def fake_corpus(collection: str, size: int = 300, seed: int = 11) -> List[Tuple[str, Dict[str, Any]]]:
+    rng = random.Random(f"{seed}:{collection}")
+    words = ["exploit", "payload", "mitigation", "patch", "detection", "sigma", "union select", "rop chain", "xxe",
+             "neurodata", "mental privacy", "kill-switch", "alignment", "ssrf", "buffer overflow", "lattice", "greenops"]
+    docs = []
+    for i in range(size):
+        text = " ".join(rng.choice(words) for _ in range(40))
+        docs.append((text, {
+            "source": f"{collection}_{i:04d}.md",
+            "collection": collection,
+            "year": rng.randint(2015, 2026),
+            "authority": rng.choice(["High (Academic/Legal)", "High (Technical Expert)", "Medium (Resource)"]),
+            "language": rng.choice(["text", "python", "bash"]),
+            "type": "canonical_archive",
+        }))
+    return docs
+
+class FakeContainer:
+    """The rogue-agent container: `logs` replays whatever the last exec echoed."""
+    id = "fake-rogue-agent"
+    status = "running"
+
+    def __init__(self):
+        self.lines: List[bytes] = []
+        self.execs = 0
+
+    def exec_run(self, cmd, detach=False):
+        self.execs += 1
+        self.lines = [line.encode() for line in re.findall(r'echo \\?"(.*?)\\?"', cmd)]
+
+    def logs(self, stream=False, follow=False):
+        return iter(list(self.lines))
+
+    def start(self): pass
+    def pause(self): pass
+    def unpause(self): pass
+    def restart(self): pass
+    def kill(self): pass
+
+class FakeDockerClient:
+    def __init__(self):
+        self.container = FakeContainer()
+        self.containers = self
+
+    def get(self, name):
+        return self.container
+
+@contextmanager
+def fakes(chroma_latency: float = 0.002):
+    """Installs the Chroma and Docker fakes on the engine singletons' lazy seams."""
+    from app.engines.rag_engine.chroma_client import chroma_manager
+    from app.engines.agent_lab.watcher import watcher
+
+    saved = (chroma_manager._client, chroma_manager._collections, watcher._client)
+    installed = {
+        "chroma": {name: FakeCollection(name, fake_corpus(name), chroma_latency) for name in COLLECTIONS},
+        "docker": FakeDockerClient(),
+    }
+    chroma_manager._client, chroma_manager._collections = object(), installed["chroma"]
+    watcher._client = installed["docker"]
+    try:
+        yield installed
+    finally:
+        chroma_manager._client, chroma_manager._collections, watcher._client = saved
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+async def replay(app, profile: Dict[str, Any], routes: Dict[str, Tuple] = ROUTES, seed: int = 7, lag_interval: float = 0.002) -> Dict[str, Any]:
+    """
+    Sends `profile["requests"]` requests, drawn by weight, from
+    `profile["concurrency"]` workers. A ticker measures event-loop lag
+    every `lag_interval`; lag above 1 ms is blocking, attributed to the
+    requests in flight during that tick in proportion to their overlap
+    with it (exact at concurrency 1).
+    Through the ASGI transport a handler that never awaits real I/O holds
+    the loop for its whole run, as it would behind a socket.
+    """
+    rng = random.Random(seed)
+    names = list(profile["weights"])
+    schedule = rng.choices(names, weights=[profile["weights"][n] for n in names], k=profile["requests"])
+    bodies = [(name, routes[name][2](rng) if routes[name][2] else None) for name in schedule]
+
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    statuses: Dict[str, Counter] = {name: Counter() for name in names}
+    blocked: Dict[str, float] = {name: 0.0 for name in names}
+    # Request spans: (route, start) while running, (route, start, end) once finished this tick
+    active: Dict[int, Tuple[str, float]] = {}
+    ids = itertools.count()
+    finished: List[Tuple[str, float, float]] = []
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(lag_interval)
+            t1 = time.perf_counter()
+            lag = t1 - t0 - lag_interval
+            lags.append(lag)
+            overlap: Counter = Counter()
+            for name, start, end in finished + [(name, start, t1) for name, start in active.values()]:
+                overlap[name] += max(0.0, min(end, t1) - max(start, t0))
+            finished.clear()
+            total = sum(overlap.values())
+            if lag > 0.001 and total:
+                for name, share in overlap.items():
+                    blocked[name] += lag * share / total
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cslf", timeout=60) as client:
+        cursor = iter(bodies)
+
+        async def worker():
+            for name, body in cursor:
+                # Let the loop run between requests, as socket reads would
+                await asyncio.sleep(0)
+                method, path, _ = routes[name]
+                t0 = time.perf_counter()
+                request_id = next(ids)
+                active[request_id] = (name, t0)
+                try:
+                    response = await client.request(method, path, json=body)
+                    statuses[name][str(response.status_code)] += 1
+                except Exception as e:
+                    statuses[name][type(e).__name__] += 1
+                finally:
+                    t1 = time.perf_counter()
+                    latencies[name].append((t1 - t0) * 1000)
+                    del active[request_id]
+                    finished.append((name, t0, t1))
+
+        tick = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(profile["concurrency"])))
+        duration = time.perf_counter() - started
+        done.set()
+        await tick
+
+    report_routes = {}
+    for name in names:
+        values = latencies[name]
+        report_routes[name] = {
+            "requests": len(values),
+            "status": dict(sorted(statuses[name].items())),
+            "throughput_rps": round(len(values) / duration, 1),
+            "p50_ms": _percentile(values, 0.5),
+            "p95_ms": _percentile(values, 0.95),
+            "p99_ms": _percentile(values, 0.99),
+            "max_ms": round(max(values), 3) if values else None,
+            "loop_blocked_ms": round(blocked[name] * 1000, 3),
+        }
+    return {
+        "requests": profile["requests"],
+        "concurrency": profile["concurrency"],
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(profile["requests"] / duration, 1),
+        "loop": {
+            "lag_p99_ms": _percentile([l * 1000 for l in lags], 0.99),
+            "lag_max_ms": round(max(lags) * 1000, 3) if lags else None,
+            "blocked_ms": round(sum(l for l in lags if l > 0.001) * 1000, 3),
+        },
+        "routes": report_routes,
+    }
+
+def run_profile(name: str, requests: Optional[int] = None, concurrency: Optional[int] = None, chroma_latency: float = 0.002) -> Dict[str, Any]:
+    """Replays a named profile against the full app (fakes installed) and returns its report."""
+    from fake_llm_server import FakeLLMServer
+
+    profile = dict(PROFILES[name])
+    profile["requests"] = requests or profile["requests"]
+    profile["concurrency"] = concurrency or profile["concurrency"]
+    with FakeLLMServer() as llm:
+        # No route under test calls an LLM; if one starts to, it stays local
+        saved = {k: os.environ.get(k) for k in list(llm.env()) + ["OPENAI_API_KEY", "ANTHROPIC_API_KEY"]}
+        os.environ.update(llm.env(), OPENAI_API_KEY="sk-fake", ANTHROPIC_API_KEY="sk-ant-fake")
+        try:
+            import main
+            with fakes(chroma_latency) as installed:
+                report = asyncio.run(replay(main.app, profile))
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+    report["profile"] = name
+    report["fakes"] = {
+        "chroma_queries": sum(c.queries for c in installed["chroma"].values()),
+        "docker_execs": installed["docker"].container.execs,
+        "llm_calls": sum(llm.calls.values()),
+    }
+    return report
+
+# ----------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------
+def baseline_path(profile: str) -> str:
+    return os.path.join(BASELINE_DIR, f"load_{profile}.json")
+
+def load_baseline(profile: str) -> Optional[Dict[str, Any]]:
+    path = baseline_path(profile)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(report: Dict[str, Any]):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(report["profile"]), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+# metric -> (direction where worse, absolute noise floor)
+DIFF_METRICS = {"throughput_rps": (-1, 5.0), "p95_ms": (1, 5.0), "p99_ms": (1, 10.0), "loop_blocked_ms": (1, 10.0)}
+
+def diff(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    One row per (route, metric) present in both. A row is a regression
+    when the metric got worse by more than `tolerance` (relative) and by
+    more than the metric's noise floor (absolute).
+    """
+    rows = []
+    for route, current in report["routes"].items():
+        before = baseline["routes"].get(route)
+        if before is None:
+            continue
+        for metric, (worse, floor) in DIFF_METRICS.items():
+            old, new = before.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+            rows.append({
+                "route": route, "metric": metric, "baseline": old, "current": new,
+                "change_pct": round(change * 100, 1) if change != float("inf") else None,
+                "regression": change * worse > tolerance and abs(new - old) > floor,
+            })
+    return rows
+
+def format_diff(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'route':<22} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for row in rows:
+        change = "n/a" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        flag = "  << REGRESSION" if row["regression"] else ""
+        lines.append(f"{row['route']:<22} {row['metric']:<16} {row['baseline']:>10} {row['current']:>10} {change:>8}{flag}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-process load test for the Cortex-Sec API")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--requests", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--chroma-latency", type=float, default=0.002, help="seconds per fake Chroma call")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="relative change that counts as a regression")
+    parser.add_argument("--save", action="store_true", help="write the report as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any route regressed against the baseline")
+    args = parser.parse_args()
+
+    result = run_profile(args.profile, args.requests, args.concurrency, args.chroma_latency)
+    print(json.dumps({k: v for k, v in result.items() if k != "routes"}, indent=2))
+    for route, stats in result["routes"].items():
+        print(f"  {route:<22} {json.dumps(stats)}")
+
+    previous = load_baseline(args.profile)
+    regressions = []
+    if previous:
+        rows = diff(result, previous, args.tolerance)
+        regressions = [r for r in rows if r["regression"]]
+        print(f"\nAgainst {baseline_path(args.profile)}:\n{format_diff(rows)}")
+    if args.save:
+        save_baseline(result)
+        print(f"\nBaseline saved to {baseline_path(args.profile)}")
+    if args.check and regressions:
+        sys.exit(1)
@@ -0,0 +1,234 @@
+import sys
+import os
+import re
+import json
+import time
+import random
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("ARCHIVE_INDEX_DIR", tempfile.mkdtemp())
+
+from app.engines.rag_engine.chunker import Chunker, CODE_SEPARATORS, regex_token_offsets
+from app.engines.rag_engine.ingestor import Ingestor
+from app.engines.rag_engine.metadata_index import metadata_index
+from app.engines.rag_engine.chroma_client import chroma_manager
+
+# RecursiveCharacterTextSplitter vs Chunker on trench_file(1024), recorded with
+# `python backend/tests/test_chunker.py --save-baseline` (needs requirements-dev.txt)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "chunker_vs_recursive_splitter.json")
+
+def trench_file(kb: int, seed: int = 3) -> str:
+    """Code-heavy write-up: prose, fenced exploits, bare classes and long payload lines."""
+    rng = random.Random(seed)
+    words = ["payload", "offset", "gadget", "canary", "leak", "libc", "shellcode", "heap", "chunk", "overflow"]
+    parts, size = [], 0
+    while size < kb * 1024:
+        kind = rng.random()
+        if kind < 0.35:
+            part = "\n\n" + " ".join(rng.choice(words) for _ in range(rng.randint(40, 160))) + "."
+        elif kind < 0.6:
+            body = "".join(f"    def step_{i}(self):\n        return p64(0x{rng.getrandbits(32):08x})\n\n" for i in range(rng.randint(2, 12)))
+            part = f"\nclass Exploit{rng.randint(0, 999)}:\n{body}"
+        elif kind < 0.8:
+            part = "\n\n```python\nimport struct\n" + "".join(f"rop += p64(0x{rng.getrandbits(32):08x})\n" for _ in range(rng.randint(5, 40))) + "```"
+        elif kind < 0.9:
+            part = "\n\n```sh\n$ " + " ".join(["./exploit"] + [rng.choice(words) for _ in range(10)]) + "\n```"
+        else:
+            length = rng.randint(500, 3000)  # shellcode blob, no separator at all (and unique, so chunks can be located)
+            part = "\n\n" + random.Random(size).randbytes(length).hex()[:length]
+        parts.append(part)
+        size += len(part)
+    return "# Write-up\n" + "".join(parts)
+
+def boundary_report(text: str, chunks, separators, chunk_size: int = 2000) -> dict:
+    """
+    Which separator each chunk ends on (lower level = better), located in
+    `text` by content. The cut may sit anywhere in the whitespace stripped
+    from the chunk's end; with no separator there it is a mid-token cut,
+    kept out of `mean_level`. `oversized` counts chunks over `chunk_size`.
+    """
+    levels, cursor = [], 0
+    for chunk in chunks[:-1]:
+        start = text.find(chunk, cursor)
+        end = start + len(chunk)
+        cursor = start + 1
+        gap_end = re.compile(r"\s*").match(text, end).end()
+        level = min((i for q in range(end, gap_end + 1) for i, sep in enumerate(separators) if text.startswith(sep, q)), default=len(separators))
+        levels.append(level)
+    cuts = [level for level in levels if level < len(separators)]
+    return {
+        "chunks": len(chunks),
+        "mean_level": round(sum(cuts) / len(cuts), 3) if cuts else 0.0,
+        "mid_token_cuts": len(levels) - len(cuts),
+        "oversized": sum(len(chunk) > chunk_size for chunk in chunks),
+    }
+
+def test_separator_semantics():
+    print("--- CORTEX-SEC CHUNKER AUDIT ---")
+    text = trench_file(64)
+    chunker = Chunker(2000, 300, CODE_SEPARATORS)
+    spans = chunker.spans(text)
+    chunks = chunker.split_text(text)
+
+    # 1. No chunk exceeds the size, even across separator-less payloads, and nothing is dropped
+    print(f"[TEST 1] {len(chunks)} chunks, largest {max(map(len, chunks))} chars")
+    assert max(map(len, chunks)) <= 2000
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(b[0] <= a[1] for a, b in zip(spans, spans[1:]))
+
+    # 2. Chunks end on the best separator that fits, and a class starts a chunk whenever it can
+    levels = chunker.boundaries(text)
+    previous_end = 0
+    for (start, end), (next_start, _) in zip(spans, spans[1:]):
+        # Candidates lie past the previous chunk's end: an overlapped chunk must move forward
+        floor = max(start, previous_end)
+        fits = [lvl for lvl, positions in enumerate(levels) if any(floor < p <= start + 2000 for p in positions)]
+        at = next((lvl for lvl, positions in enumerate(levels) if end in positions), None)
+        assert at is None or at == min(fits), (start, end)
+        previous_end = end
+        # 3. Overlap never exceeds the configured size nor half the previous chunk
+        assert end - next_start <= min(300, (end - start) // 2)
+    class_starts = sum(chunk.startswith("class ") for chunk in chunks)
+    print(f"[TEST 2] {class_starts} chunks open on a class definition")
+    assert class_starts > 0
+
+def test_token_sizing_and_languages():
+    text = trench_file(32, seed=5)
+    # 4. Token sizing bounds every chunk by the token count, not characters
+    chunker = Chunker(256, 32, CODE_SEPARATORS, unit="tokens")
+    counts = [len(regex_token_offsets(chunk)) for chunk in chunker.split_text(text)]
+    print(f"[TEST 4] Token-sized chunks: max {max(counts)} tokens over {len(counts)} chunks")
+    assert max(counts) <= 256
+
+    # 5. One detection per section: fences give their own language, prose mentioning code stays text
+    calls = []
+    ingestor = Ingestor()
+    def detect(section):
+        calls.append(section)
+        return ingestor.detect_language(section)
+    doc = ("Import restrictions and the def of terms apply.\n\n" * 30
+           + "```py\nimport os\nos.system('id')\n```\n\n" + "More policy text.\n\n" * 30
+           + "```\n#include <stdio.h>\nint main() { return 0; }\n```\n" + "Closing remarks.\n\n" * 30)
+    chunks = Chunker(400, 50, detect=detect).chunk(doc)
+    languages = [c["language"] for c in chunks]
+    print(f"[TEST 5] {len(chunks)} chunks, {len(calls)} detections: {sorted(set(languages))}")
+    assert len(calls) == 4  # three prose runs and the untagged fence
+    assert "python" in languages and "c/cpp" in languages
+    assert all(c["language"] == "text" for c in chunks if "```" not in c["text"] and "import os" not in c["text"] and "#include" not in c["text"])
+
+def test_ingestor_uses_chunker():
+    class RecordingCollection:
+        def __init__(self):
+            self.added = []
+        def add(self, documents, metadatas, ids, embeddings=None):
+            self.added.append((documents, metadatas))
+        def count(self):
+            return sum(len(docs) for docs, _ in self.added)
+        def get(self, include=None, limit=None, offset=0):
+            return {"metadatas": [m for _, metas in self.added for m in metas][offset:offset + limit]}
+
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "S4vitar_rop_2022.md"), "w") as f:
+        f.write(trench_file(16, seed=9))
+    collection, saved = RecordingCollection(), chroma_manager._collections
+    index_dir, tables = metadata_index.directory, metadata_index._tables
+    chroma_manager._collections = {"trench": collection}
+    metadata_index.directory, metadata_index._tables = tempfile.mkdtemp(), {}
+    try:
+        Ingestor().ingest_directory("trench", directory)
+        # 6. Chunks land in Chroma with per-section languages, and the sidecar index follows
+        documents, metadatas = collection.added[0]
+        languages = {m["language"] for m in metadatas}
+        print(f"[TEST 6] Ingested {len(documents)} chunks, languages {sorted(languages)}")
+        assert max(map(len, documents)) <= 2000 and {"python", "bash"} <= languages
+        assert metadata_index.count("trench", {"source": "S4vitar_rop_2022.md"}) == len(documents)
+    finally:
+        chroma_manager._collections = saved
+        metadata_index.directory, metadata_index._tables = index_dir, tables
+
+def test_benchmark_against_recursive_splitter():
+    small, large = trench_file(256), trench_file(1024)
+    chunker = Chunker(2000, 300, CODE_SEPARATORS)
+
+    def rate(split, text, runs=3):
+        best = min(_timed(split, text) for _ in range(runs))
+        return len(text) / best / 1e6
+
+    # 7. Throughput in MB/s, and linear: 4x the text costs about 4x the time. Nothing
+    # is oversized, and a chunk only ends mid-token inside a run too long to hold whole
+    ours_small, ours_large = rate(chunker.split_text, small), rate(chunker.split_text, large)
+    ours = boundary_report(large, chunker.split_text(large), CODE_SEPARATORS)
+    print(f"[TEST 7] Chunker: {ours_small:.1f} MB/s on 256 KB, {ours_large:.1f} MB/s on 1 MB, boundaries {ours}")
+    assert ours_large > ours_small / 2
+    assert ours["oversized"] == 0
+    assert ours["mid_token_cuts"] <= len(re.findall(r"\S{2000,}", large))
+
+    splitter = recursive_splitter()
+    if splitter is None:
+        # 8. Without langchain, against the recorded comparison (boundaries are deterministic, rates are not)
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        theirs = baseline["recursive_splitter"]
+        print(f"[TEST 8] langchain not installed, recorded RecursiveCharacterTextSplitter {baseline['langchain']}: "
+              f"{theirs['mb_s']} MB/s vs {baseline['chunker']['mb_s']} MB/s, boundaries {theirs['boundaries']}")
+        assert baseline["input_chars"] == len(large)
+        assert baseline["chunker"]["boundaries"] == ours
+        assert baseline["chunker"]["mb_s"] > theirs["mb_s"] * 0.75
+        theirs = theirs["boundaries"]
+    else:
+        # 8. Against the splitter it replaces: on par, and boundaries at least as good
+        theirs_rate = rate(splitter.split_text, large)
+        theirs = boundary_report(large, splitter.split_text(large), CODE_SEPARATORS)
+        print(f"[TEST 8] RecursiveCharacterTextSplitter: {theirs_rate:.1f} MB/s, boundaries {theirs}")
+        assert ours_large > theirs_rate * 0.75
+    assert ours["mean_level"] <= theirs["mean_level"] + 0.05
+    assert ours["mid_token_cuts"] <= theirs["mid_token_cuts"] + theirs["oversized"]
+
+def recursive_splitter():
+    """langchain's RecursiveCharacterTextSplitter with the Chunker's settings, or None if not installed."""
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:
+        try:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+        except ImportError:
+            return None
+    return RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=300, separators=CODE_SEPARATORS)
+
+def save_baseline():
+    """Measures both splitters on trench_file(1024) and writes BASELINE_PATH."""
+    from importlib.metadata import version
+    import platform
+
+    splitter = recursive_splitter()
+    if splitter is None:
+        raise SystemExit("langchain-text-splitters is not installed (pip install -r backend/requirements-dev.txt)")
+    text = trench_file(1024)
+    chunker = Chunker(2000, 300, CODE_SEPARATORS)
+    report = {"input_chars": len(text), "langchain": f"langchain-text-splitters {version('langchain-text-splitters')}", "python": platform.python_version()}
+    for name, split in (("chunker", chunker.split_text), ("recursive_splitter", splitter.split_text)):
+        best = min(_timed(split, text) for _ in range(5))
+        report[name] = {"mb_s": round(len(text) / best / 1e6, 2), "boundaries": boundary_report(text, split(text), CODE_SEPARATORS)}
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(json.dumps(report, indent=2, sort_keys=True))
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    if "--save-baseline" in sys.argv:
+        save_baseline()
+        sys.exit(0)
+    test_separator_semantics()
+    test_token_sizing_and_languages()
+    test_ingestor_uses_chunker()
+    test_benchmark_against_recursive_splitter()
+    print("--- AUDIT COMPLETE ---")
@@ -0,0 +1,87 @@
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CONSENT_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "consent_ledger.db"))
+os.environ.setdefault("CONSENT_AUDIT_PATH", os.path.join(tempfile.mkdtemp(), "access_audit.db"))
+
+from app.engines.neuro_sim.ledger import ConsentLedger
+from app.engines.neuro_sim.audit import AccessAuditLog
+
+def test_durable_ledger():
+    print("--- CORTEX-SEC CONSENT LEDGER AUDIT ---")
+    path = os.path.join(tempfile.mkdtemp(), "ledger.db")
+
+    # 1. Two workers share one chain and one permission state
+    worker_a = ConsentLedger(path)
+    worker_b = ConsentLedger(path)
+    assert worker_b.height == 1
+    worker_a.update_consent("GRANT")
+    print(f"[TEST 1] Worker B sees: {worker_b.current_permission} @ height {worker_b.height}")
+    assert worker_b.current_permission == "GRANTED" and worker_b.height == 2
+    # Ledgers without their own audit log share one writer thread and database
+    assert worker_a.audit is worker_b.audit
+
+    # 2. Cursor pagination
+    for i in range(10):
+        worker_b.update_consent("REVOKE" if i % 2 else "GRANT")
+    page = worker_a.get_ledger(limit=5)
+    assert [b["index"] for b in page["blocks"]] == [0, 1, 2, 3, 4]
+    page = worker_a.get_ledger(cursor=page["next_cursor"], limit=5)
+    assert [b["index"] for b in page["blocks"]] == [5, 6, 7, 8, 9]
+    latest = worker_a.get_ledger(limit=3, descending=True)
+    assert [b["index"] for b in latest["blocks"]] == [11, 10, 9] and latest["height"] == 12
+
+    # 3. Incremental verification resumes from the checkpoint
+    first = worker_a.verify_chain()
+    worker_a.update_consent("GRANT")
+    second = worker_b.verify_chain()
+    print(f"[TEST 3] Verified {first['checked']} then {second['checked']} blocks")
+    assert first == {"valid": True, "broken_at": None, "verified_height": 12, "checked": 12}
+    assert second["valid"] and second["checked"] == 1 and second["verified_height"] == 13
+
+    # 4. Tampering after the checkpoint is detected
+    worker_a.update_consent("REVOKE")
+    worker_a._conn.execute("UPDATE blocks SET permission_state = 'GRANTED' WHERE idx = 13")
+    tampered = ConsentLedger(path).verify_chain()
+    print(f"[TEST 4] Tampered chain: {tampered}")
+    assert not tampered["valid"] and tampered["broken_at"] == 13
+
+    # 5. State survives a restart
+    assert ConsentLedger(path).height == 14
+
+def test_per_client_consent_and_audit():
+    path = os.path.join(tempfile.mkdtemp(), "ledger.db")
+    audit = AccessAuditLog(os.path.join(tempfile.mkdtemp(), "audit.db"), batch_size=4, flush_interval=0.05)
+    ledger = ConsentLedger(path, audit_log=audit)
+
+    # 1. Client-scoped grant does not leak to other requesters
+    ledger.update_consent("GRANT", client_id="clinic-a")
+    assert ledger.check_access("clinic-a")["allowed"]
+    assert not ledger.check_access("marketing-b")["allowed"]
+
+    # 2. A newer global revoke overrides the older client grant
+    ledger.update_consent("REVOKE")
+    assert not ledger.check_access("clinic-a")["allowed"]
+    ledger.update_consent("GRANT", client_id="clinic-a")
+    print(f"[TEST 6] clinic-a: {ledger.permission_for('clinic-a')}, global: {ledger.current_permission}")
+    assert ledger.check_access("clinic-a")["allowed"]
+
+    # 3. Index is shared with other workers and the chain still verifies
+    assert ConsentLedger(path, audit_log=audit).permission_for("clinic-a") == "GRANTED"
+    assert ledger.verify_chain()["valid"]
+
+    # 4. Every decision reaches the durable audit log
+    ledger.log_access("prover-c", "ZKP_VERIFIED_INFERENCE", "GRANTED")
+    audit.flush()
+    entries = ledger.get_access_log()["entries"]
+    print(f"[TEST 7] Audit entries: {[(e['requester'], e['decision']) for e in entries]}")
+    assert len(entries) == 5 and entries[0]["action"] == "ZKP_VERIFIED_INFERENCE"
+    assert [e["decision"] for e in ledger.get_access_log(requester="clinic-a")["entries"]] == ["ALLOWED", "DENIED", "ALLOWED"]
+
+if __name__ == "__main__":
+    test_durable_ledger()
+    test_per_client_consent_and_audit()
+    print("--- AUDIT COMPLETE ---")
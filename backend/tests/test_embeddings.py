@@ -0,0 +1,168 @@
+import sys
+import os
+import math
+import hashlib
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("ARCHIVE_INDEX_DIR", tempfile.mkdtemp())
+
+from app.engines.rag_engine import embeddings as embeddings_module
+from app.engines.rag_engine.embeddings import Embedder, register_backend, benchmark
+from app.engines.rag_engine.retriever import StrictRetriever
+from app.engines.rag_engine.chroma_client import chroma_manager
+from app.engines.rag_engine.metadata_index import metadata_index
+from app.engines.rag_engine import ingestor as ingestor_module
+from app.engines.readiness import EngineRegistry
+
+class HashingBackend:
+    """Offline stand-in for a model: normalised bag of hashed words."""
+    instances = []
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.loads = 0
+        self.batches = []
+        HashingBackend.instances.append(self)
+
+    def load(self, threads):
+        self.loads += 1
+        self.threads = threads
+
+    def encode(self, texts, batch_size):
+        self.batches.append(len(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.0] * 64
+            for word in text.lower().split():
+                vector[hashlib.md5(word.encode()).digest()[0] % 64] += 1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([v / norm for v in vector])
+        return vectors
+
+register_backend("hashing", HashingBackend)
+
+class RecordingCollection:
+    def __init__(self):
+        self.calls = []
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"documents": [["doc"]], "metadatas": [[{"source": "a.md"}]], "distances": [[0.1]]}
+
+def test_dynamic_ingest_batches():
+    print("--- CORTEX-SEC EMBEDDING BACKEND AUDIT ---")
+    embedder = Embedder(backend="hashing", model_name="hash-64")
+    embedder.ingest_batch, embedder.batch_tokens = 8, 400
+    texts = ["word " * n for n in (5, 300, 12, 40, 2, 80, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7)]
+
+    # 1. Batches are longest first, capped in size and in padded tokens, and cover every text once
+    batches = embedder.batches(texts)
+    print(f"[TEST 1] Batch sizes: {[len(b) for b in batches]}")
+    assert sorted(i for b in batches for i in b) == list(range(len(texts)))
+    for batch in batches:
+        longest = len(texts[batch[0]]) // 4 + 1
+        assert len(batch) <= 8 and (len(batch) == 1 or longest * len(batch) <= 400)
+        assert all(len(texts[i]) <= len(texts[batch[0]]) for i in batch)
+
+    # 2. Vectors come back in input order, with the model loaded and warmed exactly once
+    vectors = embedder.embed_documents(texts)
+    backend = HashingBackend.instances[-1]
+    assert vectors == backend.encode(texts, len(texts))
+    assert backend.loads == 1 and backend.batches[0] == 1  # warm-up
+    stats = embedder.throughput()
+    print(f"[TEST 2] Throughput: {stats}")
+    assert stats["ingest"]["embeddings"] == len(texts) and stats["ingest"]["per_sec"] > 0
+
+def test_retriever_uses_shared_embedder():
+    collection = RecordingCollection()
+    collections, shared = chroma_manager._collections, embeddings_module.embedder
+    chroma_manager._collections = {"doctrine": collection}
+    try:
+        # 3. Default backend: Chroma embeds the query text itself
+        StrictRetriever().retrieve("rop chain", "doctrine")
+        assert collection.calls[-1]["query_texts"] == ["rop chain"] and "query_embeddings" not in collection.calls[-1]
+
+        # 4. A local backend: the retriever sends the same vectors ingestion would produce
+        local = Embedder(backend="hashing", model_name="hash-64")
+        import app.engines.rag_engine.retriever as retriever_module
+        retriever_module.embedder = local
+        try:
+            StrictRetriever().retrieve("rop chain", "doctrine")
+        finally:
+            retriever_module.embedder = shared
+        assert collection.calls[-1]["query_embeddings"] == local.embed_documents(["rop chain"])
+        assert "query_texts" not in collection.calls[-1]
+        print(f"[TEST 4] Query sent as a {len(collection.calls[-1]['query_embeddings'][0])}-d vector")
+    finally:
+        chroma_manager._collections = collections
+
+def test_ingest_pools_small_files():
+    class AddingCollection:
+        def __init__(self):
+            self.adds = []
+        def add(self, documents, metadatas, ids, embeddings=None):
+            self.adds.append((documents, ids, embeddings))
+        def count(self):
+            return sum(len(docs) for docs, _, _ in self.adds)
+        def get(self, include=None, limit=None, offset=0):
+            return {"metadatas": []}
+
+    directory = tempfile.mkdtemp()
+    for i in range(20):
+        with open(os.path.join(directory, f"note_{i:02d}.md"), "w") as f:
+            f.write(f"Heap note {i}: tcache poisoning and a short gadget list.")
+    local = Embedder(backend="hashing", model_name="hash-64")
+    local.ingest_batch = 8
+    collection, collections, shared = AddingCollection(), chroma_manager._collections, ingestor_module.embedder
+    index_dir, tables = metadata_index.directory, metadata_index._tables
+    chroma_manager._collections = {"trench": collection}
+    metadata_index.directory, metadata_index._tables = tempfile.mkdtemp(), {}
+    ingestor_module.embedder = local
+    try:
+        ingestor_module.Ingestor().ingest_directory("trench", directory)
+    finally:
+        ingestor_module.embedder = shared
+        chroma_manager._collections = collections
+        metadata_index.directory, metadata_index._tables = index_dir, tables
+
+    # 6. Twenty one-chunk files go out as full batches, not twenty model calls and Chroma writes
+    sizes = [len(docs) for docs, _, _ in collection.adds]
+    print(f"[TEST 6] 20 files -> {len(sizes)} Chroma adds of {sizes}, model batches {HashingBackend.instances[-1].batches[1:]}")
+    assert sizes == [8, 8, 4]
+    assert all(len(vectors) == len(docs) for docs, _, vectors in collection.adds)
+    assert sorted(i for _, ids, _ in collection.adds for i in ids) == sorted(f"note_{i:02d}.md_0" for i in range(20))
+
+def test_benchmark_reports_speed_and_recall():
+    documents = ["union select sql injection payload", "rop chain gadget overflow", "mental privacy neurodata consent",
+                 "kill switch container containment", "lattice pqc migration plan"]
+    queries = ["sql injection", "rop gadget", "neurodata privacy", "container kill", "pqc lattice"]
+
+    # 5. Embeddings/sec for both modes plus recall@k against known answers
+    report = benchmark(Embedder(backend="hashing", model_name="hash-64"), documents, queries, relevant=[0, 1, 2, 3, 4], k=1)
+    print(f"[TEST 5] Benchmark: {report}")
+    assert report["ingest_per_sec"] > 0 and report["query_per_sec"] > 0
+    assert report["query_p50_ms"] <= report["query_p95_ms"]
+    assert report["recall_at_1"] == 1.0
+
+    # An unknown backend constructs (the app still imports) and fails on connect, where the
+    # engine registry reports it
+    unknown = Embedder(backend="no-such-model")
+    registry = EngineRegistry()
+    registry.register("embeddings", unknown.connect, lambda: unknown.ready)
+    registry.start()
+    deadline = time.monotonic() + 5
+    while registry.ready_ms is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine = registry.status()["engines"]["embeddings"]
+    assert engine["state"] == "failed" and "Unknown embedding backend 'no-such-model'" in engine["error"]
+
+if __name__ == "__main__":
+    test_dynamic_ingest_batches()
+    test_retriever_uses_shared_embedder()
+    test_ingest_pools_small_files()
+    test_benchmark_reports_speed_and_recall()
+    print("--- AUDIT COMPLETE ---")
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "hive_llm_cache.db"))
+os.environ.setdefault("HIVE_CHECKPOINT_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_TRACE_PATH", os.path.join(tempfile.mkdtemp(), "hive_trace.json"))
+
+from app.engines.scientist.hive.orchestrator import HiveOrchestrator, REFLEXION_MAX_BYTES
+
+SLOW_FAIL = "import time\ntime.sleep(3)\nraise SystemExit(1)"
+FAST_FAIL = "raise ValueError('boom')"
+PASS = "print('realized')"
+NOISY_FAIL = "for i in range(20000):\n    print('x' * 40, i)\nraise ValueError('boom')"
+
+def _hive(responses):
+    hive = HiveOrchestrator()
+    hive.sovereign_mock = True
+    dsg = hive.new_dsg("parallel realization")
+    dsg["nodes"]["ideation"]["content"] = {"hypothesis": "parallel realization"}
+    prompts = []
+
+    def fake_llm(agent, system_prompt, user_prompt, temperature=None, on_token=None):
+        prompts.append((user_prompt, temperature))
+        return responses(user_prompt, temperature)
+
+    hive._llm_call = fake_llm
+    return hive, dsg, prompts
+
+def test_parallel_first_success_cancels():
+    print("--- CORTEX-SEC HIVE PARALLEL ENGINEER AUDIT ---")
+
+    # Lane 0 hangs, lane 1 passes: the hanging sandbox must be killed, not awaited
+    def responses(prompt, temperature):
+        return SLOW_FAIL if temperature is None else PASS
+
+    hive, dsg, _ = _hive(responses)
+    start = time.perf_counter()
+    assert hive.step_engineer(dsg, parallelism=2)
+    elapsed = time.perf_counter() - start
+    trials = dsg["nodes"]["realization"]["trials"]
+    print(f"[TEST 1] Winner lane {trials[-1]['lane']} in {elapsed:.2f}s, {len(trials)} trials recorded")
+    assert elapsed < 2.5
+    assert trials[-1]["exit_code"] == 0 and "realized" in trials[-1]["logs"]
+    assert any(t["exit_code"] == 130 for t in trials[:-1])
+    assert dsg["nodes"]["realization"]["content"] == PASS
+
+def test_reflexion_per_lane():
+    # Every first attempt fails; the retry must carry that lane's own error
+    def responses(prompt, temperature):
+        return PASS if "previous code failed" in prompt else FAST_FAIL
+
+    hive, dsg, prompts = _hive(responses)
+    assert hive.step_engineer(dsg, parallelism=2)
+    reflexions = [p for p, _ in prompts if "previous code failed" in p]
+    print(f"[TEST 2] {len(prompts)} prompts, {len(reflexions)} Reflexion retries")
+    assert reflexions and all("boom" in p for p in reflexions)
+    assert len({t for _, t in prompts}) == 2  # lanes sample at different temperatures
+
+def test_sequential_budget_preserved():
+    hive, dsg, prompts = _hive(lambda prompt, temperature: FAST_FAIL)
+    assert not hive.step_engineer(dsg, parallelism=1)
+    trials = dsg["nodes"]["realization"]["trials"]
+    print(f"[TEST 3] Circuit breaker after {len(trials)} trials")
+    assert [t["trial"] for t in trials] == [1, 2, 3, 4, 5]
+    assert dsg["nodes"]["realization"]["status"] == "FAILED_CIRCUIT_BREAKER"
+
+def test_reflexion_prompt_is_capped():
+    # Megabytes of stdout: the retry prompt keeps its own small budget and the traceback
+    def responses(prompt, temperature):
+        return PASS if "previous code failed" in prompt else NOISY_FAIL
+
+    hive, dsg, prompts = _hive(responses)
+    assert hive.step_engineer(dsg, parallelism=1)
+    reflexion = next(p for p, _ in prompts if "previous code failed" in p)
+    failed = dsg["nodes"]["realization"]["trials"][0]
+    print(f"[TEST 4] Reflexion prompt {len(reflexion.encode())} bytes from {len(failed['logs'].encode())} bytes of logs")
+    assert len(reflexion.encode()) < REFLEXION_MAX_BYTES + 1024
+    assert len(failed["logs"].encode()) > 2 * REFLEXION_MAX_BYTES
+    assert "Output truncated" in reflexion and "ValueError: boom" in reflexion
+
+if __name__ == "__main__":
+    test_parallel_first_success_cancels()
+    test_reflexion_per_lane()
+    test_sequential_budget_preserved()
+    test_reflexion_prompt_is_capped()
+    print("--- AUDIT COMPLETE ---")
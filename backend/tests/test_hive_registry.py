@@ -0,0 +1,213 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "hive_llm_cache.db"))
+os.environ.setdefault("HIVE_CHECKPOINT_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_TRACE_PATH", os.path.join(tempfile.mkdtemp(), "hive_trace.json"))
+
+from app.engines.scientist.hive.orchestrator import HiveOrchestrator
+from app.engines.scientist.hive.registry import ProjectRegistry, HiveQueueFull, hive_registry
+from app.api.hive import router as hive_router
+
+LLM_LATENCY = 0.1
+
+def fake_llm(agent, system_prompt, user_prompt, temperature=None, on_token=None):
+    time.sleep(LLM_LATENCY)
+    if agent == "theorist":
+        topic = user_prompt.split("\n")[0].replace("Topic: ", "")
+        return json.dumps({"hypothesis": topic})
+    if agent == "engineer":
+        hypothesis = json.loads(user_prompt.split("hypothesis: ", 1)[1].split("\n")[0])["hypothesis"]
+        return json.dumps({"code": f"print({hypothesis!r})"})
+    return json.dumps({"score": 9, "verdict": "ACCEPT", "critique": "ok"})
+
+def _wait(registry, project_ids, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(registry.get(pid)["finished_at"] for pid in project_ids):
+            return
+        time.sleep(0.02)
+    raise AssertionError("projects did not finish")
+
+def test_concurrent_projects_are_isolated():
+    print("--- CORTEX-SEC HIVE REGISTRY AUDIT ---")
+    hive = HiveOrchestrator()
+    hive._llm_call = fake_llm
+    registry = ProjectRegistry(hive, max_concurrent=3, max_queued=16)
+
+    topics = [f"topic-{i}" for i in range(6)]
+    start = time.perf_counter()
+    project_ids = [registry.submit(t)["project_id"] for t in topics]
+    _wait(registry, project_ids)
+    elapsed = time.perf_counter() - start
+
+    # 1. Every DSG only ever saw its own topic
+    for topic, pid in zip(topics, project_ids):
+        dsg = registry.get(pid)
+        assert dsg["status"] == "COMPLETED", dsg
+        assert dsg["nodes"]["ideation"]["content"]["hypothesis"] == topic
+        assert len(dsg["nodes"]["realization"]["trials"]) == 1
+        assert topic in dsg["nodes"]["realization"]["trials"][-1]["logs"]
+    print(f"[TEST 1] {len(topics)} isolated cycles in {elapsed:.2f}s, {registry.stats()}")
+
+    # 2. Bounded concurrency still overlaps cycles
+    windows = sorted((registry.get(pid)["started_at"], registry.get(pid)["finished_at"]) for pid in project_ids)
+    peak = max(sum(1 for s, f in windows if s <= t < f) for t, _ in windows)
+    print(f"[TEST 2] Peak concurrent cycles: {peak}")
+    assert 1 < peak <= 3
+    registry.shutdown()
+
+def test_queue_bound_rejects_overflow():
+    hive = HiveOrchestrator()
+    hive._llm_call = fake_llm
+    registry = ProjectRegistry(hive, max_concurrent=1, max_queued=2)
+    registry.submit("a")
+    time.sleep(0.05)  # let the first one start
+    registry.submit("b")
+    registry.submit("c")
+    try:
+        registry.submit("d")
+        assert False, "queue bound not enforced"
+    except HiveQueueFull:
+        print(f"[TEST 3] Overflow refused: {registry.stats()}")
+    registry.shutdown()
+
+def test_hive_api_submit_and_poll():
+    hive_registry.orchestrator._llm_call = fake_llm
+    app = FastAPI()
+    app.include_router(hive_router)
+    client = TestClient(app)
+
+    response = client.post("/hive/projects", json={"topic": "api-topic"})
+    assert response.status_code == 202
+    project_id = response.json()["project_id"]
+    _wait(hive_registry, [project_id])
+
+    listing = client.get("/hive/projects?status=COMPLETED").json()
+    assert project_id in [p["project_id"] for p in listing["projects"]]
+    detail = client.get(f"/hive/projects/{project_id}").json()
+    print(f"[TEST 4] API project {project_id}: {detail['status']}")
+    assert detail["nodes"]["audit"]["verdict"] == "ACCEPT"
+    assert client.get("/hive/projects/HIVE_missing").status_code == 404
+
+def test_final_status_is_checkpointed():
+    def crashing_llm(agent, system_prompt, user_prompt, temperature=None, on_token=None):
+        if agent == "engineer":
+            raise RuntimeError("engineer lane crashed")
+        return fake_llm(agent, system_prompt, user_prompt, temperature, on_token)
+
+    hive = HiveOrchestrator()
+    hive._llm_call = crashing_llm
+    registry = ProjectRegistry(hive, max_concurrent=1, max_queued=4)
+    project_id = registry.submit("crash-topic")["project_id"]
+    _wait(registry, [project_id])
+
+    # 5. The checkpoint carries the terminal status, not the last stage's ACTIVE
+    checkpoint = hive.checkpoints.load(project_id)
+    print(f"[TEST 5] Checkpoint after crash: {checkpoint['status']} ({checkpoint['error']})")
+    assert checkpoint["status"] == "ERROR" and "engineer lane crashed" in checkpoint["error"]
+    assert checkpoint["finished_at"] is not None
+
+    # 6. An invalid re-run is refused up front by the orchestrator's own check
+    try:
+        registry.rerun(project_id, "reviewer")
+        assert False, "re-run on an unfinished realization was scheduled"
+    except ValueError as e:
+        assert "realization" in str(e)
+    registry.shutdown()
+
+def test_snapshots_are_taken_under_the_project_lock():
+    hive = HiveOrchestrator()
+    hive._llm_call = fake_llm
+    hive.engineer_parallelism = 3
+    registry = ProjectRegistry(hive, max_concurrent=2, max_queued=8)
+    project_id = registry.submit("locked-topic")["project_id"]
+    _wait(registry, [project_id])
+
+    # 7. A reader waits for a writer holding the project lock, and so do trace summaries from lanes
+    lock, copied, traced = hive.dsg_lock(project_id), threading.Event(), threading.Event()
+    with lock:
+        threading.Thread(target=lambda: registry.get(project_id) and copied.set(), daemon=True).start()
+        def lane_span():
+            with hive.tracer.span(registry._projects[project_id], "engineer.trial"):
+                pass
+            traced.set()
+        threading.Thread(target=lane_span, daemon=True).start()
+        assert not copied.wait(0.1) and not traced.wait(0.1)
+    assert copied.wait(2) and traced.wait(2)
+
+    # Polling a running project with parallel lanes never copies a DSG mid-change
+    errors, done = [], threading.Event()
+    def poll():
+        while not done.is_set():
+            for pid in list(registry._projects):
+                try:
+                    registry.get(pid)
+                except Exception as e:
+                    errors.append(e)
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+    project_ids = [registry.submit(f"polled-{i}")["project_id"] for i in range(4)]
+    _wait(registry, project_ids)
+    done.set()
+    poller.join()
+    print(f"[TEST 7] Snapshots wait for the project lock; {len(errors)} errors while polling 4 running cycles")
+    assert not errors
+    registry.shutdown()
+
+def test_stage_writes_hold_the_project_lock():
+    hive = HiveOrchestrator()
+    hive._llm_call = fake_llm
+    registry = ProjectRegistry(hive, max_concurrent=1, max_queued=4)
+
+    class OwnedLock:
+        def __init__(self):
+            self._lock, self.owner, self.depth = threading.RLock(), None, 0
+        def __enter__(self):
+            self._lock.acquire()
+            self.owner, self.depth = threading.get_ident(), self.depth + 1
+            return self
+        def __exit__(self, *exc):
+            self.depth -= 1
+            if not self.depth:
+                self.owner = None
+            self._lock.release()
+
+    lock, unguarded = OwnedLock(), []
+    hive.dsg_lock = hive.tracer.lock_for = lambda project_id: lock
+
+    class Guarded(dict):
+        def __setitem__(self, key, value):
+            if (self is dsg or self is nodes) and lock.owner != threading.get_ident():
+                unguarded.append(key)
+            super().__setitem__(key, value)
+
+    # 8. The theorist's result, the start time and the circuit-breaker verdict are written under the project lock
+    dsg = Guarded(hive.new_dsg("guarded-topic"))
+    nodes = Guarded(dsg["nodes"])
+    dict.__setitem__(dsg, "nodes", nodes)
+    registry._schedule(dsg, lambda: hive.step_theorist(dsg))
+    _wait(registry, [dsg["project_id"]])
+    print(f"[TEST 8] Stage writes outside the project lock: {unguarded}")
+    assert dsg["nodes"]["ideation"]["status"] == "VERIFIED_GROUNDING" and dsg["status"] == "FAILED"
+    assert not unguarded
+    registry.shutdown()
+
+if __name__ == "__main__":
+    test_concurrent_projects_are_isolated()
+    test_queue_bound_rejects_overflow()
+    test_hive_api_submit_and_poll()
+    test_final_status_is_checkpointed()
+    test_snapshots_are_taken_under_the_project_lock()
+    test_stage_writes_hold_the_project_lock()
+    print("--- AUDIT COMPLETE ---")
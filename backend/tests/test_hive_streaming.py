@@ -0,0 +1,128 @@
+import sys
+import os
+import json
+import asyncio
+import time
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "hive_llm_cache.db"))
+os.environ.setdefault("HIVE_CHECKPOINT_DIR", tempfile.mkdtemp())
+os.environ.setdefault("HIVE_TRACE_PATH", os.path.join(tempfile.mkdtemp(), "hive_trace.json"))
+
+from app.engines.scientist.hive.events import HiveEventBus
+from app.engines.scientist.hive.llm_gateway import ProviderGateway
+from app.engines.scientist.hive.llm_cache import LLMCache
+from app.engines.scientist.hive.orchestrator import HiveOrchestrator
+from app.engines.scientist.hive.registry import hive_registry
+from app.api.hive import router as hive_router
+from fake_llm_server import FakeLLMServer
+
+TOKEN_DELAY = 0.05
+
+def test_gateway_streams_tokens_before_completion():
+    print("--- CORTEX-SEC HIVE STREAMING AUDIT ---")
+    with FakeLLMServer() as fake:
+        fake.token_delay["ollama"] = TOKEN_DELAY
+        os.environ["OLLAMA_BASE_URL"] = fake.url
+        try:
+            gateway = ProviderGateway()
+        finally:
+            os.environ.pop("OLLAMA_BASE_URL", None)
+
+        arrivals = []
+        start = time.perf_counter()
+        content, _, _ = gateway.complete("ollama", "llama3", "sys", "one two three four five six", on_token=lambda t: arrivals.append((time.perf_counter() - start, t)))
+        total = time.perf_counter() - start
+        gateway.close()
+
+    # 1. Every delta arrived separately and the first long before the reply finished
+    print(f"[TEST 1] {len(arrivals)} tokens, first after {arrivals[0][0]*1000:.0f}ms, full reply after {total*1000:.0f}ms")
+    assert "".join(t for _, t in arrivals) == content == "[ollama:llama3] one two three four five six"
+    assert len(arrivals) == 7
+    assert arrivals[0][0] < total - 4 * TOKEN_DELAY
+
+def test_cycle_publishes_ordered_events():
+    bus = HiveEventBus()
+    hive = HiveOrchestrator(llm_cache=LLMCache(mode="off"), events=bus)
+
+    def fake_llm(agent, system_prompt, user_prompt, temperature=None, on_token=None):
+        reply = {
+            "theorist": json.dumps({"hypothesis": "streamed"}),
+            "engineer": json.dumps({"code": "print('line one')\nprint('line two')"}),
+            "reviewer": json.dumps({"score": 9, "verdict": "ACCEPT", "critique": "ok"}),
+        }[agent]
+        for i in range(0, len(reply), 8):
+            on_token(reply[i:i + 8])
+        return reply
+    hive._llm_call = fake_llm
+
+    dsg = hive.execute_complete_cycle("event topic")
+    events, _ = bus.events_after(dsg["project_id"])
+    types = [e["type"] for e in events]
+
+    # 2. Tokens, sandbox lines and the verdict are all on the feed, in order
+    print(f"[TEST 2] {len(events)} events: {sorted(set(types))}")
+    assert [e["seq"] for e in events] == list(range(1, len(events) + 1))
+    assert [e["line"] for e in events if e["type"] == "sandbox"] == ["line one", "line two"]
+    assert "".join(e["text"] for e in events if e["type"] == "token" and e["agent"] == "engineer") == json.dumps({"code": "print('line one')\nprint('line two')"})
+    assert types.index("grounding") < types.index("trial_start") < types.index("sandbox") < types.index("verdict")
+    assert events[types.index("verdict")]["verdict"] == "ACCEPT"
+
+def test_sse_endpoint_replays_and_resumes():
+    def fake_llm(agent, system_prompt, user_prompt, temperature=None, on_token=None):
+        reply = json.dumps({"theorist": {"hypothesis": "sse"}, "engineer": {"code": "print('sse')"}, "reviewer": {"score": 9, "verdict": "ACCEPT", "critique": "ok"}}[agent])
+        on_token(reply)
+        return reply
+    hive_registry.orchestrator._llm_call = fake_llm
+    app = FastAPI()
+    app.include_router(hive_router)
+    client = TestClient(app)
+
+    project_id = client.post("/hive/projects", json={"topic": "sse topic"}).json()["project_id"]
+    with client.stream("GET", f"/hive/projects/{project_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = [f for f in response.read().decode().split("\n\n") if f.startswith("id:")]
+    seen = [dict(line.split(": ", 1) for line in frame.split("\n")) for frame in frames]
+
+    # 3. The live stream ends with `done` carrying the final status
+    print(f"[TEST 3] SSE delivered {len(seen)} events, last: {seen[-1]['event']}")
+    assert seen[-1]["event"] == "done" and json.loads(seen[-1]["data"])["status"] == "COMPLETED"
+    assert any(s["event"] == "sandbox" for s in seen)
+
+    # 4. Reconnecting with Last-Event-ID only sends what came after it
+    resumed = client.get(f"/hive/projects/{project_id}/events", headers={"Last-Event-ID": seen[-3]["id"]}).text
+    assert [f.split("\n")[0] for f in resumed.split("\n\n") if f] == [f"id: {s['id']}" for s in seen[-2:]]
+    assert client.get("/hive/projects/HIVE_missing/events").status_code == 404
+    print("[TEST 4] Last-Event-ID resume and unknown-project 404 verified")
+
+def test_reopened_stream_replays_past_previous_run():
+    bus = HiveEventBus()
+    bus.publish("HIVE_rerun", "status", status="ACTIVE")
+    bus.publish("HIVE_rerun", "done", status="COMPLETED")
+    bus.reopen("HIVE_rerun")
+    bus.publish("HIVE_rerun", "status", status="QUEUED")
+
+    # 5. A client replaying from the start after a re-run is not cut off by the first run's `done`
+    events, closed = bus.events_after("HIVE_rerun")
+    assert [e["type"] for e in events] == ["status", "status"] and not closed
+    bus.publish("HIVE_rerun", "done", status="REJECTED_BY_PEER_REVIEW")
+
+    async def replay():
+        return [event async for event in bus.subscribe("HIVE_rerun", keepalive=1.0)]
+    replayed = asyncio.run(replay())
+    print(f"[TEST 5] Replay after re-run: {[(e['seq'], e['type']) for e in replayed]}")
+    assert [e["type"] for e in replayed] == ["status", "status", "done"]
+    assert replayed[-1]["status"] == "REJECTED_BY_PEER_REVIEW"
+
+if __name__ == "__main__":
+    test_gateway_streams_tokens_before_completion()
+    test_cycle_publishes_ordered_events()
+    test_sse_endpoint_replays_and_resumes()
+    test_reopened_stream_replays_past_previous_run()
+    print("--- AUDIT COMPLETE ---")
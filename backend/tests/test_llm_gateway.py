@@ -0,0 +1,79 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from app.engines.scientist.hive.llm_gateway import ProviderGateway, LLMDeadlineExceeded
+from fake_llm_server import FakeLLMServer
+
+def _gateway(fake, **kwargs):
+    for name, value in fake.env().items():
+        os.environ[name] = value
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["ANTHROPIC_API_KEY"] = "sk-ant-fake"
+    try:
+        return ProviderGateway(**kwargs)
+    finally:
+        for name in list(fake.env()) + ["OPENAI_API_KEY", "ANTHROPIC_API_KEY"]:
+            os.environ.pop(name, None)
+
+def test_gateway_wire_formats_and_pooling():
+    print("--- CORTEX-SEC HIVE LLM GATEWAY AUDIT ---")
+    with FakeLLMServer() as fake:
+        gateway = _gateway(fake, hedge_after=5.0)
+        for provider, model in (("openai", "gpt-4o"), ("anthropic", "claude-3-5-sonnet-20240620"), ("ollama", "llama3")):
+            content, answered_by, _ = gateway.complete(provider, model, "sys", "ping")
+            assert answered_by == provider and content == f"[{provider}:{model}] ping"
+            # Token usage is normalised from each wire format, streamed or not
+            for on_token in (None, lambda t: None):
+                usage = {}
+                gateway.complete(provider, model, "sys", "ping", on_token=on_token, usage=usage)
+                assert usage == {"tokens_in": 2, "tokens_out": 2}, (provider, usage)
+        print(f"[TEST 1] All three wire formats answered: {fake.calls}")
+
+        # 2. Per-provider concurrency limit holds under load
+        fake.latency["ollama"] = 0.2
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda i: gateway.complete("ollama", "llama3", "sys", f"q{i}"), range(6)))
+        print(f"[TEST 2] Peak concurrent Ollama requests: {fake.peak_in_flight['ollama']} (limit {gateway.concurrency['ollama']})")
+        assert fake.peak_in_flight["ollama"] <= gateway.concurrency["ollama"]
+        gateway.close()
+
+def test_gateway_hedges_and_deadlines():
+    with FakeLLMServer() as fake:
+        gateway = _gateway(fake, hedge_after=0.2, deadline=1.5)
+
+        # 3. Slow primary -> Ollama hedge wins well before the primary would answer
+        fake.latency["openai"] = 3.0
+        start = time.perf_counter()
+        _, answered_by, model = gateway.complete("openai", "gpt-4o", "sys", "slow primary")
+        elapsed = time.perf_counter() - start
+        print(f"[TEST 3] Hedged answer from {answered_by}/{model} in {elapsed:.2f}s")
+        assert answered_by == "ollama" and elapsed < 1.0
+
+        # 4. Non-retryable primary failure falls back immediately
+        fake.reset()
+        fake.fail["anthropic"] = 401
+        _, answered_by, _ = gateway.complete("anthropic", "claude-3-5-sonnet-20240620", "sys", "bad key")
+        assert answered_by == "ollama" and fake.calls["anthropic"] == 1
+
+        # 5. Everything slow -> bounded by the deadline, not by the server
+        fake.reset()
+        fake.latency["openai"] = fake.latency["ollama"] = 3.0
+        start = time.perf_counter()
+        try:
+            gateway.complete("openai", "gpt-4o", "sys", "all slow", deadline=0.5)
+            assert False, "expected a deadline error"
+        except LLMDeadlineExceeded:
+            elapsed = time.perf_counter() - start
+        print(f"[TEST 5] Deadline enforced after {elapsed:.2f}s")
+        assert elapsed < 1.0
+        gateway.close()
+
+if __name__ == "__main__":
+    test_gateway_wire_formats_and_pooling()
+    test_gateway_hedges_and_deadlines()
+    print("--- AUDIT COMPLETE ---")
@@ -0,0 +1,76 @@
+import sys
+import os
+import time
+import copy
+import asyncio
+
+from fastapi import FastAPI
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from load_harness import run_profile, replay, load_baseline, diff, format_diff
+
+def test_mixed_profile_against_fakes():
+    print("--- CORTEX-SEC LOAD SUITE ---")
+    report = run_profile("mixed", requests=240)
+
+    # 1. Every route in the profile was exercised and nothing failed (429/503 are sheds)
+    for route, stats in report["routes"].items():
+        print(f"  {route:<22} {stats['requests']:>4} req  p95 {stats['p95_ms']} ms  blocked {stats['loop_blocked_ms']} ms  {stats['status']}")
+        assert stats["requests"] > 0 and set(stats["status"]) <= {"200", "429", "503"}
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    print(f"[TEST 1] {report['throughput_rps']} req/s overall, loop lag p99 {report['loop']['lag_p99_ms']} ms")
+
+    # 2. The fakes answered: no Chroma, Docker or LLM outside the process
+    assert report["fakes"]["chroma_queries"] > 0 and report["fakes"]["docker_execs"] > 0
+    assert report["fakes"]["llm_calls"] == 0
+
+    # 3. The run diffs against the saved baseline route by route
+    baseline = load_baseline("mixed")
+    rows = diff(report, baseline)
+    print(f"[TEST 3] Against the saved baseline:\n{format_diff(rows)}")
+    assert {row["route"] for row in rows} == set(report["routes"])
+    if os.getenv("LOADTEST_ENFORCE") == "1":
+        assert not [row for row in rows if row["regression"]]
+
+def test_diff_flags_regressions():
+    baseline = load_baseline("mixed")
+    slower = copy.deepcopy(baseline)
+    for stats in slower["routes"].values():
+        stats["throughput_rps"] /= 3
+        stats["p95_ms"] = stats["p95_ms"] * 3 + 20
+
+    # 4. A 3x slowdown is flagged on every route; identical runs are not
+    flagged = {row["route"] for row in diff(slower, baseline) if row["regression"]}
+    assert flagged == set(baseline["routes"])
+    assert not [row for row in diff(baseline, baseline) if row["regression"]]
+
+def test_loop_blocking_is_attributed_per_route():
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        time.sleep(0.02)  # sync work on the event loop
+        return {}
+
+    @app.get("/awaiting")
+    async def awaiting():
+        await asyncio.sleep(0.02)
+        return {}
+
+    routes = {"blocking": ("GET", "/blocking", None), "awaiting": ("GET", "/awaiting", None)}
+    profile = {"requests": 30, "concurrency": 1, "weights": {"blocking": 1, "awaiting": 1}}
+    report = asyncio.run(replay(app, profile, routes=routes))
+
+    # 5. The handler that holds the loop owns the blocking, the one that awaits does not
+    block, wait = report["routes"]["blocking"], report["routes"]["awaiting"]
+    print(f"[TEST 5] blocking: {block['loop_blocked_ms']} ms over {block['requests']} req, awaiting: {wait['loop_blocked_ms']} ms over {wait['requests']} req")
+    assert block["loop_blocked_ms"] > 0.7 * 20 * block["requests"]
+    assert wait["loop_blocked_ms"] < 0.25 * block["loop_blocked_ms"]
+
+if __name__ == "__main__":
+    test_mixed_profile_against_fakes()
+    test_diff_flags_regressions()
+    test_loop_blocking_is_attributed_per_route()
+    print("--- AUDIT COMPLETE ---")
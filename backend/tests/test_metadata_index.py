@@ -0,0 +1,163 @@
+import sys
+import os
+import time
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CHROMA_PERSIST_DIR", tempfile.mkdtemp())
+os.environ.setdefault("ARCHIVE_INDEX_DIR", tempfile.mkdtemp())
+
+from app.engines.rag_engine.metadata_index import MetadataIndex, metadata_index, _Table
+from app.engines.rag_engine.retriever import StrictRetriever
+from app.engines.rag_engine.chroma_client import chroma_manager
+from app.api import archive
+
+class MetadataCollection:
+    """Chroma stand-in: paged `get` of metadatas, `count`, and a recorded `query`."""
+    def __init__(self, metadatas):
+        self.metadatas = metadatas
+        self.queries = []
+        self.gets = 0
+
+    def get(self, include=None, limit=None, offset=0):
+        self.gets += 1
+        return {"metadatas": self.metadatas[offset:offset + limit]}
+
+    def count(self):
+        return len(self.metadatas)
+
+    def query(self, **kwargs):
+        self.queries.append(kwargs)
+        return {"documents": [["chunk"]], "metadatas": [[self.metadatas[0]]], "distances": [[0.1]]}
+
+def _chunks(source, year, authority, languages):
+    return [{"source": source, "year": year, "authority": authority, "language": language} for language in languages]
+
+def _collections():
+    trench = MetadataCollection(
+        _chunks("S4vitar_sqli_2023.md", 2023, "High (Technical Expert)", ["python", "python", "text"])
+        + _chunks("rop_2019.md", 2019, "Medium (Resource)", ["c/cpp", "text"])
+    )
+    return {"doctrine": MetadataCollection([]), "trench": trench, "future": MetadataCollection([])}
+
+def test_rebuild_persist_and_maintain():
+    print("--- CORTEX-SEC METADATA INDEX AUDIT ---")
+    directory = tempfile.mkdtemp()
+    collections, saved = _collections(), chroma_manager._collections
+    chroma_manager._collections = collections
+    try:
+        # 1. No sidecar yet: rebuilt once from Chroma in pages and written to disk
+        index = MetadataIndex(directory)
+        facets = index.facets("trench")
+        print(f"[TEST 1] Rebuilt facets: {facets}")
+        assert facets["chunks"] == 5 and facets["sources"] == 2
+        assert facets["facets"]["language"] == {"python": 2, "text": 2, "c/cpp": 1}
+        assert os.path.exists(os.path.join(directory, "trench.json"))
+
+        # 2. A fresh process loads the sidecar without scanning Chroma
+        gets = collections["trench"].gets
+        reloaded = MetadataIndex(directory)
+        assert reloaded.facets("trench", {"year": {"$gte": 2020}})["chunks"] == 3
+        assert collections["trench"].gets == gets
+
+        # 3. Re-ingesting a file replaces its rows; a sidecar that disagrees with Chroma is rebuilt
+        reloaded.record("trench", "rop_2019.md", 2019, "Medium (Resource)", ["c/cpp"] * 4)
+        reloaded.save("trench")
+        assert reloaded.count("trench", {"source": "rop_2019.md"}) == 4
+        assert MetadataIndex(directory).count("trench") == 5
+        assert collections["trench"].gets == gets + 1
+    finally:
+        chroma_manager._collections = saved
+
+def test_retriever_skips_chroma_when_nothing_matches():
+    collections, saved = _collections(), chroma_manager._collections
+    directory, tables = metadata_index.directory, metadata_index._tables
+    chroma_manager._collections = collections
+    metadata_index.directory, metadata_index._tables = tempfile.mkdtemp(), {}
+    try:
+        retriever = StrictRetriever()
+        # 4. Before the index is loaded nothing is proven: Chroma is queried
+        retriever.retrieve("sqli", "trench", filters={"language": "rust"})
+        assert len(collections["trench"].queries) == 1
+
+        # 5. Once loaded, an impossible filter never reaches Chroma; a possible one does
+        metadata_index.load_all()
+        assert retriever.retrieve("sqli", "trench", filters={"language": "rust"}) == []
+        assert retriever.retrieve("sqli", "trench", filters={"year": {"$gte": 2030}}) == []
+        assert len(collections["trench"].queries) == 1
+        retriever.retrieve("sqli", "trench", filters={"year": {"$gte": 2020}, "language": "python"})
+        assert collections["trench"].queries[-1]["where"] == {"$and": [{"year": {"$gte": 2020}}, {"language": "python"}]}
+        # Filters on fields the index does not hold are never short-circuited
+        retriever.retrieve("sqli", "trench", filters={"type": "nothing"})
+        assert len(collections["trench"].queries) == 3
+        print(f"[TEST 5] Chroma queried {len(collections['trench'].queries)}x for 5 searches")
+
+        # 6. /archive/facets answers from the index with the /search filters
+        app = FastAPI()
+        app.include_router(archive.router)
+        client = TestClient(app)
+        start = time.perf_counter()
+        body = client.get("/archive/facets", params={"collection": "trench", "authority": "High (Technical Expert)"}).json()
+        print(f"[TEST 6] Facets in {(time.perf_counter() - start) * 1000:.1f} ms: {body}")
+        assert body["chunks"] == 3 and body["facets"]["source"] == {"S4vitar_sqli_2023.md": 3}
+        assert client.get("/archive/facets", params={"collection": "nope"}).status_code == 400
+    finally:
+        chroma_manager._collections = saved
+        metadata_index.directory, metadata_index._tables = directory, tables
+
+def test_facets_at_scale():
+    index = MetadataIndex(tempfile.mkdtemp())
+    authorities = ["High (Academic/Legal)", "High (Technical Expert)", "Medium (Resource)"]
+    index._tables["doctrine"] = _Table()
+    for i in range(5000):
+        index.record("doctrine", f"paper_{i}.pdf", 1990 + i % 35, authorities[i % 3], ["text"] * 20 + ["python"] * (i % 3))
+
+    # 7. 100k chunks over 5000 files: a filtered facet query stays in milliseconds
+    start = time.perf_counter()
+    facets = index.facets("doctrine", {"year": {"$gte": 2020}, "language": "python"})
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"[TEST 7] {facets['chunks']} matching chunks in {elapsed_ms:.1f} ms")
+    assert facets["chunks"] == sum(i % 3 for i in range(5000) if 1990 + i % 35 >= 2020)
+    assert elapsed_ms < 200
+
+    # 8. The per-search short-circuit check is cheaper still (Chroma agrees with the index here)
+    total = index.count("doctrine")
+    index._chroma_count = lambda name: total
+    start = time.perf_counter()
+    assert not index.may_match("doctrine", {"year": {"$gte": 2030}, "language": "python"})
+    assert index.may_match("doctrine", {"authority": "Medium (Resource)"})
+    print(f"[TEST 8] Two short-circuit checks in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+def test_stale_index_is_not_trusted():
+    collections, saved = _collections(), chroma_manager._collections
+    chroma_manager._collections = collections
+    try:
+        index = MetadataIndex(tempfile.mkdtemp())
+        index.load_all()
+        assert not index.may_match("trench", {"language": "rust"})
+
+        # 9. Another process adds a Rust write-up: once the verification window lapses, one
+        # count() exposes the disagreement and the filter goes to Chroma again
+        collections["trench"].metadatas += _chunks("rust_uaf_2024.md", 2024, "High (Technical Expert)", ["rust"])
+        assert not index.may_match("trench", {"language": "rust"})
+        index.verify_interval = 0
+        assert index.may_match("trench", {"language": "rust"})
+        print(f"[TEST 9] Index {index.count('trench')} chunks vs Chroma {collections['trench'].count()}: not short-circuited")
+
+        # Agreement restores the short-circuit without a rebuild
+        collections["trench"].metadatas.pop()
+        assert not index.may_match("trench", {"language": "rust"})
+        assert collections["trench"].gets == 1
+    finally:
+        chroma_manager._collections = saved
+
+if __name__ == "__main__":
+    test_rebuild_persist_and_maintain()
+    test_retriever_skips_chroma_when_nothing_matches()
+    test_facets_at_scale()
+    test_stale_index_is_not_trusted()
+    print("--- AUDIT COMPLETE ---")
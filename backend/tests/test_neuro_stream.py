@@ -0,0 +1,132 @@
+import sys
+import os
+import tempfile
+
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+os.environ.setdefault("CONSENT_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "consent_ledger.db"))
+os.environ.setdefault("CONSENT_AUDIT_PATH", os.path.join(tempfile.mkdtemp(), "access_audit.db"))
+
+from app.api.neuro import router as neuro_router
+from app.engines.neuro_sim.frames import decode_frame, FRAME_HEADER
+from app.engines.neuro_sim.ledger import consent_ledger
+from app.engines.neuro_sim.broadcast import device_broadcast
+from app.engines.neuro_sim.generator import neuro_gen
+
+def test_binary_stream_session():
+    print("--- CORTEX-SEC NEURO WEBSOCKET AUDIT ---")
+    app = FastAPI()
+    app.include_router(neuro_router)
+    client = TestClient(app)
+
+    consent_ledger.update_consent("REVOKE")
+    with client.websocket_connect("/neuro/stream/ws?client_id=ws-auditor") as ws:
+        session = ws.receive_json()
+        assert session["type"] == "session"
+        assert session["audit_log"]["decision"] == "DENIED"
+
+        # 1. Revoked consent -> header-only frames
+        frame = ws.receive_bytes()
+        decoded = decode_frame(frame)
+        print(f"[TEST 1] Redacted frame: {len(frame)} bytes")
+        assert decoded["redacted"] and decoded["samples"].size == 0
+        assert len(frame) == FRAME_HEADER.size
+
+        # 2. Grant mid-session -> one consent event, then full frames
+        consent_ledger.update_consent("GRANT")
+        message = ws.receive()
+        while "text" not in message:
+            message = ws.receive()
+        assert '"consent"' in message["text"]
+
+        decoded = decode_frame(ws.receive_bytes())
+        print(f"[TEST 2] Exposed frame: {decoded['samples'].shape} samples, state {decoded['inferred_state']}")
+        assert not decoded["redacted"]
+        assert decoded["samples"].shape == (session["block_size"], len(session["channels"]))
+        assert decoded["inferred_state"] is not None
+
+    consent_ledger.update_consent("REVOKE")
+
+def test_sessions_share_one_producer_per_device():
+    app = FastAPI()
+    app.include_router(neuro_router)
+    device = "CORTEX-BCI-SHARED"
+    blocks = []
+    stream_block = neuro_gen.stream_block
+    neuro_gen.stream_block = lambda device_id="CORTEX-BCI-001": blocks.append(device_id) or stream_block(device_id)
+
+    consent_ledger.update_consent("REVOKE")
+    consent_ledger.update_consent("GRANT", client_id="ws-viewer")
+    try:
+        # One event loop for both sessions, as under uvicorn
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/neuro/stream/ws?client_id=ws-viewer&device_id={device}") as viewer, \
+                 client.websocket_connect(f"/neuro/stream/ws?client_id=ws-outsider&device_id={device}") as outsider:
+                viewer.receive_json(), outsider.receive_json()
+                exposed = [decode_frame(viewer.receive_bytes()) for _ in range(6)]
+                denied = [decode_frame(outsider.receive_bytes()) for _ in range(6)]
+
+                # 3. Two sessions on one device: one producer, the same frames, each with its own consent
+                produced = blocks.count(device)
+                print(f"[TEST 3] 2 sessions, {device_broadcast.subscribers(device)} subscribers, {produced} blocks generated")
+                assert device_broadcast.subscribers(device) == 2
+                assert all(frame["redacted"] for frame in denied) and not any(frame["redacted"] for frame in exposed)
+                # A seq both sessions saw is the same block, stamped once
+                stamps = {frame["seq"]: frame["timestamp"] for frame in exposed}
+                shared = [frame for frame in denied if frame["seq"] in stamps]
+                assert shared and all(stamps[frame["seq"]] == frame["timestamp"] for frame in shared)
+                # The device advances once per frame, not once per frame per session
+                last = max(frame["seq"] for frame in exposed + denied)
+                assert produced <= last + 1 + device_broadcast.queue_size
+        # 4. The producer stops with its last subscriber
+        assert device_broadcast.subscribers(device) == 0
+    finally:
+        neuro_gen.stream_block = stream_block
+        consent_ledger.update_consent("REVOKE", client_id="ws-viewer")
+
+def test_failed_producer_closes_its_sessions():
+    app = FastAPI()
+    app.include_router(neuro_router)
+    device = "CORTEX-BCI-FAULTY"
+    stream_block = neuro_gen.stream_block
+    calls = []
+
+    def faulty(device_id="CORTEX-BCI-001"):
+        calls.append(device_id)
+        if len(calls) > 3:
+            raise RuntimeError("sensor unplugged")
+        return stream_block(device_id)
+
+    neuro_gen.stream_block = faulty
+    try:
+        with TestClient(app) as client:
+            with client.websocket_connect(f"/neuro/stream/ws?client_id=ws-a&device_id={device}") as first, \
+                 client.websocket_connect(f"/neuro/stream/ws?client_id=ws-b&device_id={device}") as second:
+                first.receive_json(), second.receive_json()
+                # 5. A producer error ends every session on the device instead of leaving it waiting
+                for ws in (first, second):
+                    try:
+                        while True:
+                            ws.receive_bytes()
+                    except WebSocketDisconnect as e:
+                        code = e.code
+                    assert code == 1011
+                print(f"[TEST 5] Producer failed after {len(calls) - 1} blocks, sessions closed with {code}")
+                assert device_broadcast.subscribers(device) == 0
+
+            # 6. The next session starts a fresh producer
+            neuro_gen.stream_block = stream_block
+            with client.websocket_connect(f"/neuro/stream/ws?client_id=ws-a&device_id={device}") as again:
+                again.receive_json()
+                assert decode_frame(again.receive_bytes())["seq"] == 0
+    finally:
+        neuro_gen.stream_block = stream_block
+
+if __name__ == "__main__":
+    test_binary_stream_session()
+    test_sessions_share_one_producer_per_device()
+    test_failed_producer_closes_its_sessions()
+    print("--- AUDIT COMPLETE ---")
@@ -0,0 +1,135 @@
+import sys
+import os
+import time
+import threading
+import subprocess
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from app.engines.scientist.hive.sandbox_pool import InterpreterPool, OutputCapture
+
+def _wait_warm(pool, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while len(pool._idle) < pool.size and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_interpreter_pool_semantics():
+    print("--- CORTEX-SEC SANDBOX POOL AUDIT ---")
+    pool = InterpreterPool(size=2)
+    pool.warm()
+    _wait_warm(pool)
+
+    # 1. Same observable behaviour as `python file.py`
+    ok = pool.run("import sys\nprint('hello')\nprint('warn', file=sys.stderr)", timeout=5)
+    assert ok["exit_code"] == 0 and "hello" in ok["logs"] and "warn" in ok["logs"]
+    crash = pool.run("x = 1\nraise ValueError('boom')", timeout=5)
+    assert crash["exit_code"] == 1 and "ValueError: boom" in crash["logs"] and "raise ValueError" in crash["logs"]
+    assert pool.run("raise SystemExit(3)", timeout=5)["exit_code"] == 3
+    print(f"[TEST 1] exit codes and tracebacks preserved ({pool.stats})")
+
+    # 2. Workers are single-use: state never leaks between trials
+    pool.run("import builtins\nbuiltins.LEAK = 1", timeout=5)
+    leak = pool.run("import builtins\nprint(hasattr(builtins, 'LEAK'))", timeout=5)
+    assert "False" in leak["logs"]
+
+    # 3. Timeouts and cancellation kill the worker
+    assert pool.run("import time\ntime.sleep(5)", timeout=0.3)["exit_code"] == 124
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    assert pool.run("import time\ntime.sleep(5)", timeout=5, cancel_event=cancel)["exit_code"] == 130
+    print("[TEST 3] Timeout (124) and cancellation (130) enforced")
+    pool.close()
+
+def test_interpreter_pool_overhead():
+    trials = 8
+    pool = InterpreterPool(size=2)
+    pool.warm()
+
+    warm = []
+    for _ in range(trials):
+        _wait_warm(pool)
+        start = time.perf_counter()
+        assert pool.run("pass", timeout=5)["exit_code"] == 0
+        warm.append(time.perf_counter() - start)
+
+    cold = []
+    for _ in range(trials):
+        start = time.perf_counter()
+        subprocess.run(["python", "-c", "pass"], capture_output=True, env={"PATH": os.environ["PATH"]})
+        cold.append(time.perf_counter() - start)
+
+    warm_ms, cold_ms = 1000 * sorted(warm)[trials // 2], 1000 * sorted(cold)[trials // 2]
+    print(f"[TEST 4] Median per-trial overhead: warm {warm_ms:.1f} ms vs cold {cold_ms:.1f} ms ({pool.stats})")
+    assert pool.stats["warm_hits"] == trials
+    assert warm_ms < cold_ms
+    pool.close()
+
+def test_output_is_bounded_and_limited():
+    pool = InterpreterPool(size=1, cpu_seconds=3, memory_mb=256)
+    pool.warm()
+    _wait_warm(pool)
+
+    # 5. A print loop keeps only head + tail; stderr (the traceback) survives intact
+    forwarded = []
+    flood = pool.run(
+        "for i in range(50000): print('line', i)\nraise RuntimeError('after flood')",
+        timeout=10, on_output=lambda stream, line: forwarded.append(line)
+    )
+    kept = len(flood["logs"].encode())
+    print(f"[TEST 5] {flood['truncated']['stdout']['bytes']} bytes printed, {kept} kept, {len(forwarded)} lines forwarded")
+    assert flood["exit_code"] == 1 and kept < 2 * OutputCapture().max_bytes
+    assert "line 0\n" in flood["logs"] and "line 49999\n" in flood["logs"] and "truncated" in flood["logs"]
+    assert "RuntimeError: after flood" in flood["logs"] and flood["truncated"]["stderr"]["dropped_lines"] == 0
+    assert "RuntimeError: after flood" in forwarded and forwarded[-1] == "line 49999" and len(forwarded) < 10000
+
+    # 6. One endless line is chunked rather than buffered whole
+    line = pool.run("import sys\nsys.stdout.write('x' * 5000000)", timeout=10)
+    assert line["exit_code"] == 0 and line["truncated"]["stdout"]["bytes"] >= 5000000 and len(line["logs"]) < 70000
+
+    # 7. rlimits: memory hogs get MemoryError, CPU spinners are killed
+    hog = pool.run("blob = bytearray(1024 * 1024 * 1024)", timeout=10)
+    assert hog["exit_code"] == 1 and "MemoryError" in hog["logs"]
+    spin = pool.run("import sys\nsys.stdout.write('spinning')\nwhile True: pass", timeout=10)
+    print(f"[TEST 7] Memory hog -> exit {hog['exit_code']}, CPU spinner -> exit {spin['exit_code']}: {spin['logs'].strip()}")
+    assert spin["exit_code"] != 0 and "CPU time limit" in spin["logs"]
+    # The limit notice gets its own line even when the trial's output did not end one
+    assert "spinning\nRLIMIT:" in spin["logs"]
+    pool.close()
+
+    # An explicit 0 lifts that limit (it is not "use the default", nor a zero-sized limit)
+    unlimited = InterpreterPool(size=1, cpu_seconds=0, memory_mb=0, file_mb=0)
+    unlimited.warm()
+    _wait_warm(unlimited)
+    alloc = unlimited.run("blob = [0] * 10**7", timeout=10)
+    busy = unlimited.run("import time\nend = time.process_time() + 1.5\nwhile time.process_time() < end: pass", timeout=10)
+    print(f"[TEST 7] Pool without limits: allocation -> exit {alloc['exit_code']}, 1.5 s CPU loop -> exit {busy['exit_code']}")
+    assert alloc["exit_code"] == 0 and busy["exit_code"] == 0, (alloc["logs"], busy["logs"])
+    unlimited.close()
+
+def test_filler_survives_spawn_failures():
+    pool = InterpreterPool(size=1)
+    spawn, failures = pool._spawn, []
+
+    def flaky_spawn():
+        if len(failures) < 2:
+            failures.append(1)
+            raise RuntimeError("Sandbox interpreter failed to start: simulated")
+        return spawn()
+
+    pool._spawn = flaky_spawn
+    pool.warm()
+    _wait_warm(pool)
+
+    # 8. Failed spawns are logged and retried with back-off; the filler keeps the pool warm
+    print(f"[TEST 8] {len(failures)} failed spawns, filler alive: {pool._filler.is_alive()}, idle: {len(pool._idle)}")
+    assert pool._filler.is_alive() and len(pool._idle) == 1
+    assert pool.run("print('ok')", timeout=5)["exit_code"] == 0 and pool.stats["warm_hits"] == 1
+    pool.close()
+
+if __name__ == "__main__":
+    test_interpreter_pool_semantics()
+    test_interpreter_pool_overhead()
+    test_output_is_bounded_and_limited()
+    test_filler_survives_spawn_failures()
+    print("--- AUDIT COMPLETE ---")
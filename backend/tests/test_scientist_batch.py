@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import asyncio
+import time
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend to path
+sys.path.append(os.path.join(os.getcwd(), 'backend'))
+
+from app.engines.scientist.batch import BatchResearcher
+from app.engines.scientist.lab_coat import lab_coat
+from app.engines.scientist.peer_review import peer_reviewer
+from app.api.scientist import router as scientist_router
+
+RESEARCH_LATENCY = 0.05
+
+class SlowScientist:
+    """lab_coat with an LLM-like delay; records peak concurrency."""
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def conduct_research(self, topic):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(RESEARCH_LATENCY)
+            return lab_coat.conduct_research(topic)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+def _client():
+    app = FastAPI()
+    app.include_router(scientist_router)
+    return TestClient(app)
+
+def test_batch_streams_ndjson():
+    print("--- CORTEX-SEC SCIENTIST BATCH AUDIT ---")
+    client = _client()
+    topics = [f"Topic {i}" for i in range(20)] + ["Topic 3", " Topic 3", ""]
+    with client.stream("POST", "/scientist/research/batch", json={"topics": topics}) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.iter_lines() if line]
+
+    # 1. One line per topic plus a summary; each matches the single-topic endpoint
+    summary = records.pop()["summary"]
+    print(f"[TEST 1] {len(records)} records streamed, summary {summary}")
+    assert sorted(r["index"] for r in records) == list(range(len(topics)))
+    assert summary["completed"] == len(topics) - 1 and summary["error"] == 1
+    single = client.post("/scientist/research", json={"topic": "Topic 7"}).json()
+    batched = next(r for r in records if r["topic"] == "Topic 7")
+    assert batched["paper"] == single["paper"] and batched["review"] == single["review"]
+    assert next(r for r in records if r["topic"] == "")["error"] == "Topic required"
+
+    # 2. Validation
+    assert client.post("/scientist/research/batch", json={"topics": []}).status_code == 400
+
+def test_bounded_concurrency_and_memoisation():
+    scientist = SlowScientist()
+    batch = BatchResearcher(scientist, peer_reviewer, concurrency=8)
+    topics = [f"sweep-{i}" for i in range(40)]
+
+    async def collect(items, concurrency=None):
+        return [r async for r in batch.run(items, concurrency)]
+
+    start = time.perf_counter()
+    records = asyncio.run(collect(topics))
+    elapsed = time.perf_counter() - start
+    sequential = len(topics) * RESEARCH_LATENCY
+
+    # 3. Throughput comes from overlap, bounded by the limit
+    print(f"[TEST 3] {len(topics)} topics in {elapsed:.2f}s (sequential ~{sequential:.2f}s), peak in flight {scientist.peak}")
+    assert scientist.peak <= 8 and elapsed < sequential / 3
+
+    # 4. A per-request limit below the pool size is honoured
+    scientist.peak = 0
+    asyncio.run(collect([f"narrow-{i}" for i in range(12)], concurrency=2))
+    assert scientist.peak <= 2
+
+    # 5. A repeated sweep is served from the memo without recomputation
+    calls = scientist.calls
+    again = asyncio.run(collect(topics))
+    assert scientist.calls == calls and again[-1]["summary"]["memoised"] == len(topics)
+    assert records[-1]["summary"]["completed"] == len(topics)
+    print(f"[TEST 5] Repeat sweep memoised: {batch.stats}")
+
+if __name__ == "__main__":
+    test_batch_streams_ndjson()
+    test_bounded_concurrency_and_memoisation()
+    print("--- AUDIT COMPLETE ---")
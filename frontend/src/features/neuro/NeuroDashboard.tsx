@@ -15,11 +15,44 @@ interface NeuroPacket {
     status: string
 }
 
+// Binary neuro frame layout (backend/app/engines/neuro_sim/frames.py)
+const FRAME_HEADER_SIZE = 20
+const FLAG_REDACTED = 0x01
+const FLAG_BAND_POWER = 0x02
+const BAND_COUNT = 3
+const STATE_LABELS = ["FOCUSED", "STRESSED", "RELAXED", "DISTRACTED"]
+const STATE_RISK: { [key: string]: string } = { FOCUSED: "MEDIUM", STRESSED: "HIGH", RELAXED: "LOW", DISTRACTED: "MEDIUM" }
+
+interface NeuroFrame {
+    redacted: boolean
+    timestamp: number
+    nChannels: number
+    state: string | null
+    samples: Float32Array
+}
+
+function decodeFrame(buffer: ArrayBuffer): NeuroFrame {
+    const view = new DataView(buffer)
+    const flags = view.getUint8(3)
+    const nSamples = view.getUint16(16, true)
+    const nChannels = view.getUint8(18)
+    const state = view.getUint8(19)
+    const offset = FRAME_HEADER_SIZE + (flags & FLAG_BAND_POWER ? BAND_COUNT * 4 : 0)
+    return {
+        redacted: (flags & FLAG_REDACTED) !== 0,
+        timestamp: view.getFloat64(8, true),
+        nChannels,
+        state: state < STATE_LABELS.length ? STATE_LABELS[state] : null,
+        samples: new Float32Array(buffer, offset, nSamples * nChannels)
+    }
+}
+
 export default function NeuroDashboard() {
     const [consent, setConsent] = useState(false)
     const [streamData, setStreamData] = useState<number[]>([]) // Single channel for demo visual
     const [packet, setPacket] = useState<NeuroPacket | null>(null)
     const [ledger, setLedger] = useState<any[]>([])
+    const [ledgerHeight, setLedgerHeight] = useState(0)
     const [blockedCount, setBlockedCount] = useState(0)
     const [isPolling, setIsPolling] = useState(true)
     const [sovereignMode, setSovereignMode] = useState(true) // Default to v3.0
@@ -29,35 +62,36 @@ export default function NeuroDashboard() {
     const maxPoints = 100
     const height = 100
 
-    // Fetch Stream (Simulate Agent Polling)
+    const pushStreamValues = (values: number[]) => {
+        setStreamData(prev => {
+            const next = [...prev, ...values]
+            return next.length > maxPoints ? next.slice(next.length - maxPoints) : next
+        })
+    }
+
+    // Fetch Stream (v3.0: each ZKP proof is its own request)
     useEffect(() => {
-        if (!isPolling) return
+        if (!isPolling || !sovereignMode) return
 
         const interval = setInterval(async () => {
             try {
-                let res;
-                if (sovereignMode) {
-                    // v3.0: GENERATE ZKP PROOF (Mock)
-                    const proof = {
-                        id: `π_${Math.random().toString(36).substr(2, 9)}`,
-                        metadata: "CORTEX_ZKP_v3",
-                        timestamp: Date.now() / 1000
-                    }
-                    const public_signals = [75] // Threshold constant
-
-                    res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/neuro/stream`, {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({
-                            client_id: "agent-nexus-prover",
-                            proof,
-                            public_signals
-                        })
-                    })
-                } else {
-                    // v2.0: LEGACY GET (Exposes Identity to check Consent)
-                    res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/neuro/stream?client_id=agent-legacy`)
+                // v3.0: GENERATE ZKP PROOF (Mock)
+                const proof = {
+                    id: `π_${Math.random().toString(36).substr(2, 9)}`,
+                    metadata: "CORTEX_ZKP_v3",
+                    timestamp: Date.now() / 1000
                 }
+                const public_signals = [75] // Threshold constant
+
+                const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/neuro/stream`, {
+                    method: "POST",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify({
+                        client_id: "agent-nexus-prover",
+                        proof,
+                        public_signals
+                    })
+                })
 
                 const data = await res.json()
 
@@ -75,24 +109,8 @@ export default function NeuroDashboard() {
                     setPacket(data.data)
                 }
 
-                const p = data.mode === "SOVEREIGN_ZKP" ? { status: "SOVEREIGN_ZKP", raw_eeg: { "AF7": 50 } } : data.data as NeuroPacket
-
-                // Update Visualizer Data (Simulate rolling window)
-                // If encrypted, show noise
-                let newValue = 50
-                if (p.status === "EXPOSED") {
-                    // Normalize 10-100 uV to 0-100 height
-                    newValue = p.raw_eeg["AF7"] || 50
-                } else {
-                    // Noise for encrypted state
-                    newValue = Math.random() * 100
-                }
-
-                setStreamData(prev => {
-                    const next = [...prev, newValue]
-                    if (next.length > maxPoints) next.shift()
-                    return next
-                })
+                // Noise for zero-knowledge state
+                pushStreamValues([Math.random() * 100])
 
                 // Track Blocked Attempts
                 if (data.audit_log && data.audit_log.decision === "DENIED") {
@@ -105,13 +123,65 @@ export default function NeuroDashboard() {
         }, 200) // 5Hz Refresh for smoothness
 
         return () => clearInterval(interval)
-    }, [isPolling])
+    }, [isPolling, sovereignMode])
+
+    // Legacy Stream (v2.0): one WebSocket per client, binary frames at the device sample rate
+    useEffect(() => {
+        if (!isPolling || sovereignMode) return
+
+        setZkpStatus(null)
+        const wsBase = (process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008').replace(/^http/, 'ws')
+        const ws = new WebSocket(`${wsBase}/neuro/stream/ws?client_id=agent-legacy`)
+        ws.binaryType = "arraybuffer"
+
+        ws.onmessage = (event) => {
+            // Session / consent events arrive as JSON text
+            if (typeof event.data === "string") {
+                const msg = JSON.parse(event.data)
+                if (msg.audit_log && msg.audit_log.decision === "DENIED") {
+                    setBlockedCount(prev => prev + 1)
+                }
+                return
+            }
+
+            const frame = decodeFrame(event.data as ArrayBuffer)
+            if (frame.redacted || !frame.state) {
+                setPacket({
+                    timestamp: frame.timestamp,
+                    raw_eeg: {},
+                    psychography: { inferred_state: "ENCRYPTED_SHA256", privacy_risk: "MITIGATED" },
+                    status: "PROTECTED_BY_CONSENT_CHAIN"
+                })
+                // Noise for encrypted state
+                pushStreamValues(Array.from({ length: 4 }, () => Math.random() * 100))
+                return
+            }
+
+            // Downsample AF7 (channel 0) to keep the 100-point window readable
+            const nSamples = frame.samples.length / frame.nChannels
+            const values: number[] = []
+            for (let i = 0; i < nSamples; i += 8) values.push(frame.samples[i * frame.nChannels])
+
+            setPacket({
+                timestamp: frame.timestamp,
+                raw_eeg: { "AF7": values[values.length - 1] },
+                psychography: { inferred_state: frame.state, privacy_risk: STATE_RISK[frame.state] },
+                status: "EXPOSED"
+            })
+            pushStreamValues(values)
+        }
+        ws.onerror = (e) => console.error(e)
+
+        return () => ws.close()
+    }, [isPolling, sovereignMode])
 
     // Load Ledger
     const fetchLedger = async () => {
-        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/neuro/ledger`)
+        // Newest page only; the full chain is paginated server-side
+        const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/neuro/ledger?order=desc&limit=50`)
         const data = await res.json()
-        setLedger(data.reverse()) // Show newest first
+        setLedger(data.blocks)
+        setLedgerHeight(data.height)
     }
 
     // Initial Load
@@ -269,7 +339,7 @@ export default function NeuroDashboard() {
                         </CardHeader>
                         <CardContent>
                             <div className="text-4xl font-bold text-amber-500 font-mono">
-                                #{ledger.length}
+                                #{ledgerHeight}
                             </div>
                         </CardContent>
                     </Card>
@@ -1,56 +1,140 @@
 "use client"
 
-import React, { useState } from 'react';
-import { Card, CardContent, CardHeader, CardTitle, CardDescription, CardFooter } from "@/src/components/ui/card"
+import React, { useState, useEffect, useRef } from 'react';
+import { Card, CardContent, CardHeader, CardTitle, CardDescription } from "@/src/components/ui/card"
 import { Button } from "@/src/components/ui/button"
 import { Input } from "@/src/components/ui/input"
 import { Badge } from "@/src/components/ui/badge"
 import { ScrollArea } from "@/src/components/ui/scroll-area"
-import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/src/components/ui/tabs"
-import { FlaskConical, CheckCircle2, XCircle, FileText, Cpu, Microscope } from 'lucide-react'
-
-// Types based on Backend API
-interface ResearchArtifact {
-    hypothesis: { title: string, statement: string, topic: string }
-    design: { code: string, language: string, expected_output: string }
-    result: { success: boolean, output: string, metrics: any }
+import { FlaskConical, CheckCircle2, XCircle, FileText, Cpu, Microscope, BookOpen, Terminal } from 'lucide-react'
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'
+
+// Event types published by the hive (backend/app/engines/scientist/hive/events.py)
+const HIVE_EVENTS = ["status", "stage_start", "stage_end", "grounding", "token", "trial_start", "trial_end", "sandbox", "verdict", "done"]
+
+interface Trial {
+    trial: number
+    lane: number
+    code: string
+    output: { stream: string, line: string }[]
+    exitCode: number | null
+}
+
+interface Verdict {
+    verdict: "ACCEPT" | "REJECT" | string
+    score: number
+    critique: string
 }
 
-interface ReviewArtifact {
-    decision: "ACCEPT" | "REJECT" | "REVISE"
-    score: string
-    comments: string[]
-    publication_ready: boolean
+// LLM replies are JSON objects; show the field once the stream parses, raw text until then
+function field(raw: string, key: string): string {
+    try {
+        const value = JSON.parse(raw)[key]
+        return typeof value === "string" ? value : JSON.stringify(value, null, 2)
+    } catch {
+        return raw
+    }
 }
 
 export default function ResearchLab() {
     const [topic, setTopic] = useState("")
-    const [loading, setLoading] = useState(false)
-    const [paper, setPaper] = useState<ResearchArtifact | null>(null)
-    const [review, setReview] = useState<ReviewArtifact | null>(null)
+    const [projectId, setProjectId] = useState<string | null>(null)
+    const [status, setStatus] = useState<string | null>(null)
+    const [stage, setStage] = useState<string | null>(null)
+    const [grounding, setGrounding] = useState<string[]>([])
+    const [theory, setTheory] = useState("")
+    const [trials, setTrials] = useState<Trial[]>([])
+    const [verdict, setVerdict] = useState<Verdict | null>(null)
+    const [critique, setCritique] = useState("")
+    const streamRef = useRef<EventSource | null>(null)
+
+    const running = projectId !== null && stage !== "done"
+
+    const updateTrial = (trial: number, lane: number, update: (t: Trial) => Trial) => {
+        setTrials(prev => {
+            const existing = prev.find(t => t.trial === trial) || { trial, lane, code: "", output: [], exitCode: null }
+            return [...prev.filter(t => t.trial !== trial), update(existing)].sort((a, b) => a.trial - b.trial)
+        })
+    }
 
     const conductResearch = async () => {
         if (!topic) return
-        setLoading(true)
-        setPaper(null)
-        setReview(null)
+        setStatus(null)
+        setStage(null)
+        setGrounding([])
+        setTheory("")
+        setTrials([])
+        setVerdict(null)
+        setCritique("")
 
         try {
-            const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8008'}/scientist/research`, {
+            const res = await fetch(`${API_URL}/hive/projects`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify({ topic })
             })
             const data = await res.json()
-            setPaper(data.paper)
-            setReview(data.review)
+            if (!res.ok) throw new Error(data.detail)
+            setStatus(data.status)
+            setProjectId(data.project_id)
         } catch (e) {
             console.error(e)
-        } finally {
-            setLoading(false)
         }
     }
 
+    // Live DSG feed: EventSource reconnects on its own and resumes via Last-Event-ID
+    useEffect(() => {
+        if (!projectId) return
+
+        const source = new EventSource(`${API_URL}/hive/projects/${projectId}/events`)
+        streamRef.current = source
+
+        const handle = (type: string, e: MessageEvent) => {
+            const ev = JSON.parse(e.data)
+            switch (type) {
+                case "status":
+                    setStatus(ev.status)
+                    break
+                case "stage_start":
+                    setStage(ev.agent)
+                    break
+                case "grounding":
+                    setGrounding(ev.sources)
+                    break
+                case "token":
+                    if (ev.agent === "theorist") setTheory(prev => prev + ev.text)
+                    else if (ev.agent === "engineer") updateTrial(ev.trial, ev.lane, t => ({ ...t, code: t.code + ev.text }))
+                    else setCritique(prev => prev + ev.text)
+                    break
+                case "trial_start":
+                    updateTrial(ev.trial, ev.lane, t => t)
+                    break
+                case "sandbox":
+                    updateTrial(ev.trial, ev.lane, t => ({ ...t, output: [...t.output, { stream: ev.stream, line: ev.line }] }))
+                    break
+                case "trial_end":
+                    updateTrial(ev.trial, ev.lane, t => ({ ...t, exitCode: ev.exit_code }))
+                    break
+                case "verdict":
+                    setVerdict(ev)
+                    break
+                case "done":
+                    setStatus(ev.status)
+                    setStage("done")
+                    source.close()
+                    break
+            }
+        }
+        HIVE_EVENTS.forEach(type => source.addEventListener(type, (e) => handle(type, e as MessageEvent)))
+        source.onerror = (e) => console.error(e)
+
+        return () => source.close()
+    }, [projectId])
+
+    const hypothesis = field(theory, "hypothesis")
+    const passed = verdict?.verdict === "ACCEPT"
+
     return (
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-6 p-6 max-w-7xl mx-auto h-[calc(100vh-100px)]">
 
@@ -73,40 +157,50 @@ export default function ResearchLab() {
                         <Button
                             className="w-full bg-cyan-600 hover:bg-cyan-700 text-white font-bold"
                             onClick={conductResearch}
-                            disabled={loading}
+                            disabled={running}
                         >
-                            {loading ? "CONDUCTING RESEARCH..." : "START EXPERIMENT"}
+                            {running ? `CONDUCTING RESEARCH (${(stage || status || "queued").toUpperCase()})...` : "START EXPERIMENT"}
                         </Button>
+                        {projectId && (
+                            <div className="flex items-center justify-between text-[10px] font-mono text-neutral-500">
+                                <span>{projectId}</span>
+                                <Badge variant="outline" className="border-neutral-700 text-neutral-400">{status}</Badge>
+                            </div>
+                        )}
                     </CardContent>
                 </Card>
 
                 {/* PEER REVIEW SCORECARD */}
-                {review && (
-                    <Card className={`border-neutral-800 ${review.decision === 'ACCEPT' ? 'bg-green-950/20 border-green-900' : 'bg-red-950/20 border-red-900'}`}>
+                {(verdict || critique) && (
+                    <Card className={`border-neutral-800 ${!verdict ? 'bg-neutral-900' : passed ? 'bg-green-950/20 border-green-900' : 'bg-red-950/20 border-red-900'}`}>
                         <CardHeader>
                             <CardTitle className="text-sm font-mono flex items-center gap-2">
                                 <FileText size={16} /> PEER REVIEW VERDICT
                             </CardTitle>
                         </CardHeader>
                         <CardContent className="space-y-4">
-                            <div className="flex items-center justify-between">
-                                <span className="text-neutral-400 text-sm">DECISION</span>
-                                <Badge className={review.decision === 'ACCEPT' ? 'bg-green-500' : 'bg-red-500'}>
-                                    {review.decision}
-                                </Badge>
-                            </div>
-                            <div className="flex items-center justify-between">
-                                <span className="text-neutral-400 text-sm">SCORE</span>
-                                <span className="text-2xl font-bold font-mono text-neutral-200">{review.score}</span>
-                            </div>
-                            <div className="space-y-2">
-                                <p className="text-xs text-neutral-500 uppercase">Reviewer Comments:</p>
-                                {review.comments.map((c, i) => (
-                                    <div key={i} className="text-xs text-neutral-300 bg-black/30 p-2 rounded border border-white/10">
-                                        "{c}"
+                            {verdict ? (
+                                <>
+                                    <div className="flex items-center justify-between">
+                                        <span className="text-neutral-400 text-sm">DECISION</span>
+                                        <Badge className={passed ? 'bg-green-500' : 'bg-red-500'}>
+                                            {verdict.verdict}
+                                        </Badge>
                                     </div>
-                                ))}
-                            </div>
+                                    <div className="flex items-center justify-between">
+                                        <span className="text-neutral-400 text-sm">SCORE</span>
+                                        <span className="text-2xl font-bold font-mono text-neutral-200">{verdict.score}</span>
+                                    </div>
+                                    <div className="space-y-2">
+                                        <p className="text-xs text-neutral-500 uppercase">Reviewer Comments:</p>
+                                        <div className="text-xs text-neutral-300 bg-black/30 p-2 rounded border border-white/10">
+                                            "{verdict.critique}"
+                                        </div>
+                                    </div>
+                                </>
+                            ) : (
+                                <pre className="text-xs text-neutral-400 font-mono whitespace-pre-wrap">{critique}</pre>
+                            )}
                         </CardContent>
                     </Card>
                 )}
@@ -122,54 +216,70 @@ export default function ResearchLab() {
                             </CardTitle>
                             {/* RAML METADATA BADGE */}
                             <Badge variant="outline" className="text-[10px] text-neutral-500 border-neutral-700 font-mono">
-                                <Cpu size={10} className="mr-1" /> GENERATED BY: CORTEX-SCIENTIST-v2.0
+                                <Cpu size={10} className="mr-1" /> GENERATED BY: CORTEX-SYNTHETIC-HIVE
                             </Badge>
                         </div>
                     </CardHeader>
 
                     <CardContent className="flex-1 p-0 overflow-hidden relative">
-                        {loading && (
-                            <div className="absolute inset-0 flex items-center justify-center bg-black/50 z-10 backdrop-blur-sm">
-                                <div className="text-cyan-500 font-mono animate-pulse">GENERATING DOCTRINE...</div>
-                            </div>
-                        )}
-
-                        {!paper && !loading && (
+                        {!projectId && (
                             <div className="flex items-center justify-center h-full text-neutral-600 font-mono text-sm">
                                 AWAITING HYPOTHESIS...
                             </div>
                         )}
 
-                        {paper && (
+                        {projectId && (
                             <ScrollArea className="h-full p-6">
                                 <article className="prose prose-invert prose-sm max-w-none">
-                                    <h1 className="text-2xl font-bold text-neutral-100 mb-2">{paper.hypothesis.title}</h1>
-                                    <div className="text-xs text-neutral-500 font-mono mb-6">TOPIC: {paper.hypothesis.topic}</div>
+                                    <div className="text-xs text-neutral-500 font-mono mb-6">TOPIC: {topic}</div>
 
                                     <h3 className="text-cyan-400 border-b border-neutral-800 pb-2">1. Abstract & Hypothesis</h3>
-                                    <p className="italic text-neutral-300 border-l-2 border-cyan-900 pl-4 py-2 bg-cyan-950/10 rounded-r">
-                                        {paper.hypothesis.statement}
+                                    {grounding.length > 0 && (
+                                        <div className="flex flex-wrap gap-2 mb-2">
+                                            {grounding.map((source, i) => (
+                                                <Badge key={i} variant="outline" className="text-[10px] text-neutral-400 border-neutral-700 font-mono">
+                                                    <BookOpen size={10} className="mr-1" /> {source}
+                                                </Badge>
+                                            ))}
+                                        </div>
+                                    )}
+                                    <p className="italic text-neutral-300 border-l-2 border-cyan-900 pl-4 py-2 bg-cyan-950/10 rounded-r whitespace-pre-wrap">
+                                        {hypothesis || <span className="animate-pulse text-cyan-500 font-mono not-italic">GROUNDING HYPOTHESIS...</span>}
                                     </p>
 
                                     <h3 className="text-cyan-400 border-b border-neutral-800 pb-2 mt-6">2. Experimental Design (PoC)</h3>
-                                    <pre className="bg-black border border-neutral-800 rounded p-4 text-xs font-mono overflow-x-auto text-green-400">
-                                        {paper.design.code}
-                                    </pre>
+                                    {trials.length === 0 && (
+                                        <div className="text-neutral-600 font-mono text-xs">AWAITING ENGINEER...</div>
+                                    )}
+                                    {trials.map(t => (
+                                        <div key={t.trial} className="mb-4">
+                                            <div className="flex gap-2 items-center mb-2 text-xs font-mono">
+                                                {t.exitCode === null ? <Terminal className="text-cyan-500 animate-pulse" size={14} /> : t.exitCode === 0 ? <CheckCircle2 className="text-green-500" size={14} /> : <XCircle className="text-red-500" size={14} />}
+                                                <span className="text-neutral-300">TRIAL {t.trial} · LANE {t.lane}</span>
+                                                {t.exitCode !== null && <span className="text-neutral-500">exit {t.exitCode}</span>}
+                                            </div>
+                                            <pre className="bg-black border border-neutral-800 rounded p-4 text-xs font-mono overflow-x-auto text-green-400">
+                                                {field(t.code, "code")}
+                                            </pre>
+                                            {t.output.length > 0 && (
+                                                <pre className="bg-neutral-950 border border-neutral-800 rounded p-3 text-xs font-mono overflow-x-auto">
+                                                    {t.output.map((o, i) => (
+                                                        <div key={i} className={o.stream === "stderr" ? "text-red-400" : "text-neutral-400"}>{o.line}</div>
+                                                    ))}
+                                                </pre>
+                                            )}
+                                        </div>
+                                    ))}
 
                                     <h3 className="text-cyan-400 border-b border-neutral-800 pb-2 mt-6">3. Results & Metrics</h3>
                                     <div className="bg-neutral-950 p-4 rounded border border-neutral-800">
-                                        <div className="flex gap-2 items-center mb-2">
-                                            {paper.result.success ? <CheckCircle2 className="text-green-500" size={16} /> : <XCircle className="text-red-500" size={16} />}
-                                            <span className="font-bold text-neutral-200">Execution Status: {paper.result.success ? 'SUCCESS' : 'FAILURE'}</span>
-                                        </div>
-                                        <p className="text-neutral-400 mb-2">{paper.result.output}</p>
-                                        <div className="grid grid-cols-2 gap-2 mt-2">
-                                            {Object.entries(paper.result.metrics).map(([k, v]) => (
-                                                <div key={k} className="bg-neutral-900 p-2 rounded flex justify-between">
-                                                    <span className="text-neutral-500 text-xs uppercase">{k}</span>
-                                                    <span className="text-cyan-400 font-mono font-bold">{v as string}</span>
-                                                </div>
-                                            ))}
+                                        <div className="flex gap-2 items-center">
+                                            {stage !== "done" ? <span className="text-cyan-500 font-mono animate-pulse">{(stage || "queued").toUpperCase()} IN PROGRESS...</span> : (
+                                                <>
+                                                    {status === "COMPLETED" ? <CheckCircle2 className="text-green-500" size={16} /> : <XCircle className="text-red-500" size={16} />}
+                                                    <span className="font-bold text-neutral-200">Cycle Status: {status}</span>
+                                                </>
+                                            )}
                                         </div>
                                     </div>
                                 </article>